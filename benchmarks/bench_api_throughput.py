@@ -0,0 +1,218 @@
+#!/usr/bin/env python3
+"""
+Web 服务在读写混合负载下的吞吐量（requests/sec）和延迟
+
+在本进程的后台线程中启动服务器（临时数据库，预先写入一批任务）：
+- fastapi：uvicorn + server.app（默认）
+- fallback：没有 uvicorn 时使用的内置 asyncio 服务器 server.fallback
+- threaded：旧版本 main.py 中每连接一个线程的 ThreadedHTTPServer，只在旧版本的检出目录中可用
+再用多个客户端进程、每个进程多个保持连接的线程持续发请求：
+- 读：分页读取活动任务 / 已完成任务（limit=50）
+- 写：新建任务、修改标题、切换完成状态，按 --writes 比例混入
+
+对比改动前后：在旧版本的检出目录中运行同一个脚本即可，例如
+    git worktree add /tmp/before <旧提交>
+    cp benchmarks/bench_api_throughput.py /tmp/before/benchmarks/
+    python /tmp/before/benchmarks/bench_api_throughput.py
+
+用法: python benchmarks/bench_api_throughput.py [--server fastapi|fallback|threaded]
+      [--seconds 10] [--clients 4] [--threads 16] [--writes 0.2]
+执行器可用 TODO_DB_READERS / TODO_DB_QUEUE_LIMIT / TODO_DB_COMMIT_BATCH / TODO_DB_COMMIT_WINDOW_MS 调整，
+结束时打印写通道的组提交统计（批数、平均批大小、批大小分布）。
+"""
+import argparse
+import http.client
+import json
+import multiprocessing
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+
+# 添加项目根目录到Python路径
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+SEED_TASKS = 2000
+
+
+def seed(db_path, count):
+    from database.migrations import ensure_schema
+    from database.pool import get_pool
+
+    ensure_schema(db_path)
+    with get_pool(db_path).writer() as conn:
+        conn.executemany(
+            "INSERT INTO tasks (title, quadrant, is_completed, order_index) VALUES (?, ?, ?, ?)",
+            [(f"任务 {i}", i % 4 + 1, int(i % 3 == 0), i * 1024.0) for i in range(1, count + 1)]
+        )
+
+
+def start_server(kind, db_path):
+    """启动服务器，返回 (停止函数, 端口)"""
+    if kind == "fallback":
+        from server import fallback
+
+        fallback.DB_PATH = db_path
+        server = fallback.start_in_thread()
+        return server.stop, server.port
+    if kind == "threaded":
+        import main
+
+        main.DB_PATH = db_path
+        server = main.ThreadedHTTPServer(("127.0.0.1", 0), main.AppHTTPRequestHandler)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        return server.shutdown, server.server_address[1]
+
+    import uvicorn
+    from server import app as server_app
+
+    server_app.DB_PATH = db_path
+    server = uvicorn.Server(uvicorn.Config(server_app.app, host="127.0.0.1", port=0, log_level="warning"))
+    threading.Thread(target=server.run, daemon=True).start()
+    while not server.started:
+        time.sleep(0.05)
+
+    def stop():
+        server.should_exit = True
+
+    return stop, server.servers[0].sockets[0].getsockname()[1]
+
+
+def _request(write_ratio, max_id, rng):
+    if rng.random() >= write_ratio:
+        path = "/api/tasks?limit=50" if rng.random() < 0.7 else "/api/tasks/completed?limit=50"
+        return "read", "GET", path, None
+    kind = rng.randrange(3)
+    if kind == 0:
+        return "write", "POST", "/api/tasks", {"title": "压测任务", "quadrant": rng.randint(1, 4)}
+    task_id = rng.randint(1, max_id)
+    if kind == 1:
+        return "write", "PATCH", f"/api/tasks/{task_id}", {"title": f"改名 {rng.random():.6f}"}
+    return "write", "PATCH", f"/api/tasks/{task_id}/complete", {"completed": rng.random() < 0.5}
+
+
+def client_process(port, seconds, threads, write_ratio, max_id, queue):
+    """一个客户端进程：多个线程各自用一条长连接循环发请求"""
+    deadline = time.perf_counter() + seconds
+    results = []
+
+    def worker(index):
+        rng = random.Random(os.getpid() * 1000 + index)
+        conn = http.client.HTTPConnection("127.0.0.1", port)
+        latencies = {"read": [], "write": []}
+        errors = rejected = 0
+        while time.perf_counter() < deadline:
+            kind, method, path, body = _request(write_ratio, max_id, rng)
+            payload = json.dumps(body).encode() if body is not None else None
+            start = time.perf_counter()
+            try:
+                conn.request(method, path, body=payload, headers={"Content-Type": "application/json"})
+                response = conn.getresponse()
+                response.read()
+                if response.status == 503:
+                    # 准入控制拒绝的请求单独统计，不计入延迟；按 Retry-After 退避后再发
+                    rejected += 1
+                    time.sleep(float(response.getheader("Retry-After", "1")))
+                    continue
+                if response.status >= 500:
+                    errors += 1
+            except (OSError, http.client.HTTPException):
+                errors += 1
+                conn.close()
+                conn = http.client.HTTPConnection("127.0.0.1", port)
+                continue
+            latencies[kind].append(time.perf_counter() - start)
+        conn.close()
+        results.append((latencies, errors, rejected))
+
+    pool = [threading.Thread(target=worker, args=(i,)) for i in range(threads)]
+    for thread in pool:
+        thread.start()
+    for thread in pool:
+        thread.join()
+    merged = {"read": [], "write": []}
+    errors = rejected = 0
+    for latencies, worker_errors, worker_rejected in results:
+        for kind in merged:
+            merged[kind].extend(latencies[kind])
+        errors += worker_errors
+        rejected += worker_rejected
+    queue.put((merged, errors, rejected))
+
+
+def fetch_stats(port):
+    """服务端的连接池/执行器统计；旧版本服务器没有该接口时返回空字典"""
+    conn = http.client.HTTPConnection("127.0.0.1", port, timeout=10)
+    try:
+        conn.request("GET", "/api/stats/pool")
+        response = conn.getresponse()
+        return json.loads(response.read()) if response.status == 200 else {}
+    except (OSError, ValueError, http.client.HTTPException):
+        return {}
+    finally:
+        conn.close()
+
+
+def percentile(values, fraction):
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * fraction))]
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--server", choices=["fastapi", "fallback", "threaded"], default="fastapi")
+    parser.add_argument("--seconds", type=float, default=10)
+    parser.add_argument("--clients", type=int, default=4)
+    parser.add_argument("--threads", type=int, default=16)
+    parser.add_argument("--writes", type=float, default=0.2)
+    args = parser.parse_args()
+
+    db_path = os.path.join(tempfile.mkdtemp(), "tasks.db")
+    seed(db_path, SEED_TASKS)
+    stop, port = start_server(args.server, db_path)
+
+    # 客户端进程用 spawn 启动，避免 fork 带上服务端线程
+    context = multiprocessing.get_context("spawn")
+    queue = context.Queue()
+    clients = [
+        context.Process(target=client_process, args=(port, args.seconds, args.threads, args.writes, SEED_TASKS, queue))
+        for _ in range(args.clients)
+    ]
+    for process in clients:
+        process.start()
+    merged = {"read": [], "write": []}
+    errors = rejected = 0
+    for _ in clients:
+        latencies, client_errors, client_rejected = queue.get()
+        for kind in merged:
+            merged[kind].extend(latencies[kind])
+        errors += client_errors
+        rejected += client_rejected
+    for process in clients:
+        process.join()
+    stats = fetch_stats(port)
+    stop()
+
+    total = len(merged["read"]) + len(merged["write"])
+    print(f"服务器: {args.server}")
+    print(f"{args.clients}个客户端进程 x {args.threads}线程，{args.seconds:.0f}秒，写请求比例 {args.writes:.0%}")
+    print(f"{'类型':<6}{'请求数':>10}{'req/s':>10}{'p50(ms)':>10}{'p99(ms)':>10}")
+    for kind in ("read", "write"):
+        values = merged[kind]
+        print(f"{kind:<6}{len(values):>10}{len(values) / args.seconds:>10.0f}"
+              f"{percentile(values, 0.5) * 1000:>10.1f}{percentile(values, 0.99) * 1000:>10.1f}")
+    print(f"{'total':<6}{total:>10}{total / args.seconds:>10.0f}")
+    print(f"错误: {errors}，被拒绝(503): {rejected}")
+    group_commit = stats.get("executor", {}).get("writer", {}).get("groupCommit")
+    if group_commit:
+        print(f"组提交: {group_commit['batches']}批，平均每批 {group_commit['meanBatch']:.1f} 个写操作，"
+              f"最大 {group_commit['largestBatch']}，每批平均 {group_commit['meanCommitMs']:.2f} ms")
+        print(f"批大小分布: {group_commit['batchSizes']}")
+
+
+if __name__ == "__main__":
+    main()
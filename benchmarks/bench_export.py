@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+"""
+导出的吞吐量和内存占用（database.export.TaskExport）
+
+对每个任务数 N：生成 N 个任务（其中一成已完成并归档），分别导出 NDJSON 和 CSV
+到 /dev/null 式的计数输出，打印耗时、行/秒以及 tracemalloc 记录的 Python 峰值内存。
+峰值内存应与 N 无关（只取决于 EXPORT_BATCH 和归档段大小）。
+
+用法: python benchmarks/bench_export.py [任务数 ...]（默认 10000 100000 1000000）
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+# 添加项目根目录到Python路径
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+class _Counter:
+    def __init__(self):
+        self.size = 0
+
+    def write(self, chunk):
+        self.size += len(chunk)
+
+    def flush(self):
+        pass
+
+
+def _populate(repo, count):
+    from database.archive import archive_all
+
+    with repo.pool.writer() as conn:
+        conn.executemany(
+            "INSERT INTO tasks (title, description, quadrant, is_completed) VALUES (?, ?, ?, ?)",
+            ((f"任务 {i}", f"第 {i} 个任务的描述", i % 4 + 1, int(i % 10 == 0)) for i in range(count))
+        )
+    repo.write(archive_all)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("counts", nargs="*", type=int, default=[10000, 100000, 1000000])
+    args = parser.parse_args()
+
+    from database.export import export_to_file
+    from database.repository import TaskRepository
+
+    print(f"{'任务数':>9} {'格式':>6} {'耗时(s)':>8} {'行/秒':>10} {'输出(MB)':>9} {'峰值内存(MB)':>12}")
+    for count in args.counts:
+        repo = TaskRepository(os.path.join(tempfile.mkdtemp(), "tasks.db"))
+        _populate(repo, count)
+        for fmt in ("ndjson", "csv"):
+            output = _Counter()
+            tracemalloc.start()
+            start = time.perf_counter()
+            export_to_file(repo.db_path, output, fmt)
+            elapsed = time.perf_counter() - start
+            _, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            print(f"{count:>9} {fmt:>6} {elapsed:>8.2f} {count / elapsed:>10.0f} "
+                  f"{output.size / 1e6:>9.1f} {peak / 1e6:>12.2f}")
+
+
+if __name__ == "__main__":
+    main()
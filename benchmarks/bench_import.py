@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+"""
+批量导入的吞吐量（database.bulk_import）与逐个新建任务的对比
+
+先生成一个 N 行的 NDJSON 文件（一成已完成），再分别：
+- 逐个新建：每个任务一次 repo.write(repo.create)（与 TaskModel.addTask 的数据库部分相同），
+  只跑前 --single 个任务后按比例估算
+- 批量导入：import_file，导入到空库，以及导入到已有 N 个任务的库
+打印耗时和任务/秒。
+
+用法: python benchmarks/bench_import.py [任务数 ...]（默认 100000 1000000）[--single 2000]
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+
+# 添加项目根目录到Python路径
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def _write_file(path, count):
+    with open(path, "w", encoding="utf-8") as output:
+        for i in range(count):
+            output.write(json.dumps({
+                "title": f"任务 {i} +项目{i % 50}",
+                "description": f"第 {i} 个任务的描述",
+                "quadrant": i % 4 + 1,
+                "isCompleted": i % 10 == 0,
+            }, ensure_ascii=False) + "\n")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("counts", nargs="*", type=int, default=[100000, 1000000])
+    parser.add_argument("--single", type=int, default=2000)
+    args = parser.parse_args()
+
+    from database.bulk_import import import_file
+    from database.repository import TaskRepository
+
+    print(f"{'任务数':>9} {'方式':>12} {'耗时(s)':>9} {'任务/秒':>10}")
+    for count in args.counts:
+        root = tempfile.mkdtemp()
+        source = os.path.join(root, "tasks.ndjson")
+        _write_file(source, count)
+
+        repo = TaskRepository(os.path.join(root, "single.db"))
+        single = min(count, args.single)
+        start = time.perf_counter()
+        for i in range(single):
+            repo.write(repo.create, f"任务 {i}", "描述", i % 4 + 1)
+        elapsed = (time.perf_counter() - start) * count / single
+        print(f"{count:>9} {'逐个新建(估)':>12} {elapsed:>9.2f} {count / elapsed:>10.0f}")
+
+        db_path = os.path.join(root, "bulk.db")
+        for label in ("批量/空库", "批量/已有数据"):
+            start = time.perf_counter()
+            imported = import_file(db_path, source)
+            elapsed = time.perf_counter() - start
+            assert imported == count
+            print(f"{count:>9} {label:>12} {elapsed:>9.2f} {count / elapsed:>10.0f}")
+
+
+if __name__ == "__main__":
+    main()
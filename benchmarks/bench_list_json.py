@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""
+对比列表接口两种序列化方式读完整个活动任务列表的耗时：
+- Python：fetch_page 取 Row → row_to_task 字典 → FastAPI 编码器 / json.dumps
+- SQL：fetch_page_json 由 SQLite 的 json_object + group_concat 直接生成响应体
+
+每种方式都按 MAX_PAGE_LIMIT 一页页读到末尾（与网页端 loadAll 相同）。
+
+用法: python benchmarks/bench_list_json.py [任务数 ...]
+"""
+import json
+import os
+import sys
+import tempfile
+import time
+
+# 添加项目根目录到Python路径
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+
+from database.migrations import ensure_schema
+from database.pagination import MAX_PAGE_LIMIT, fetch_page, fetch_page_json
+from database.pool import get_pool
+from server.app import row_to_task
+
+REPEAT = 3
+
+
+def build_db(count):
+    path = os.path.join(tempfile.mkdtemp(), "tasks.db")
+    ensure_schema(path)
+    with get_pool(path).writer() as conn:
+        conn.executemany(
+            "INSERT INTO tasks (title, description, quadrant, order_index) VALUES (?, ?, ?, ?)",
+            (("任务 %d" % i, "描述 %d" % i if i % 3 else "", i % 4 + 1, i * 1024.0) for i in range(1, count + 1))
+        )
+    return get_pool(path)
+
+
+def walk(conn, render_page):
+    after = None
+    total = 0
+    while True:
+        body, after = render_page(conn, after)
+        total += len(body)
+        if after is None:
+            return total
+
+
+def fastapi_page(conn, after):
+    rows, next_cursor = fetch_page(conn, "active", limit=MAX_PAGE_LIMIT, after=after)
+    return JSONResponse(jsonable_encoder([row_to_task(r) for r in rows])).body, next_cursor
+
+
+def stdlib_page(conn, after):
+    rows, next_cursor = fetch_page(conn, "active", limit=MAX_PAGE_LIMIT, after=after)
+    return json.dumps([row_to_task(r) for r in rows], ensure_ascii=False).encode(), next_cursor
+
+
+def sql_page(conn, after):
+    return fetch_page_json(conn, "active", limit=MAX_PAGE_LIMIT, after=after)
+
+
+def measure(pool, render_page):
+    best = None
+    with pool.reader() as conn:
+        for _ in range(REPEAT):
+            start = time.perf_counter()
+            size = walk(conn, render_page)
+            elapsed = time.perf_counter() - start
+            best = elapsed if best is None else min(best, elapsed)
+    return best, size
+
+
+def main():
+    counts = [int(arg) for arg in sys.argv[1:]] or [10_000, 100_000]
+    print(f"{'任务数':>8} {'方式':<22} {'耗时(ms)':>10} {'响应体(KB)':>12} {'加速':>6}")
+    for count in counts:
+        pool = build_db(count)
+        baseline = None
+        for name, render_page in (("Python + FastAPI编码器", fastapi_page),
+                                  ("Python + json.dumps", stdlib_page),
+                                  ("SQLite json_object", sql_page)):
+            elapsed, size = measure(pool, render_page)
+            baseline = baseline or elapsed
+            print(f"{count:>8} {name:<22} {elapsed * 1000:>10.1f} {size / 1024:>12.0f} {baseline / elapsed:>5.1f}x")
+
+
+if __name__ == "__main__":
+    main()
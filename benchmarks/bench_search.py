@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""
+对比任务搜索两种方式的耗时：
+- LIKE：在 tasks 上逐行做 title/description LIKE '%词%'，按创建时间取前20条
+- FTS5：TaskRepository.search（trigram 全文索引，按 bm25 相关度取前20条，含高亮和摘要）
+
+查询词按命中行数从少到多排列；最后是1～2个字符的短词（trigram 索引匹配不了，
+走两字符片段索引 tasks_fts_short，按id倒序取前20条）：两个短词的组合、常见和少见的两字符词、单字。
+
+用法: python benchmarks/bench_search.py [任务数 ...]（默认 100000 和 1000000）
+"""
+import os
+import random
+import sys
+import tempfile
+import time
+
+# 添加项目根目录到Python路径
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from database.repository import TaskRepository
+
+REPEAT = 5
+LIMIT = 20
+
+# 词频不均匀：前面的词出现得更多
+WORDS = [
+    "会议", "报告", "代码", "评审", "设计", "测试", "部署", "客户", "预算", "邮件",
+    "周报", "合同", "招聘", "培训", "发布", "需求", "文档", "数据", "服务器", "数据库",
+    "release", "meeting", "review", "deploy", "invoice", "roadmap", "backup", "refactor",
+] + [f"项目{i:03d}" for i in range(1000)] + [f"ticket-{i:05d}" for i in range(20000)]
+
+QUERIES = ["ticket-01234", "项目042", "roadmap", "季度预算", "数据库", "代码评审", "会议 报告", "会议", "报告", "招聘", "会"]
+
+
+def _text(rng, count):
+    return " ".join(WORDS[min(int(rng.paretovariate(0.6)) - 1, len(WORDS) - 1)] for _ in range(count))
+
+
+def build_repo(count):
+    repo = TaskRepository(os.path.join(tempfile.mkdtemp(), "tasks.db"))
+    rng = random.Random(count)
+    start = time.perf_counter()
+    with repo.pool.writer() as conn:
+        conn.executemany(
+            "INSERT INTO tasks (title, description, quadrant, order_index) VALUES (?, ?, ?, ?)",
+            ((_text(rng, 3), _text(rng, 10), i % 4 + 1, i * 1024.0) for i in range(1, count + 1))
+        )
+    print(f"写入 {count} 条任务（含索引触发器）: {time.perf_counter() - start:.1f}s")
+    return repo
+
+
+def like_search(conn, query):
+    terms = query.split()
+    condition = " AND ".join("(title LIKE ? OR description LIKE ?)" for _ in terms)
+    params = [f"%{term}%" for term in terms for _ in range(2)]
+    return conn.execute(
+        f"SELECT * FROM tasks WHERE {condition} ORDER BY created_at DESC, id DESC LIMIT ?", params + [LIMIT]
+    ).fetchall()
+
+
+def measure(repo, search, query):
+    best = None
+    with repo.pool.reader() as conn:
+        for _ in range(REPEAT):
+            start = time.perf_counter()
+            results = search(conn, query)
+            elapsed = time.perf_counter() - start
+            best = elapsed if best is None else min(best, elapsed)
+    return best, len(results)
+
+
+def main():
+    counts = [int(arg) for arg in sys.argv[1:]] or [100_000, 1_000_000]
+    for count in counts:
+        repo = build_repo(count)
+        print(f"{'任务数':>8} {'查询':<14} {'LIKE(ms)':>10} {'FTS5(ms)':>10} {'加速':>7} {'结果':>5}")
+        for query in QUERIES:
+            like_time, _ = measure(repo, like_search, query)
+            fts_time, found = measure(repo, lambda conn, q: repo.search(conn, q, LIMIT), query)
+            print(f"{count:>8} {query:<14} {like_time * 1000:>10.1f} {fts_time * 1000:>10.2f} "
+                  f"{like_time / fts_time:>6.0f}x {found:>5}")
+
+
+if __name__ == "__main__":
+    main()
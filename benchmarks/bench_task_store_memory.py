@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+"""
+对比活动任务两种存储方式的内存占用：
+- 旧方式：每个任务一个 Task 对象（带 __dict__）放在列表中
+- 新方式：TaskStore 列式存储
+
+用法: python benchmarks/bench_task_store_memory.py [任务数 ...]
+"""
+import gc
+import os
+import sys
+import tracemalloc
+
+# 添加项目根目录到Python路径
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from models.task_store import Task, TaskStore
+
+
+def generate_rows(count):
+    """模拟从SQLite读出的行：每行的字符串都是新对象"""
+    for i in range(1, count + 1):
+        second = i // 50  # 批量创建时，大量任务落在同一秒
+        yield (
+            i,
+            "任务 %d" % i,
+            "" if i % 5 else "描述 %d" % (i % 100),
+            i % 4 + 1,
+            0,
+            "2024-01-%02d %02d:%02d:%02d" % (second // 86400 % 28 + 1, second // 3600 % 24, second // 60 % 60, second % 60),
+            0,
+        )
+
+
+def measure(build, count):
+    gc.collect()
+    tracemalloc.start()
+    container = build(count)
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del container
+    gc.collect()
+    return current
+
+
+def build_objects(count):
+    return [Task(*row) for row in generate_rows(count)]
+
+
+def build_store(count):
+    store = TaskStore()
+    store.reset(generate_rows(count))
+    return store
+
+
+def build_titles_only(count):
+    """两种方式都要保存的标题字符串，单独统计作为参考"""
+    return [row[1] for row in generate_rows(count)]
+
+
+def main(counts):
+    print(f"{'任务数':>10} {'Task对象':>14} {'TaskStore':>14} {'节省':>8} {'其中标题':>12}")
+    for count in counts:
+        objects = measure(build_objects, count)
+        store = measure(build_store, count)
+        titles = measure(build_titles_only, count)
+        saved = 1 - store / objects
+        print(f"{count:>10} {objects / 2**20:>11.1f} MB {store / 2**20:>11.1f} MB {saved:>7.0%} {titles / 2**20:>9.1f} MB")
+        print(f"{'':>10} {objects / count:>10.0f} B/行 {store / count:>10.0f} B/行")
+
+
+if __name__ == "__main__":
+    main([int(arg) for arg in sys.argv[1:]] or [100_000, 1_000_000])
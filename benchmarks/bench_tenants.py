@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""
+租户数增加时单个租户的请求延迟（内置 asyncio 服务器，按 X-Tenant-Id 路由）
+
+对每个租户数 N：先让 N 个租户各写入一条任务（超出 TODO_TENANT_CAPACITY 的租户
+会被陆续关闭），再用多个保持连接的线程读取活动任务：
+- 热租户：固定的 HOT_TENANTS 个租户，始终留在 LRU 中
+- 随机租户：从 N 个租户中均匀选取，N 大于容量时多数请求需要重新打开数据库
+打印两类请求的 p50/p99 延迟、进程线程数以及注册表的打开/淘汰次数。
+
+用法: python benchmarks/bench_tenants.py [租户数 ...]（默认 1 32 256 1024）
+      [--requests 2000] [--threads 8]
+"""
+import argparse
+import http.client
+import json
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+
+# 添加项目根目录到Python路径
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+HOT_TENANTS = 4
+
+
+def _percentile(values, p):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * p))] * 1000
+
+
+def _run(port, tenants, requests, threads, method="GET", path="/api/tasks", body=None):
+    latencies = []
+    lock = threading.Lock()
+    per_thread = requests // threads
+
+    def worker(seed):
+        rng = random.Random(seed)
+        conn = http.client.HTTPConnection("127.0.0.1", port, timeout=30)
+        local = []
+        for _ in range(per_thread):
+            headers = {"X-Tenant-Id": tenants(rng), "Content-Type": "application/json"}
+            start = time.perf_counter()
+            conn.request(method, path, body=body, headers=headers)
+            response = conn.getresponse()
+            response.read()
+            local.append(time.perf_counter() - start)
+        conn.close()
+        with lock:
+            latencies.extend(local)
+
+    workers = [threading.Thread(target=worker, args=(i,)) for i in range(threads)]
+    for thread in workers:
+        thread.start()
+    for thread in workers:
+        thread.join()
+    return latencies
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("counts", nargs="*", type=int, default=[1, 32, 256, 1024])
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--threads", type=int, default=8)
+    args = parser.parse_args()
+
+    from database.tenants import get_tenant_registry
+    from server import fallback
+
+    root = tempfile.mkdtemp()
+    fallback.DB_PATH = os.path.join(root, "tasks.db")
+    fallback.TENANT_DIR = os.path.join(root, "tenants")
+    server = fallback.start_in_thread()
+    registry = get_tenant_registry(fallback.TENANT_DIR)
+    created = 0
+    print(f"容量 {registry.capacity}，每个租户 {registry.readers} 个读线程")
+    print(f"{'租户数':>6} {'热p50(ms)':>10} {'热p99(ms)':>10} {'随机p50(ms)':>12} {'随机p99(ms)':>12} "
+          f"{'线程数':>6} {'打开':>6} {'淘汰':>6}")
+    try:
+        for count in args.counts:
+            names = [f"tenant-{i:05d}" for i in range(count)]
+            # 新租户各写入一条任务
+            new = names[created:]
+            if new:
+                iterator = iter(new)
+                lock = threading.Lock()
+
+                def next_tenant(rng):
+                    with lock:
+                        return next(iterator, names[0])
+
+                _run(server.port, next_tenant, len(new) + args.threads - len(new) % args.threads, args.threads,
+                     "POST", "/api/tasks", json.dumps({"title": "任务"}))
+                created = count
+            hot = names[:HOT_TENANTS]
+            hot_latencies = _run(server.port, lambda rng: rng.choice(hot), args.requests, args.threads)
+            random_latencies = _run(server.port, lambda rng: rng.choice(names), args.requests, args.threads)
+            stats = registry.stats()
+            print(f"{count:>6} {_percentile(hot_latencies, 0.5):>10.2f} {_percentile(hot_latencies, 0.99):>10.2f} "
+                  f"{_percentile(random_latencies, 0.5):>12.2f} {_percentile(random_latencies, 0.99):>12.2f} "
+                  f"{threading.active_count():>6} {stats['opens']:>6} {stats['evictions']:>6}")
+    finally:
+        server.stop()
+        registry.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,5 +1,8 @@
 from PySide6.QtCore import QObject, Signal, Slot
 
+from database.pagination import DEFAULT_PAGE_LIMIT
+from database.search import DEFAULT_SEARCH_LIMIT
+
 class TaskController(QObject):
     # 信号
     taskUpdated = Signal()
@@ -40,6 +43,14 @@ class TaskController(QObject):
         self.task_model.moveTaskToQuadrant(task_id, new_quadrant)
         self._emit_update()
     
+    @Slot(int, int, int, result=bool)
+    def moveTaskBetween(self, task_id, before_id, after_id):
+        """拖放排序：把任务放到两个任务之间（-1 表示该侧没有任务）"""
+        moved = self.task_model.moveTaskBetween(task_id, before_id, after_id)
+        if moved:
+            self._emit_update()
+        return moved
+    
     @Slot()
     def refreshTasks(self):
         """刷新任务列表"""
@@ -54,6 +65,16 @@ class TaskController(QObject):
         print(f"控制器 - getTasksForQuadrant({quadrant}) 返回 {len(tasks)} 个任务")
         return tasks
     
+    @Slot(int, result=QObject)
+    def quadrantModel(self, quadrant):
+        """获取指定象限的实时列表模型，QML绑定一次即可收到增量更新"""
+        return self.task_model.quadrantModel(quadrant)
+    
+    @Slot(result=QObject)
+    def completedModel(self):
+        """获取已完成任务的分页列表模型，完成、取消完成和清空时增量更新"""
+        return self.task_model.completedModel()
+    
     @Slot(result='QVariant')
     def getAllTasks(self):
         """获取所有任务列表
@@ -67,6 +88,16 @@ class TaskController(QObject):
         """获取已完成任务列表"""
         return self.task_model.getCompletedTasks()
     
+    @Slot(str, result='QVariant')
+    def searchTasks(self, query):
+        """全文搜索任务，返回按相关度排序、带高亮标题和摘要的结果"""
+        return self.task_model.searchTasks(query, DEFAULT_SEARCH_LIMIT)
+    
+    @Slot(str, result='QVariant')
+    def getArchivedTasks(self, after):
+        """按完成时间倒序读取一页归档任务，返回 {tasks, nextCursor}"""
+        return self.task_model.getArchivedTasks(after, DEFAULT_PAGE_LIMIT)
+    
     @Slot(int, int)
     def updateTaskOrder(self, task_id, new_order_index):
         """更新任务排序"""
@@ -0,0 +1,134 @@
+"""已完成任务的冷归档
+
+完成时间（tasks.completed_at，迁移7）早于 TODO_ARCHIVE_AFTER_DAYS 天的任务
+被移出 tasks 表，tasks 中只留下活动任务和最近完成的任务：
+- 每次最多取 SEGMENT_SIZE 个任务（按完成时间），整批 JSON 用 zlib 压缩后
+  存为 archive_segments 的一行；同批任务相近，一起压缩比逐行压缩小得多
+- archived_tasks 为每个任务记录 (id, completed_at, 所在段)，浏览时在它的索引上
+  按 (completed_at DESC, id DESC) 做键集分页（database.pagination 的 "archived" 列表），
+  再只解压本页用到的段
+- 从 tasks 删除时照常触发变更计数器、变更日志（类型为 deleted）和全文索引的删除，
+  归档后的任务不再出现在搜索结果中
+
+桌面端启动和打开租户时归档一次，服务器运行期间每 ARCHIVE_INTERVAL 秒
+归档一次默认数据库；每段一个事务，不会长时间占用写锁。
+"清空已完成任务"仍然直接删除；立即归档全部已完成任务用 POST /api/archive（olderThanDays=0）。
+
+参数可通过环境变量配置：
+    TODO_ARCHIVE_AFTER_DAYS       完成多少天后归档（默认30）
+    TODO_ARCHIVE_INTERVAL_SECONDS 服务器定期归档的间隔（默认3600）
+"""
+import asyncio
+import json
+import zlib
+
+from database.config import env_int
+from database.pagination import DEFAULT_PAGE_LIMIT, fetch_page
+
+
+ARCHIVE_AFTER_DAYS = env_int("TODO_ARCHIVE_AFTER_DAYS", 30)
+ARCHIVE_INTERVAL = env_int("TODO_ARCHIVE_INTERVAL_SECONDS", 3600)
+# 每段最多的任务数
+SEGMENT_SIZE = 256
+ZLIB_LEVEL = 9
+
+# 段中每个任务保存的字段，顺序即 JSON 数组中的顺序
+ARCHIVED_FIELDS = ("id", "title", "description", "quadrant", "created_at", "completed_at", "order_index")
+_ARCHIVED_COLUMNS = ", ".join(ARCHIVED_FIELDS)
+
+
+def cutoff_modifier(days):
+    """SQLite datetime() 的修饰符：days 天之前"""
+    return f"-{int(days)} days"
+
+
+def encode_segment(rows):
+    return zlib.compress(json.dumps([list(row) for row in rows], ensure_ascii=False,
+                                    separators=(",", ":")).encode(), ZLIB_LEVEL)
+
+
+def segment_records(data):
+    """段内容 -> 按 ARCHIVED_FIELDS 顺序的取值列表"""
+    return json.loads(zlib.decompress(data))
+
+
+def decode_segment(data):
+    """段内容 -> {任务id: 字段字典}"""
+    return {record[0]: dict(zip(ARCHIVED_FIELDS, record)) for record in segment_records(data)}
+
+
+def archive_segment(conn, days=None, limit=SEGMENT_SIZE):
+    """把完成超过 days 天（None 表示全部）的已完成任务中最早的至多 limit 个归档为一段，返回归档的任务数"""
+    if days is None:
+        rows = conn.execute(
+            f"SELECT {_ARCHIVED_COLUMNS} FROM tasks WHERE is_completed = 1 ORDER BY completed_at, id LIMIT ?",
+            (limit,)
+        ).fetchall()
+    else:
+        rows = conn.execute(
+            f"SELECT {_ARCHIVED_COLUMNS} FROM tasks WHERE is_completed = 1 AND completed_at < datetime('now', ?) "
+            "ORDER BY completed_at, id LIMIT ?",
+            (cutoff_modifier(days), limit)
+        ).fetchall()
+    if not rows:
+        return 0
+    segment_id = conn.execute(
+        "INSERT INTO archive_segments (task_count, data) VALUES (?, ?) RETURNING id", (len(rows), encode_segment(rows))
+    ).fetchone()[0]
+    conn.executemany(
+        "INSERT INTO archived_tasks (id, completed_at, segment_id) VALUES (?, ?, ?)",
+        [(row["id"], row["completed_at"], segment_id) for row in rows]
+    )
+    conn.execute(
+        "DELETE FROM tasks WHERE id IN (SELECT value FROM json_each(?))", (json.dumps([row["id"] for row in rows]),)
+    )
+    return len(rows)
+
+
+def archive_all(conn, days=None):
+    """在同一个事务中归档所有符合条件的任务，返回归档的任务数"""
+    total = 0
+    while True:
+        count = archive_segment(conn, days)
+        total += count
+        if count < SEGMENT_SIZE:
+            return total
+
+
+def archive_page(conn, limit=DEFAULT_PAGE_LIMIT, after=None, load_segment=None):
+    """按完成时间倒序读取一页归档任务，返回 (字段字典列表, 下一页游标或None)
+
+    load_segment(段id, 压缩内容) 返回 decode_segment 的结果，可由调用方缓存；缺省时直接解压。
+    """
+    index, next_cursor = fetch_page(conn, "archived", "id, completed_at, segment_id", limit, after)
+    segment_ids = sorted({row["segment_id"] for row in index})
+    segments = {}
+    for segment_id, data in conn.execute(
+        "SELECT id, data FROM archive_segments WHERE id IN (SELECT value FROM json_each(?))",
+        (json.dumps(segment_ids),)
+    ):
+        segments[segment_id] = load_segment(segment_id, data) if load_segment else decode_segment(data)
+    return [segments[row["segment_id"]][row["id"]] for row in index], next_cursor
+
+
+def archive_stats(conn):
+    count, segments, size = conn.execute(
+        "SELECT COALESCE(SUM(task_count), 0), COUNT(*), COALESCE(SUM(length(data)), 0) FROM archive_segments"
+    ).fetchone()
+    return {"tasks": count, "segments": segments, "compressedBytes": size}
+
+
+async def archive_periodically(get_repo, interval=ARCHIVE_INTERVAL, days=ARCHIVE_AFTER_DAYS):
+    """异步服务器的后台任务：每 interval 秒在写通道上逐段归档 get_repo() 的到期任务
+
+    第一次归档在启动 interval 秒之后，不与启动时的请求争用写通道。
+    get_repo 在线程中调用：首次打开仓库会执行迁移，不能阻塞事件循环。
+    """
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            repo = await asyncio.to_thread(get_repo)
+            while await repo.db.write(repo.archive, days) == SEGMENT_SIZE:
+                pass
+        except Exception as e:
+            print(f"归档失败: {e}")
@@ -0,0 +1,173 @@
+"""批量修改任务
+
+POST /api/tasks/batch 在两个Web服务器中共用的实现。请求体：
+    {"operations": [
+        {"op": "create", "title": "...", "description": "...", "quadrant": 1},
+        {"op": "update", "id": 3, "title": "...", "description": "..."},
+        {"op": "move", "id": 3, "quadrant": 2},
+        {"op": "complete", "id": 3, "completed": true},
+        {"op": "delete", "id": 3}
+    ]}
+
+全部操作在同一个写事务中执行，只提交（fsync）一次。操作按原顺序处理，
+相邻的同类操作合并为一次 executemany。每个操作都有对应的结果：
+格式错误或目标任务不存在的操作不会执行，只在结果中报告错误，
+不影响其余操作。
+"""
+
+from database.ranking import TOP_RANK_SQL
+
+MAX_BATCH_OPERATIONS = 10000
+
+# 每类操作对应的SQL及从操作中取参数的方式
+_STATEMENTS = {
+    "create": f"INSERT INTO tasks (title, description, quadrant, order_index) VALUES (?, ?, ?, {TOP_RANK_SQL})",
+    "update": "UPDATE tasks SET title = COALESCE(?, title), description = COALESCE(?, description) WHERE id = ?",
+    "move": f"UPDATE tasks SET quadrant = ?, order_index = {TOP_RANK_SQL} WHERE id = ? AND quadrant IS NOT ?",
+    "complete": "UPDATE tasks SET is_completed = ? WHERE id = ?",
+    "delete": "DELETE FROM tasks WHERE id = ?",
+}
+
+# SQLite 单条语句的参数个数有限，按id批量查询时分块
+_ID_CHUNK = 500
+
+
+class BatchError(ValueError):
+    """请求体整体无效（不是操作列表或操作过多）"""
+
+
+def _is_int(value):
+    return isinstance(value, int) and not isinstance(value, bool)
+
+
+def _optional_str(value):
+    return value is None or isinstance(value, str)
+
+
+def _params(operation):
+    """校验单个操作，返回 (操作类型, 目标任务id, SQL参数)；无效时抛出 ValueError"""
+    if not isinstance(operation, dict):
+        raise ValueError("operation must be an object")
+    op = operation.get("op")
+    if op not in _STATEMENTS:
+        raise ValueError(f"unknown op: {op}")
+    if op == "create":
+        title = operation.get("title")
+        description = operation.get("description", "")
+        quadrant = operation.get("quadrant", 4)
+        if not isinstance(title, str) or not title.strip():
+            raise ValueError("title required")
+        if not isinstance(description, str):
+            raise ValueError("description must be a string")
+        if not _is_int(quadrant) or not 1 <= quadrant <= 4:
+            raise ValueError("quadrant must be 1-4")
+        return op, None, (title, description, quadrant, quadrant)
+
+    task_id = operation.get("id")
+    if not _is_int(task_id):
+        raise ValueError("id required")
+    if op == "update":
+        title = operation.get("title")
+        description = operation.get("description")
+        if not _optional_str(title) or not _optional_str(description):
+            raise ValueError("title and description must be strings")
+        if title is not None and not title.strip():
+            raise ValueError("title must not be empty")
+        return op, task_id, (title, description, task_id)
+    if op == "move":
+        quadrant = operation.get("quadrant")
+        if not _is_int(quadrant) or not 1 <= quadrant <= 4:
+            raise ValueError("quadrant must be 1-4")
+        return op, task_id, (quadrant, quadrant, task_id, quadrant)
+    if op == "complete":
+        return op, task_id, (1 if operation.get("completed", True) else 0, task_id)
+    return op, task_id, (task_id,)
+
+
+def _existing_ids(conn, task_ids):
+    existing = set()
+    task_ids = list(task_ids)
+    for start in range(0, len(task_ids), _ID_CHUNK):
+        chunk = task_ids[start:start + _ID_CHUNK]
+        placeholders = ", ".join("?" * len(chunk))
+        existing.update(row[0] for row in conn.execute(
+            f"SELECT id FROM tasks WHERE id IN ({placeholders})", chunk
+        ))
+    return existing
+
+
+def _fetch_rows(conn, task_ids):
+    rows = {}
+    task_ids = list(task_ids)
+    for start in range(0, len(task_ids), _ID_CHUNK):
+        chunk = task_ids[start:start + _ID_CHUNK]
+        placeholders = ", ".join("?" * len(chunk))
+        rows.update((row["id"], row) for row in conn.execute(
+            f"SELECT * FROM tasks WHERE id IN ({placeholders})", chunk
+        ))
+    return rows
+
+
+def apply_batch(conn, operations, to_task):
+    """在写连接 conn 上执行一批操作，返回与 operations 一一对应的结果列表
+
+    to_task 把 sqlite3.Row 转换为接口返回的任务字典。
+    调用方负责在外层提交或回滚（连接池写连接退出时自动处理）。
+    """
+    if not isinstance(operations, list):
+        raise BatchError("operations must be a list")
+    if len(operations) > MAX_BATCH_OPERATIONS:
+        raise BatchError(f"at most {MAX_BATCH_OPERATIONS} operations per batch")
+
+    results = [None] * len(operations)
+    parsed = []
+    for index, operation in enumerate(operations):
+        try:
+            parsed.append((index,) + _params(operation))
+        except ValueError as e:
+            results[index] = {"op": operation.get("op") if isinstance(operation, dict) else None,
+                              "ok": False, "error": str(e)}
+
+    if not conn.in_transaction:
+        # 先拿到写锁，存在性检查与后续修改处于同一事务
+        conn.execute("BEGIN IMMEDIATE")
+    existing = _existing_ids(conn, {task_id for _, _, task_id, _ in parsed if task_id is not None})
+
+    # 按顺序把相邻的同类操作合并成一组
+    runs = []
+    for item in parsed:
+        if runs and runs[-1][0] == item[1]:
+            runs[-1][1].append(item)
+        else:
+            runs.append((item[1], [item]))
+
+    for op, items in runs:
+        params = []
+        applied = []
+        for index, _, task_id, values in items:
+            if task_id is not None and task_id not in existing:
+                results[index] = {"op": op, "id": task_id, "ok": False, "error": "not found"}
+                continue
+            if op == "delete":
+                existing.discard(task_id)
+            params.append(values)
+            applied.append((index, task_id))
+        if not params:
+            continue
+        conn.executemany(_STATEMENTS[op], params)
+        if op == "create":
+            # 同一事务内连续插入，新id是连续的，最后一个即 last_insert_rowid()
+            last_id = conn.execute("SELECT last_insert_rowid()").fetchone()[0]
+            first_id = last_id - len(params) + 1
+            applied = [(index, first_id + offset) for offset, (index, _) in enumerate(applied)]
+            existing.update(task_id for _, task_id in applied)
+        for index, task_id in applied:
+            results[index] = {"op": op, "id": task_id, "ok": True}
+
+    # 一次读回所有仍存在的任务，作为结果中的最新状态
+    touched = {result["id"] for result in results if result and result["ok"] and result["op"] != "delete"}
+    rows = _fetch_rows(conn, touched)
+    for result in results:
+        if result and result["ok"] and result["id"] in rows and result["op"] != "delete":
+            result["task"] = to_task(rows[result["id"]])
+    return results
@@ -0,0 +1,303 @@
+"""批量导入任务（NDJSON / CSV / todo.txt）
+
+逐个调用 TaskModel.addTask 导入时，每个任务都要单独插入、提交、再查询一次，
+还要逐行触发修改计数器、变更日志、全文索引和 completed_at 触发器，并维护三个二级索引。
+这里把整个导入放在一个写事务中，解析器逐行读取，产出任务字段，不把文件整个读入内存；
+每 BULK_BATCH 个任务一次 executemany，每批之后回调 progress(已导入数)。
+
+不超过 SMALL_IMPORT 个任务的导入保留触发器和索引，逐行照常维护，
+写锁只占用不到一秒，可以在桌面端和Web服务器运行时进行。
+
+更大的导入是离线操作，应先关闭桌面端和Web服务器：
+- 导入期间暂时删除 tasks 上的插入触发器和二级索引（定义从 sqlite_master 读出），
+  插入结束后一次性补做它们的工作：两个全文索引各用一条 INSERT ... SELECT 建立，
+  修改计数器只加一，列表任务数（task_counts）按导入的任务一次加上，二级索引重建
+- 变更日志不逐条记录，只追加一条 reset 标记，
+  正在推送的连接会收到 reset 事件并重新加载列表（见 database.changes）
+- 写锁在整个导入期间都被占用（百万任务约20秒），远超过其他连接的等待时间
+  （database.pool.BUSY_TIMEOUT_MS），这期间其他进程的写入会以 "database is locked" 失败。
+  开始时不等待写锁：其他连接正在写入时抛出 ImportBusy，不会排在它后面再占用写锁；
+  空闲的连接无法发现，所以仍需先关闭其他进程
+
+整个导入是一个事务：任何一行格式错误都会抛出 InvalidImport，已插入的任务、
+被删除的触发器和索引随回滚一起恢复。
+
+导入的任务使用新的id。文件中的 orderIndex 原样保留，没有时按文件顺序排在
+所在象限已有任务之后；导出文件中的归档任务导入为已完成任务。
+"""
+import csv
+import itertools
+import json
+import os
+import re
+import sqlite3
+
+from database.changes import mark_reset
+from database.migrations import ensure_schema, search_grams_sql
+from database.pool import BUSY_TIMEOUT_MS, get_pool
+from database.ranking import RANK_STEP
+
+# 每次 executemany 的任务数
+BULK_BATCH = 50000
+# 不超过这么多任务时保留触发器和索引（五千个任务约0.5秒）
+SMALL_IMPORT = 5000
+
+# 导入期间删除、结束后补做的插入触发器；其他插入触发器照常逐行执行
+_DEFERRED_TRIGGERS = ("tasks_version_insert", "task_changes_insert", "tasks_fts_insert", "tasks_fts_short_insert",
+                      "tasks_completed_at_insert", "task_counts_insert")
+# 导入结束后重建的二级索引
+_DEFERRED_INDEXES = ("idx_tasks_active", "idx_tasks_completed", "idx_tasks_completed_at")
+
+_INSERT_SQL = (
+    "INSERT INTO tasks (title, description, quadrant, is_completed, created_at, completed_at, order_index) "
+    "VALUES (?, ?, ?, ?, ?, ?, ?)"
+)
+
+
+class InvalidImport(ValueError):
+    """导入文件中的某一行无法解析，消息中带有行号"""
+
+    def __init__(self, line, message):
+        super().__init__(f"line {line}: {message}")
+        self.line = line
+
+
+class ImportBusy(Exception):
+    """离线导入开始时其他连接正在写入数据库"""
+
+
+# ---- 解析器：输入文本行，逐个产出 (行号, 字段字典) ----
+
+def parse_ndjson(lines):
+    for number, line in enumerate(lines, 1):
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            payload = json.loads(line)
+        except ValueError:
+            raise InvalidImport(number, "invalid JSON")
+        if not isinstance(payload, dict):
+            raise InvalidImport(number, "each line must be an object")
+        yield number, payload
+
+
+def parse_csv(lines):
+    """带表头的 CSV，列名同导出（database.export.EXPORT_FIELDS），至少要有 title 列"""
+    reader = csv.DictReader(lines)
+    if reader.fieldnames is None or "title" not in reader.fieldnames:
+        raise InvalidImport(1, "CSV header must contain a title column")
+    for row in reader:
+        yield reader.line_num, {name: value for name, value in row.items() if value != "" and name is not None}
+
+
+_TODO_DATE = re.compile(r"(\d{4}-\d{2}-\d{2}) ")
+_TODO_PRIORITY = re.compile(r"\(([A-Z])\) ")
+_TODO_PRI_TAG = re.compile(r"(?:^| )pri:([A-Z])(?= |$)")
+# todo.txt 的优先级对应象限：A 重要且紧急 ... 其余都放在第四象限
+_PRIORITY_QUADRANTS = {"A": 1, "B": 2, "C": 3}
+
+
+def parse_todotxt(lines):
+    """todo.txt 格式：[x [完成日期] ][(优先级) ][创建日期 ]内容
+
+    已完成任务的优先级也可以写成 pri:A 标签。项目（+x）和上下文（@x）标签保留在标题中。
+    """
+    for number, line in enumerate(lines, 1):
+        text = line.strip()
+        if not text:
+            continue
+        completed = text.startswith("x ")
+        completed_at = created_at = None
+        if completed:
+            text = text[2:]
+            match = _TODO_DATE.match(text)
+            if match:
+                completed_at, text = match.group(1), text[match.end():]
+        match = _TODO_PRIORITY.match(text)
+        priority = None
+        if match:
+            priority, text = match.group(1), text[match.end():]
+        match = _TODO_DATE.match(text)
+        if match:
+            created_at, text = match.group(1), text[match.end():]
+        match = _TODO_PRI_TAG.search(text)
+        if match:
+            priority = priority or match.group(1)
+            text = (text[:match.start()] + text[match.end():]).strip()
+        yield number, {
+            "title": text,
+            "quadrant": _PRIORITY_QUADRANTS.get(priority, 4),
+            "isCompleted": completed,
+            "createdAt": f"{created_at} 00:00:00" if created_at else None,
+            "completedAt": f"{completed_at} 00:00:00" if completed_at else None,
+        }
+
+
+PARSERS = {
+    "ndjson": parse_ndjson,
+    "csv": parse_csv,
+    "todotxt": parse_todotxt,
+}
+# 文件扩展名 -> 格式
+EXTENSIONS = {".ndjson": "ndjson", ".jsonl": "ndjson", ".csv": "csv", ".txt": "todotxt"}
+
+
+def detect_format(path):
+    fmt = EXTENSIONS.get(os.path.splitext(path)[1].lower())
+    if fmt is None:
+        raise ValueError(f"cannot detect format of {path}; use one of: {', '.join(PARSERS)}")
+    return fmt
+
+
+# ---- 字段校验 ----
+
+def _bool(number, value):
+    if isinstance(value, bool):
+        return value
+    if value in (None, 0, 1):
+        return bool(value)
+    if isinstance(value, str) and value.lower() in ("0", "1", "true", "false"):
+        return value.lower() in ("1", "true")
+    raise InvalidImport(number, "isCompleted must be a boolean")
+
+
+def _quadrant(number, value):
+    if value is None:
+        return 4
+    try:
+        quadrant = int(value)
+    except (TypeError, ValueError):
+        quadrant = None
+    if isinstance(value, bool) or quadrant not in (1, 2, 3, 4) or str(quadrant) != str(value).strip():
+        raise InvalidImport(number, "quadrant must be 1-4")
+    return quadrant
+
+
+def _text(number, value, name):
+    if value is None or isinstance(value, str):
+        return value
+    raise InvalidImport(number, f"{name} must be a string")
+
+
+def _rank(number, value):
+    if value is None:
+        return None
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        raise InvalidImport(number, "orderIndex must be a number")
+
+
+def _rows(parsed, now, ranks):
+    """字段字典 -> INSERT 参数"""
+    for number, fields in parsed:
+        title = _text(number, fields.get("title"), "title")
+        if not title or not title.strip():
+            raise InvalidImport(number, "title required")
+        quadrant = _quadrant(number, fields.get("quadrant"))
+        completed = _bool(number, fields.get("isCompleted"))
+        created_at = _text(number, fields.get("createdAt"), "createdAt") or now
+        completed_at = (_text(number, fields.get("completedAt"), "completedAt") or now) if completed else None
+        rank = _rank(number, fields.get("orderIndex"))
+        if rank is None:
+            rank = ranks[quadrant] = ranks[quadrant] + RANK_STEP
+        yield (title.strip(), _text(number, fields.get("description"), "description") or "", quadrant,
+               int(completed), created_at, completed_at, rank)
+
+
+# ---- 导入 ----
+
+def _suspend(conn):
+    """删除要推迟的触发器和索引，返回它们的定义"""
+    names = _DEFERRED_TRIGGERS + _DEFERRED_INDEXES
+    saved = conn.execute(
+        f"SELECT type, name, sql FROM sqlite_master WHERE name IN ({', '.join('?' * len(names))})", names
+    ).fetchall()
+    for kind, name, _ in saved:
+        conn.execute(f"DROP {kind.upper()} {name}")
+    return saved
+
+
+def bulk_insert(conn, parsed, progress=None, batch=BULK_BATCH, defer=True):
+    """在 conn 当前的写事务中导入 parsed（解析器的输出），返回导入的任务数
+
+    defer 为 False 时保留触发器和索引，逐行照常维护。
+    """
+    now = conn.execute("SELECT CURRENT_TIMESTAMP").fetchone()[0]
+    # AUTOINCREMENT：新任务的id都大于导入前的最大id
+    last_id = conn.execute("SELECT COALESCE(MAX(id), 0) FROM tasks").fetchone()[0]
+    ranks = {quadrant: 0.0 for quadrant in range(1, 5)}
+    ranks.update(conn.execute(
+        "SELECT quadrant, MAX(order_index) FROM tasks WHERE is_completed = 0 GROUP BY quadrant"
+    ).fetchall())
+    saved = _suspend(conn) if defer else []
+    rows = _rows(parsed, now, ranks)
+    total = 0
+    while True:
+        chunk = list(itertools.islice(rows, batch))
+        if not chunk:
+            break
+        conn.executemany(_INSERT_SQL, chunk)
+        total += len(chunk)
+        if progress is not None:
+            progress(total)
+    if total and defer:
+        conn.execute(
+            "INSERT INTO tasks_fts (rowid, title, description) SELECT id, title, description FROM tasks WHERE id > ?",
+            (last_id,)
+        )
+        conn.execute(
+            f"INSERT INTO tasks_fts_short (rowid, grams) SELECT id, {search_grams_sql('tasks')} FROM tasks WHERE id > ?",
+            (last_id,)
+        )
+        conn.execute(
+            "UPDATE task_counts SET count = count + (SELECT COUNT(*) FROM tasks WHERE id > ? "
+            "AND is_completed = CASE listing WHEN 'active' THEN 0 ELSE 1 END) WHERE listing IN ('active', 'completed')",
+            (last_id,)
+        )
+        # 导入的任务不逐条记录：正在推送的连接读到标记后收到 reset，重新加载
+        mark_reset(conn)
+        conn.execute(
+            "UPDATE tasks_version SET version = version + 1, "
+            "modified_at = (julianday('now') - 2440587.5) * 86400.0 WHERE id = 1"
+        )
+    for _, _, sql in saved:
+        conn.execute(sql)
+    return total
+
+
+def _begin_offline(conn):
+    """不等待地取得写锁，其他连接正在写入时抛出 ImportBusy"""
+    conn.execute("PRAGMA busy_timeout = 0")
+    try:
+        conn.execute("BEGIN IMMEDIATE")
+    except sqlite3.OperationalError as e:
+        raise ImportBusy("database is busy; stop the desktop app and web servers before a large import") from e
+    finally:
+        conn.execute(f"PRAGMA busy_timeout = {BUSY_TIMEOUT_MS}")
+
+
+def import_tasks(db_path, parsed, progress=None, batch=BULK_BATCH, small_limit=SMALL_IMPORT):
+    """把解析器的输出导入数据库（一个事务），返回导入的任务数
+
+    先解析前 small_limit + 1 个任务：没有更多时按小批量导入，否则离线导入。
+    """
+    ensure_schema(db_path)
+    head = list(itertools.islice(parsed, small_limit + 1))
+    small = len(head) <= small_limit
+    parsed = itertools.chain(head, parsed)
+    with get_pool(db_path).writer() as conn:
+        if not conn.in_transaction:
+            if small:
+                conn.execute("BEGIN IMMEDIATE")
+            else:
+                _begin_offline(conn)
+        return bulk_insert(conn, parsed, progress, batch, defer=not small)
+
+
+def import_file(db_path, path, fmt=None, progress=None, batch=BULK_BATCH, small_limit=SMALL_IMPORT):
+    """导入文件；fmt 为 None 时按扩展名判断格式"""
+    parser = PARSERS[fmt or detect_format(path)]
+    with open(path, encoding="utf-8-sig", newline="") as lines:
+        return import_tasks(db_path, parser(lines), progress, batch, small_limit)
@@ -0,0 +1,83 @@
+"""任务变更日志与服务器推送事件（SSE）
+
+迁移5建立的 task_changes 表由触发器维护：桌面端、两个Web服务器、
+批量接口的每次写入都会为受影响的任务追加一条 (序号, 任务id, 类型)，
+类型为 created / updated / moved / completed / deleted。
+completed 表示完成状态变化（包括取消完成），以事件中任务的 isCompleted 为准。
+
+两个服务器的 /api/events 都用这里的函数读取日志：连接建立时从当前最新
+序号开始（或从浏览器重连时带来的 Last-Event-ID 继续），之后每次
+tasks_version 变化就读取新的记录，按 SSE 格式推送：
+    id: <序号>
+    data: {"type": "moved", "id": 3, "task": {...当前状态，已删除时为null}}
+
+重连时请求的序号已被清理出日志，则推送一条 reset 事件，客户端重新加载列表。
+不逐条记录变更的写入（批量导入，见 database.bulk_import）在日志中追加一条
+类型为 reset 的标记（mark_reset），位置在标记之前的连接同样收到 reset 事件。
+"""
+import json
+
+from database.pagination import TASK_JSON_SQL
+
+# 数据无变化时每隔多少秒检查一次版本号
+POLL_INTERVAL = 0.5
+# 空闲连接发送注释行的间隔，及时发现已断开的连接、防止代理超时
+HEARTBEAT_INTERVAL = 15.0
+# 每次最多读取的日志条数
+CHANGE_BATCH = 500
+
+HEARTBEAT = b": ping\n\n"
+
+# 日志中的 reset 标记，task_id 为0
+RESET_KIND = "reset"
+
+
+def latest_seq(conn):
+    return conn.execute("SELECT COALESCE(MAX(seq), 0) FROM task_changes").fetchone()[0]
+
+
+def parse_seq(value):
+    """解析 Last-Event-ID / after 参数，无效时返回None"""
+    try:
+        seq = int(value)
+    except (TypeError, ValueError):
+        return None
+    return seq if seq >= 0 else None
+
+
+def mark_reset(conn):
+    """在 conn 当前的写事务中追加 reset 标记：标记之前的位置都要重新加载"""
+    conn.execute("INSERT INTO task_changes (task_id, kind) VALUES (0, ?)", (RESET_KIND,))
+
+
+def read_changes(conn, after, limit=CHANGE_BATCH):
+    """读取序号大于 after 的变更，返回 [(序号, 事件JSON)]
+
+    after 之后的记录已被清理，或其中有 reset 标记时返回 None，调用方应推送 reset 事件。
+    """
+    oldest = conn.execute("SELECT MIN(seq) FROM task_changes").fetchone()[0]
+    if oldest is not None and oldest > after + 1:
+        return None
+    if conn.execute("SELECT 1 FROM task_changes WHERE seq > ? AND kind = ? LIMIT 1", (after, RESET_KIND)).fetchone():
+        return None
+    # 任务内容取当前状态：同一任务连续变化时，较早的事件也带着最新内容，客户端按最后状态渲染即可
+    return conn.execute(f'''
+    SELECT c.seq, json_object(
+        'type', c.kind,
+        'id', c.task_id,
+        'task', CASE WHEN t.id IS NULL THEN NULL ELSE json({TASK_JSON_SQL}) END
+    )
+    FROM task_changes c LEFT JOIN tasks t ON t.id = c.task_id
+    WHERE c.seq > ?
+    ORDER BY c.seq
+    LIMIT ?
+    ''', (after, limit)).fetchall()
+
+
+def sse_event(seq, data):
+    return f"id: {seq}\ndata: {data}\n\n".encode()
+
+
+def reset_event(seq):
+    """日志已不完整：告诉客户端重新加载，并从 seq 继续"""
+    return f"id: {seq}\nevent: reset\ndata: {{}}\n\n".encode()
@@ -0,0 +1,19 @@
+"""从环境变量读取数值参数（各模块的 TODO_* 配置共用）
+
+值无效时使用默认值；env_int 至少为1，env_float 至少为0。
+"""
+import os
+
+
+def env_int(name, default):
+    try:
+        return max(1, int(os.environ.get(name, default)))
+    except ValueError:
+        return default
+
+
+def env_float(name, default):
+    try:
+        return max(0.0, float(os.environ.get(name, default)))
+    except ValueError:
+        return default
@@ -0,0 +1,292 @@
+"""数据库执行器
+
+FastAPI 的异步路由不能直接调用阻塞的 sqlite3，否则会卡住事件循环；
+交给 Starlette 默认线程池又会让数据库操作与其他阻塞调用抢同一批线程，
+写请求也只能在连接池的写锁上无序争抢。这里为数据库操作准备专用线程：
+- 读通道：多个线程，每个线程持有连接池中自己的只读连接
+- 写通道：只有一个写线程，写请求按到达顺序（FIFO）排队，并做组提交：
+  一次取出排队中的多个写操作（最多 TODO_DB_COMMIT_BATCH 个，队列不满时
+  可再等待 TODO_DB_COMMIT_WINDOW_MS 毫秒凑批），放在同一个事务中执行、
+  只提交一次。每个操作包在自己的 SAVEPOINT 里，出错只回滚这一个操作，
+  异常只交给它的调用方；提交成功后才把结果交还给各个调用方
+- 每个通道排队的请求数有上限，超过上限的请求在事件循环中等待，
+  不会无限堆积到线程池队列里
+
+线程数、排队上限和组提交参数可通过环境变量配置：
+    TODO_DB_READERS            读通道线程数（默认8）
+    TODO_DB_QUEUE_LIMIT        每个通道最多排队的请求数（默认256）
+    TODO_DB_COMMIT_BATCH       每次提交最多合并的写操作数（默认64，为1时不合并）
+    TODO_DB_COMMIT_WINDOW_MS   凑批的等待时间（默认0：只合并已在排队的操作，不增加延迟）
+"""
+import asyncio
+import collections
+import concurrent.futures
+import os
+import threading
+import time
+import weakref
+from concurrent.futures import ThreadPoolExecutor
+
+from database.config import env_float, env_int
+from database.pool import get_pool
+
+
+DB_READERS = env_int("TODO_DB_READERS", 8)
+DB_QUEUE_LIMIT = env_int("TODO_DB_QUEUE_LIMIT", 256)
+DB_COMMIT_BATCH = env_int("TODO_DB_COMMIT_BATCH", 64)
+DB_COMMIT_WINDOW = env_float("TODO_DB_COMMIT_WINDOW_MS", 0) / 1000
+
+# 批大小分布统计的区间上限
+BATCH_SIZE_BUCKETS = (1, 2, 4, 8, 16, 32, 64)
+
+
+class _Lane:
+    """一组专用线程及其排队上限"""
+
+    def __init__(self, name, workers, queue_limit):
+        self.name = name
+        self.workers = workers
+        self.queue_limit = queue_limit
+        self._executor = ThreadPoolExecutor(workers, thread_name_prefix=f"db-{name}")
+        # asyncio.Semaphore 绑定在首次使用它的事件循环上，每个循环单独一个
+        self._slots = weakref.WeakKeyDictionary()
+        self._lock = threading.Lock()
+        self._in_flight = 0
+        self._completed = 0
+
+    def _semaphore(self, loop):
+        slots = self._slots.get(loop)
+        if slots is None:
+            slots = self._slots[loop] = asyncio.Semaphore(self.workers + self.queue_limit)
+        return slots
+
+    def _count(self, delta, done=0):
+        with self._lock:
+            self._in_flight += delta
+            self._completed += done
+
+    async def run(self, fn, *args):
+        loop = asyncio.get_running_loop()
+        async with self._semaphore(loop):
+            self._count(1)
+            try:
+                return await loop.run_in_executor(self._executor, fn, *args)
+            finally:
+                self._count(-1, 1)
+
+    def stats(self):
+        with self._lock:
+            return {
+                "workers": self.workers,
+                "queueLimit": self.queue_limit,
+                "inFlight": self._in_flight,
+                "completed": self._completed,
+            }
+
+    def shutdown(self, wait=True):
+        self._executor.shutdown(wait=wait)
+
+
+class _GroupCommitLane:
+    """写通道：单个写线程，把排队中的写操作合并到一个事务中提交"""
+
+    name = "writer"
+    workers = 1
+
+    def __init__(self, pool, queue_limit, max_batch, window):
+        self.pool = pool
+        self.queue_limit = queue_limit
+        self.max_batch = max_batch
+        self.window = window
+        self._slots = weakref.WeakKeyDictionary()
+        self._queue = collections.deque()
+        self._ready = threading.Condition()
+        self._closed = False
+        self._in_flight = 0
+        self._completed = 0
+        self._batches = 0
+        self._failed = 0
+        self._commit_failures = 0
+        self._max_batch_seen = 0
+        self._commit_time = 0.0
+        self._sizes = dict.fromkeys(BATCH_SIZE_BUCKETS + (None,), 0)
+        self._thread = threading.Thread(target=self._loop, name="db-writer", daemon=True)
+        self._thread.start()
+
+    def _semaphore(self, loop):
+        slots = self._slots.get(loop)
+        if slots is None:
+            slots = self._slots[loop] = asyncio.Semaphore(self.workers + self.queue_limit)
+        return slots
+
+    async def run(self, fn, args):
+        async with self._semaphore(asyncio.get_running_loop()):
+            future = concurrent.futures.Future()
+            with self._ready:
+                if self._closed:
+                    raise RuntimeError("executor is shut down")
+                self._queue.append((fn, args, future))
+                self._in_flight += 1
+                self._ready.notify()
+            return await asyncio.wrap_future(future)
+
+    def _take(self):
+        """等待并取出下一批；通道关闭且队列为空时返回None"""
+        with self._ready:
+            while not self._queue and not self._closed:
+                self._ready.wait()
+            if not self._queue:
+                return None
+            if self.window and len(self._queue) < self.max_batch:
+                deadline = time.monotonic() + self.window
+                while len(self._queue) < self.max_batch and not self._closed:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self._ready.wait(remaining)
+            return [self._queue.popleft() for _ in range(min(len(self._queue), self.max_batch))]
+
+    def _loop(self):
+        while True:
+            batch = self._take()
+            if batch is None:
+                return
+            self._apply(batch)
+
+    def _apply(self, batch):
+        outcomes = []
+        start = time.perf_counter()
+        try:
+            with self.pool.writer() as conn:
+                if not conn.in_transaction:
+                    conn.execute("BEGIN IMMEDIATE")
+                for fn, args, future in batch:
+                    # 调用方已取消（如客户端断开）的操作不再执行
+                    if not future.set_running_or_notify_cancel():
+                        continue
+                    conn.execute("SAVEPOINT group_commit")
+                    try:
+                        result = fn(conn, *args)
+                    except Exception as e:
+                        conn.execute("ROLLBACK TO group_commit")
+                        conn.execute("RELEASE group_commit")
+                        outcomes.append((future, None, e))
+                    else:
+                        conn.execute("RELEASE group_commit")
+                        outcomes.append((future, result, None))
+        except Exception as e:
+            # 提交失败时整批都没有写入，每个调用方都收到这个异常
+            outcomes = [
+                (future, None, e) for _, _, future in batch
+                if future.running() or future.set_running_or_notify_cancel()
+            ]
+            commit_failed = True
+        else:
+            commit_failed = False
+        elapsed = time.perf_counter() - start
+
+        with self._ready:
+            self._in_flight -= len(batch)
+            self._completed += len(batch)
+            self._batches += 1
+            self._commit_time += elapsed
+            self._failed += sum(1 for _, _, error in outcomes if error is not None)
+            self._commit_failures += commit_failed
+            self._max_batch_seen = max(self._max_batch_seen, len(batch))
+            bucket = next((limit for limit in BATCH_SIZE_BUCKETS if len(batch) <= limit), None)
+            self._sizes[bucket] += 1
+        for future, result, error in outcomes:
+            if error is None:
+                future.set_result(result)
+            else:
+                future.set_exception(error)
+
+    def stats(self):
+        with self._ready:
+            labels = [f"<={limit}" for limit in BATCH_SIZE_BUCKETS] + [f">{BATCH_SIZE_BUCKETS[-1]}"]
+            return {
+                "workers": self.workers,
+                "queueLimit": self.queue_limit,
+                "inFlight": self._in_flight,
+                "queued": len(self._queue),
+                "completed": self._completed,
+                "groupCommit": {
+                    "maxBatch": self.max_batch,
+                    "windowMs": self.window * 1000,
+                    "batches": self._batches,
+                    "failed": self._failed,
+                    "commitFailures": self._commit_failures,
+                    "largestBatch": self._max_batch_seen,
+                    "meanBatch": self._completed / self._batches if self._batches else 0.0,
+                    "meanCommitMs": self._commit_time * 1000 / self._batches if self._batches else 0.0,
+                    "batchSizes": dict(zip(labels, self._sizes.values())),
+                },
+            }
+
+    def shutdown(self, wait=True):
+        with self._ready:
+            self._closed = True
+            self._ready.notify_all()
+        if wait:
+            self._thread.join()
+
+
+class DatabaseExecutor:
+    """在专用线程上执行数据库操作，供异步代码 await"""
+
+    def __init__(self, pool, readers=DB_READERS, queue_limit=DB_QUEUE_LIMIT,
+                 commit_batch=DB_COMMIT_BATCH, commit_window=DB_COMMIT_WINDOW):
+        self.pool = pool
+        self._read_lane = _Lane("reader", readers, queue_limit)
+        self._write_lane = _GroupCommitLane(pool, queue_limit, commit_batch, commit_window)
+
+    def _read(self, fn, args):
+        with self.pool.reader() as conn:
+            return fn(conn, *args)
+
+    async def read(self, fn, *args):
+        """在读通道上执行 fn(conn, *args)，conn 为只读连接"""
+        return await self._read_lane.run(self._read, fn, args)
+
+    async def run(self, fn, *args):
+        """在读通道上执行不使用连接池的阻塞调用 fn(*args)（如自带连接的导出），与读操作共用线程和排队上限"""
+        return await self._read_lane.run(fn, *args)
+
+    async def write(self, fn, *args):
+        """在写通道上执行 fn(conn, *args)，所在批次提交后返回；fn 抛出异常时只回滚它自己的修改"""
+        return await self._write_lane.run(fn, args)
+
+    def stats(self):
+        return {"reader": self._read_lane.stats(), "writer": self._write_lane.stats()}
+
+    def shutdown(self, wait=True):
+        self._read_lane.shutdown(wait)
+        self._write_lane.shutdown(wait)
+
+
+_executors = {}
+_executors_lock = threading.Lock()
+
+
+def get_executor(db_path, readers=DB_READERS):
+    """按数据库路径获取共享执行器，连接池重建后执行器随之重建
+
+    readers 只在创建执行器时生效。
+    """
+    pool = get_pool(db_path)
+    with _executors_lock:
+        executor = _executors.get(pool.db_path)
+        if executor is None or executor.pool is not pool:
+            if executor is not None:
+                executor.shutdown(wait=False)
+            executor = DatabaseExecutor(pool, readers=readers)
+            _executors[pool.db_path] = executor
+        return executor
+
+
+def close_executor(db_path, wait=True):
+    """关闭并移除指定数据库的执行器；wait 为真时等待排队的写操作全部提交"""
+    with _executors_lock:
+        executor = _executors.pop(os.path.abspath(db_path), None)
+    if executor is not None:
+        executor.shutdown(wait)
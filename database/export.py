@@ -0,0 +1,184 @@
+"""任务导出（NDJSON / CSV）
+
+GET /api/tasks/export 和 main.py --mode export 共用。导出内容是全部任务：
+先是 tasks 表（活动和已完成任务，按id），再是归档中的任务（按段）。
+
+每次导出使用自己的只读连接并开启一个读事务：
+- 整个导出读的是同一个快照，导出期间的写入（包括归档搬移）不会造成重复或遗漏
+- tasks 上只有一个服务器端游标，每次 fetchmany 取 EXPORT_BATCH 行渲染成一块
+  （NDJSON 的行由SQLite直接渲染为JSON）；归档一次只解压一段。内存占用与任务总数无关
+- 连接不属于连接池，也不绑定线程：异步服务器每一块都在执行器的读通道上读取，
+  客户端接收慢时不会占着读线程
+WAL 模式下长时间的读事务不阻塞写入，只是导出结束前检查点无法回收 WAL。
+"""
+import csv
+import io
+import json
+import sqlite3
+import threading
+
+from database.archive import segment_records
+
+# 导出格式 -> Content-Type
+EXPORT_FORMATS = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv; charset=utf-8",
+}
+DEFAULT_EXPORT_FORMAT = "ndjson"
+# 导出的字段（NDJSON 的键、CSV 的列），archived 表示任务在归档中
+EXPORT_FIELDS = ("id", "title", "description", "quadrant", "isCompleted", "createdAt", "completedAt",
+                 "orderIndex", "archived")
+# 每块的行数
+EXPORT_BATCH = 1000
+
+_TASKS_SQL = (
+    "SELECT id, title, description, quadrant, is_completed, created_at, completed_at, order_index "
+    "FROM tasks ORDER BY id"
+)
+# NDJSON 的每一行在SQLite内渲染（字段与 EXPORT_FIELDS 一致），Python 只拼接字符串
+_TASKS_JSON_SQL = """SELECT json_object(
+    'id', id,
+    'title', COALESCE(title, ''),
+    'description', COALESCE(description, ''),
+    'quadrant', quadrant,
+    'isCompleted', json(CASE WHEN is_completed THEN 'true' ELSE 'false' END),
+    'createdAt', created_at,
+    'completedAt', completed_at,
+    'orderIndex', order_index,
+    'archived', json('false')
+) FROM tasks ORDER BY id"""
+
+
+def parse_format(value):
+    """解析 format 参数，缺省为 NDJSON"""
+    if value is None or value == "":
+        return DEFAULT_EXPORT_FORMAT
+    if value not in EXPORT_FORMATS:
+        raise ValueError(f"format must be one of: {', '.join(EXPORT_FORMATS)}")
+    return value
+
+
+def _task_record(row):
+    return (row[0], row[1] if row[1] is not None else "", row[2] if row[2] is not None else "", row[3],
+            bool(row[4]), row[5], row[6], row[7], False)
+
+
+def _archived_record(record):
+    # 段内字段顺序见 database.archive.ARCHIVED_FIELDS
+    task_id, title, description, quadrant, created_at, completed_at, order_index = record
+    return (task_id, title if title is not None else "", description if description is not None else "",
+            quadrant, True, created_at, completed_at, order_index, True)
+
+
+def _csv_value(value):
+    if isinstance(value, bool):
+        return 1 if value else 0
+    return "" if value is None else value
+
+
+def _csv_rows(rows):
+    buffer = io.StringIO()
+    csv.writer(buffer, lineterminator="\r\n").writerows([_csv_value(value) for value in row] for row in rows)
+    return buffer.getvalue().encode()
+
+
+def _ndjson_rows(records):
+    return "".join(
+        json.dumps(dict(zip(EXPORT_FIELDS, record)), ensure_ascii=False) + "\n" for record in records
+    ).encode()
+
+
+class TaskExport:
+    """一次导出；read_chunk 依次返回编码好的数据块，读完后返回 b""
+
+    各方法可以在不同线程中依次调用，不能并发调用。
+    """
+
+    def __init__(self, db_path, fmt=DEFAULT_EXPORT_FORMAT, batch=EXPORT_BATCH):
+        self.format = parse_format(fmt)
+        self.batch = batch
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA query_only = ON")
+        self._conn.execute("BEGIN")
+        self._chunks = self._iter_chunks()
+        self._done = False
+
+    def _iter_chunks(self):
+        ndjson = self.format == "ndjson"
+        if not ndjson:
+            yield _csv_rows([EXPORT_FIELDS])
+        cursor = self._conn.execute(_TASKS_JSON_SQL if ndjson else _TASKS_SQL)
+        while True:
+            rows = cursor.fetchmany(self.batch)
+            if not rows:
+                break
+            if ndjson:
+                yield ("\n".join(row[0] for row in rows) + "\n").encode()
+            else:
+                yield _csv_rows(_task_record(row) for row in rows)
+        # 归档每段一块（最多 SEGMENT_SIZE 个任务）
+        segments = self._conn.execute("SELECT data FROM archive_segments ORDER BY id")
+        while True:
+            segment = segments.fetchone()
+            if segment is None:
+                break
+            records = [_archived_record(record) for record in segment_records(segment[0])]
+            yield _ndjson_rows(records) if ndjson else _csv_rows(records)
+
+    def read_chunk(self):
+        """下一块数据，导出结束时返回 b"" 并关闭连接"""
+        with self._lock:
+            if self._done:
+                return b""
+            chunk = next(self._chunks, b"")
+            if not chunk:
+                self._close()
+            return chunk
+
+    def _close(self):
+        if not self._done:
+            self._done = True
+            self._chunks.close()
+            self._conn.close()
+
+    def close(self):
+        with self._lock:
+            self._close()
+
+    def __iter__(self):
+        """同步逐块迭代（命令行导出）"""
+        try:
+            while True:
+                chunk = self.read_chunk()
+                if not chunk:
+                    return
+                yield chunk
+        finally:
+            self.close()
+
+
+async def export_stream(db, db_path, fmt=DEFAULT_EXPORT_FORMAT):
+    """异步服务器使用：在执行器的读通道上逐块读取，产出字节块
+
+    db 为 DatabaseExecutor；连接也在读通道上打开，流结束或客户端断开时关闭。
+    """
+    export = await db.run(TaskExport, db_path, fmt)
+    try:
+        while True:
+            chunk = await db.run(export.read_chunk)
+            if not chunk:
+                return
+            yield chunk
+    finally:
+        export.close()
+
+
+def export_to_file(db_path, output, fmt=DEFAULT_EXPORT_FORMAT):
+    """把全部任务导出到二进制文件对象 output，返回写出的字节数"""
+    size = 0
+    for chunk in TaskExport(db_path, fmt):
+        output.write(chunk)
+        size += len(chunk)
+    output.flush()
+    return size
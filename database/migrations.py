@@ -0,0 +1,420 @@
+"""数据库结构迁移
+
+以 PRAGMA user_version 记录当前结构版本，桌面端模型与Web服务器启动时
+都调用 ensure_schema()，按顺序执行尚未应用的迁移步骤。
+每个步骤在独立的 IMMEDIATE 事务中执行并同时更新版本号，保证原子性。
+新增结构变更时只需在 MIGRATIONS 末尾追加一个步骤，不要修改已发布的步骤。
+"""
+import os
+import threading
+
+from database.pool import get_pool
+
+
+def _create_tasks_table(conn):
+    """版本1：任务表（兼容早期没有 order_index 列的数据库）"""
+    conn.execute('''
+    CREATE TABLE IF NOT EXISTS tasks (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        title TEXT NOT NULL,
+        description TEXT,
+        quadrant INTEGER DEFAULT 4,
+        is_completed BOOLEAN DEFAULT 0,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        order_index INTEGER DEFAULT 0
+    )
+    ''')
+    columns = conn.execute("PRAGMA table_info(tasks)").fetchall()
+    if not any(column[1] == 'order_index' for column in columns):
+        conn.execute("ALTER TABLE tasks ADD COLUMN order_index INTEGER DEFAULT 0")
+
+
+def _add_task_indexes(conn):
+    """版本2：热点查询的部分索引
+
+    未完成任务的索引包含查询所需的全部列，按象限读取或整体读取时
+    只扫描索引，无需回表也无需临时排序；已完成任务只建排序索引。
+    """
+    conn.execute('''
+    CREATE INDEX IF NOT EXISTS idx_tasks_active
+    ON tasks (quadrant, order_index, created_at DESC, id DESC, title, description, is_completed)
+    WHERE is_completed = 0
+    ''')
+    conn.execute('''
+    CREATE INDEX IF NOT EXISTS idx_tasks_completed
+    ON tasks (created_at DESC, id DESC)
+    WHERE is_completed = 1
+    ''')
+
+
+def _rank_active_tasks(conn):
+    """版本3：order_index 改为小数排序值（见 database.ranking）
+
+    按原有顺序（order_index, created_at DESC, id DESC）给每个象限的活动任务
+    重新等距编号，消除大量任务共用0导致的并列。
+    """
+    conn.execute('''
+    WITH ordered AS (
+        SELECT id, ROW_NUMBER() OVER (
+            PARTITION BY quadrant ORDER BY order_index ASC, created_at DESC, id DESC
+        ) AS position
+        FROM tasks
+        WHERE is_completed = 0
+    )
+    UPDATE tasks SET order_index = ordered.position * 1024.0
+    FROM ordered
+    WHERE tasks.id = ordered.id
+    ''')
+
+
+def _add_change_counter(conn):
+    """版本4：任务表的修改计数器（见 database.versioning）
+
+    tasks 上每插入、修改、删除一行，触发器都把 tasks_version 中唯一一行的
+    version 加一并记录修改时间（Unix秒）。桌面端和两个Web服务器的写入都会
+    经过触发器，列表接口只读这一行就能判断数据是否变化。
+    """
+    conn.execute('''
+    CREATE TABLE IF NOT EXISTS tasks_version (
+        id INTEGER PRIMARY KEY CHECK (id = 1),
+        version INTEGER NOT NULL,
+        modified_at REAL NOT NULL
+    )
+    ''')
+    now = "(julianday('now') - 2440587.5) * 86400.0"
+    conn.execute(f"INSERT OR IGNORE INTO tasks_version (id, version, modified_at) VALUES (1, 1, {now})")
+    for event in ("INSERT", "UPDATE", "DELETE"):
+        conn.execute(f'''
+        CREATE TRIGGER IF NOT EXISTS tasks_version_{event.lower()} AFTER {event} ON tasks
+        BEGIN
+            UPDATE tasks_version SET version = version + 1, modified_at = {now} WHERE id = 1;
+        END
+        ''')
+
+
+def _add_change_log(conn):
+    """版本5：任务变更日志（见 database.changes）
+
+    触发器为每个新建、修改、删除的任务追加一条带递增序号的记录，
+    Web服务器据此向浏览器推送变更事件。没有实际变化的 UPDATE 不记录。
+    日志只保留最近约10000条，每写入1000条清理一次更早的记录。
+    """
+    conn.execute('''
+    CREATE TABLE IF NOT EXISTS task_changes (
+        seq INTEGER PRIMARY KEY AUTOINCREMENT,
+        task_id INTEGER NOT NULL,
+        kind TEXT NOT NULL
+    )
+    ''')
+    conn.execute('''
+    CREATE TRIGGER IF NOT EXISTS task_changes_insert AFTER INSERT ON tasks
+    BEGIN
+        INSERT INTO task_changes (task_id, kind) VALUES (new.id, 'created');
+    END
+    ''')
+    conn.execute('''
+    CREATE TRIGGER IF NOT EXISTS task_changes_update AFTER UPDATE ON tasks
+    WHEN old.title IS NOT new.title OR old.description IS NOT new.description
+        OR old.quadrant IS NOT new.quadrant OR old.order_index IS NOT new.order_index
+        OR old.is_completed IS NOT new.is_completed
+    BEGIN
+        INSERT INTO task_changes (task_id, kind) VALUES (new.id, CASE
+            WHEN old.is_completed IS NOT new.is_completed THEN 'completed'
+            WHEN old.quadrant IS NOT new.quadrant OR old.order_index IS NOT new.order_index THEN 'moved'
+            ELSE 'updated'
+        END);
+    END
+    ''')
+    conn.execute('''
+    CREATE TRIGGER IF NOT EXISTS task_changes_delete AFTER DELETE ON tasks
+    BEGIN
+        INSERT INTO task_changes (task_id, kind) VALUES (old.id, 'deleted');
+    END
+    ''')
+    conn.execute('''
+    CREATE TRIGGER IF NOT EXISTS task_changes_prune AFTER INSERT ON task_changes
+    WHEN new.seq % 1000 = 0
+    BEGIN
+        DELETE FROM task_changes WHERE seq <= new.seq - 10000;
+    END
+    ''')
+
+
+def _add_search_index(conn):
+    """版本6：标题和描述的全文索引（见 database.search）
+
+    tasks_fts 是以 tasks 为外部内容表的 FTS5 索引，不重复保存文本；
+    trigram 分词让中文（没有空格分词）也能按任意子串检索。
+    触发器在插入、删除和标题/描述变化时同步索引，移动、完成等操作不触及索引。
+    已有数据在迁移时一次性建立索引。
+    """
+    conn.execute('''
+    CREATE VIRTUAL TABLE IF NOT EXISTS tasks_fts USING fts5(
+        title, description, content='tasks', content_rowid='id', tokenize='trigram'
+    )
+    ''')
+    conn.execute('''
+    CREATE TRIGGER IF NOT EXISTS tasks_fts_insert AFTER INSERT ON tasks
+    BEGIN
+        INSERT INTO tasks_fts (rowid, title, description) VALUES (new.id, new.title, new.description);
+    END
+    ''')
+    conn.execute('''
+    CREATE TRIGGER IF NOT EXISTS tasks_fts_delete AFTER DELETE ON tasks
+    BEGIN
+        INSERT INTO tasks_fts (tasks_fts, rowid, title, description)
+        VALUES ('delete', old.id, old.title, old.description);
+    END
+    ''')
+    conn.execute('''
+    CREATE TRIGGER IF NOT EXISTS tasks_fts_update AFTER UPDATE ON tasks
+    WHEN old.title IS NOT new.title OR old.description IS NOT new.description
+    BEGIN
+        INSERT INTO tasks_fts (tasks_fts, rowid, title, description)
+        VALUES ('delete', old.id, old.title, old.description);
+        INSERT INTO tasks_fts (rowid, title, description) VALUES (new.id, new.title, new.description);
+    END
+    ''')
+    conn.execute("INSERT INTO tasks_fts (tasks_fts) VALUES ('rebuild')")
+
+
+def _add_archive(conn):
+    """版本7：已完成任务的冷归档（见 database.archive）
+
+    tasks 增加 completed_at 列，由触发器在完成状态变化时维护（取消完成时清空），
+    所有写入方都不用关心；已有的已完成任务不知道何时完成，记为迁移的时间，
+    从升级起算满一个保留期后才归档（创建时间可能很早，任务却是刚完成的）。
+    活动任务索引重建以包含新列，保持覆盖索引。
+    归档数据放在两张表中：archive_segments 每行是一批任务压缩后的内容，
+    archived_tasks 每个任务一行，只有排序键和所在的段，用于分页浏览。
+    """
+    conn.execute("ALTER TABLE tasks ADD COLUMN completed_at TIMESTAMP")
+    conn.execute("UPDATE tasks SET completed_at = CURRENT_TIMESTAMP WHERE is_completed = 1")
+    conn.execute('''
+    CREATE TRIGGER IF NOT EXISTS tasks_completed_at AFTER UPDATE OF is_completed ON tasks
+    WHEN old.is_completed IS NOT new.is_completed
+    BEGIN
+        UPDATE tasks SET completed_at = CASE WHEN new.is_completed THEN CURRENT_TIMESTAMP END WHERE id = new.id;
+    END
+    ''')
+    conn.execute('''
+    CREATE TRIGGER IF NOT EXISTS tasks_completed_at_insert AFTER INSERT ON tasks
+    WHEN new.is_completed AND new.completed_at IS NULL
+    BEGIN
+        UPDATE tasks SET completed_at = CURRENT_TIMESTAMP WHERE id = new.id;
+    END
+    ''')
+    # 活动任务的索引补上新列，仍然包含查询所需的全部列（活动任务的 completed_at 总是 NULL）
+    conn.execute("DROP INDEX IF EXISTS idx_tasks_active")
+    conn.execute('''
+    CREATE INDEX idx_tasks_active
+    ON tasks (quadrant, order_index, created_at DESC, id DESC, title, description, is_completed, completed_at)
+    WHERE is_completed = 0
+    ''')
+    # 按完成时间找出到期的已完成任务
+    conn.execute('''
+    CREATE INDEX IF NOT EXISTS idx_tasks_completed_at
+    ON tasks (completed_at, id)
+    WHERE is_completed = 1
+    ''')
+    conn.execute('''
+    CREATE TABLE IF NOT EXISTS archive_segments (
+        id INTEGER PRIMARY KEY,
+        archived_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        task_count INTEGER NOT NULL,
+        data BLOB NOT NULL
+    )
+    ''')
+    conn.execute('''
+    CREATE TABLE IF NOT EXISTS archived_tasks (
+        id INTEGER PRIMARY KEY,
+        completed_at TIMESTAMP,
+        segment_id INTEGER NOT NULL
+    )
+    ''')
+    conn.execute('''
+    CREATE INDEX IF NOT EXISTS idx_archived_tasks_completed
+    ON archived_tasks (completed_at DESC, id DESC, segment_id)
+    ''')
+
+
+def _add_listing_counts(conn):
+    """版本8：各分页列表的任务数（见 database.pagination.count_tasks）
+
+    task_counts 每种列表一行，由触发器在插入、删除和完成状态变化时加减，
+    列表接口读取总数不再对整个列表做 COUNT(*)。
+    列表的划分与 pagination.LISTINGS 一致：is_completed 为0是 active，为1是 completed。
+    """
+    conn.execute('''
+    CREATE TABLE IF NOT EXISTS task_counts (
+        listing TEXT PRIMARY KEY,
+        count INTEGER NOT NULL
+    ) WITHOUT ROWID
+    ''')
+    conn.execute('''
+    INSERT OR REPLACE INTO task_counts (listing, count) VALUES
+        ('active', (SELECT COUNT(*) FROM tasks WHERE is_completed = 0)),
+        ('completed', (SELECT COUNT(*) FROM tasks WHERE is_completed = 1)),
+        ('archived', (SELECT COUNT(*) FROM archived_tasks))
+    ''')
+    listing = "CASE {row}.is_completed WHEN 0 THEN 'active' WHEN 1 THEN 'completed' END"
+    conn.execute(f'''
+    CREATE TRIGGER IF NOT EXISTS task_counts_insert AFTER INSERT ON tasks
+    BEGIN
+        UPDATE task_counts SET count = count + 1 WHERE listing = {listing.format(row="new")};
+    END
+    ''')
+    conn.execute(f'''
+    CREATE TRIGGER IF NOT EXISTS task_counts_delete AFTER DELETE ON tasks
+    BEGIN
+        UPDATE task_counts SET count = count - 1 WHERE listing = {listing.format(row="old")};
+    END
+    ''')
+    conn.execute(f'''
+    CREATE TRIGGER IF NOT EXISTS task_counts_update AFTER UPDATE OF is_completed ON tasks
+    WHEN old.is_completed IS NOT new.is_completed
+    BEGIN
+        UPDATE task_counts SET count = count - 1 WHERE listing = {listing.format(row="old")};
+        UPDATE task_counts SET count = count + 1 WHERE listing = {listing.format(row="new")};
+    END
+    ''')
+    conn.execute('''
+    CREATE TRIGGER IF NOT EXISTS task_counts_archive AFTER INSERT ON archived_tasks
+    BEGIN
+        UPDATE task_counts SET count = count + 1 WHERE listing = 'archived';
+    END
+    ''')
+    conn.execute('''
+    CREATE TRIGGER IF NOT EXISTS task_counts_unarchive AFTER DELETE ON archived_tasks
+    BEGIN
+        UPDATE task_counts SET count = count - 1 WHERE listing = 'archived';
+    END
+    ''')
+
+
+# 任务文本（标题和描述）的相邻两字符片段，以空格分隔：'写报告' -> '写报 报告 告'。
+# 触发器中不能使用CTE，借助 search_positions（0 .. SEARCH_POSITIONS-1）拆分：
+# 先把文本切成 SEARCH_CHUNK 个字符的块（多取一个字符，跨块的片段不丢），再在块内逐字符取片段，
+# substr 在UTF-8文本上定位的开销只与块长有关，不随全文长度增长。
+# 支持 SEARCH_CHUNK * SEARCH_POSITIONS（约1600万）个字符以内的文本。
+SEARCH_CHUNK = 1024
+SEARCH_POSITIONS = 16384
+_SEARCH_TEXT_SQL = "COALESCE({row}.title, '') || ' ' || COALESCE({row}.description, '')"
+_SEARCH_GRAMS_SQL = f"""(
+    SELECT group_concat(substr(chunk, lo.n + 1, 2), ' ')
+    FROM (
+        SELECT substr({{text}}, hi.n * {SEARCH_CHUNK} + 1, {SEARCH_CHUNK + 1}) AS chunk
+        FROM search_positions hi
+        WHERE hi.n < (length({{text}}) + {SEARCH_CHUNK - 1}) / {SEARCH_CHUNK}
+        ORDER BY hi.n LIMIT -1
+    ) JOIN search_positions lo
+    WHERE lo.n < min(length(chunk), {SEARCH_CHUNK})
+)"""
+
+
+def search_grams_sql(row):
+    """row（表名或触发器中的 new/old）这一行任务文本的两字符片段的SQL表达式"""
+    return _SEARCH_GRAMS_SQL.format(text=_SEARCH_TEXT_SQL.format(row=row))
+
+
+def _add_short_term_index(conn):
+    """版本9：1～2个字符的搜索词的索引（见 database.search）
+
+    trigram 索引匹配不了3个字符以下的词，短词原来只能扫描整个 tasks 表。
+    tasks_fts_short 索引每个任务的两字符片段（search_grams_sql），每个字符都是某个片段的开头：
+    两字符的词直接查片段，一个字符的词按前缀查（prefix='1' 建立一字符前缀索引）。
+    ascii 分词只在空白和ASCII标点处切分并把ASCII字母转为小写，中文等非ASCII字符原样保留。
+    表中不保存内容（content=''）和位置（detail=none），只用于找出候选任务；
+    删除时用同一个表达式从旧值重新算出片段。
+    """
+    conn.execute("CREATE TABLE IF NOT EXISTS search_positions (n INTEGER PRIMARY KEY)")
+    conn.execute(f'''
+    WITH RECURSIVE positions(n) AS (SELECT 0 UNION ALL SELECT n + 1 FROM positions WHERE n < {SEARCH_POSITIONS - 1})
+    INSERT OR IGNORE INTO search_positions (n) SELECT n FROM positions
+    ''')
+    conn.execute('''
+    CREATE VIRTUAL TABLE IF NOT EXISTS tasks_fts_short USING fts5(
+        grams, content='', detail=none, prefix='1', tokenize='ascii'
+    )
+    ''')
+    conn.execute(f'''
+    CREATE TRIGGER IF NOT EXISTS tasks_fts_short_insert AFTER INSERT ON tasks
+    BEGIN
+        INSERT INTO tasks_fts_short (rowid, grams) VALUES (new.id, {search_grams_sql("new")});
+    END
+    ''')
+    conn.execute(f'''
+    CREATE TRIGGER IF NOT EXISTS tasks_fts_short_delete AFTER DELETE ON tasks
+    BEGIN
+        INSERT INTO tasks_fts_short (tasks_fts_short, rowid, grams) VALUES ('delete', old.id, {search_grams_sql("old")});
+    END
+    ''')
+    conn.execute(f'''
+    CREATE TRIGGER IF NOT EXISTS tasks_fts_short_update AFTER UPDATE ON tasks
+    WHEN old.title IS NOT new.title OR old.description IS NOT new.description
+    BEGIN
+        INSERT INTO tasks_fts_short (tasks_fts_short, rowid, grams) VALUES ('delete', old.id, {search_grams_sql("old")});
+        INSERT INTO tasks_fts_short (rowid, grams) VALUES (new.id, {search_grams_sql("new")});
+    END
+    ''')
+    conn.execute(f"INSERT INTO tasks_fts_short (rowid, grams) SELECT id, {search_grams_sql('tasks')} FROM tasks")
+
+
+# (版本号, 迁移函数)，版本号必须连续递增
+MIGRATIONS = [
+    (1, _create_tasks_table),
+    (2, _add_task_indexes),
+    (3, _rank_active_tasks),
+    (4, _add_change_counter),
+    (5, _add_change_log),
+    (6, _add_search_index),
+    (7, _add_archive),
+    (8, _add_listing_counts),
+    (9, _add_short_term_index),
+]
+
+SCHEMA_VERSION = MIGRATIONS[-1][0]
+
+
+def get_schema_version(conn):
+    return conn.execute("PRAGMA user_version").fetchone()[0]
+
+
+def migrate(conn):
+    """在给定的写连接上执行所有未应用的迁移，返回最终版本号"""
+    if conn.in_transaction:
+        conn.commit()
+    for version, step in MIGRATIONS:
+        if get_schema_version(conn) >= version:
+            continue
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            # 拿到写锁后再确认一次，避免与其他进程重复迁移
+            if get_schema_version(conn) < version:
+                step(conn)
+                conn.execute(f"PRAGMA user_version = {version}")
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+    return get_schema_version(conn)
+
+
+_migrated = set()
+_migrated_lock = threading.Lock()
+
+
+def ensure_schema(db_path):
+    """确保数据库结构为最新版本，同一进程内每个数据库只检查一次"""
+    key = os.path.abspath(db_path)
+    if key in _migrated:
+        return
+    with _migrated_lock:
+        if key in _migrated:
+            return
+        data_dir = os.path.dirname(key)
+        if not os.path.exists(data_dir):
+            os.makedirs(data_dir)
+        with get_pool(key).writer() as conn:
+            migrate(conn)
+        _migrated.add(key)
@@ -0,0 +1,195 @@
+"""任务列表的键集（游标）分页
+
+两个Web服务器共用。每页只按排序键从上一页最后一行之后继续读取，
+不使用 OFFSET，第几页的耗时和内存都只与页大小有关。
+
+游标是上一页最后一行排序键取值的 base64 JSON，对客户端不透明。
+排序键中每一列的"之后"条件各自拆成一段独立查询，每段都是索引上的
+一次范围定位，依次读取直到凑满一页：
+    (a, b DESC, id DESC) 在 (1, 'x', 5) 之后 =
+        a IS 1 AND b IS 'x' AND id < 5
+        a IS 1 AND b < 'x'
+        a IS 1 AND b IS NULL        （降序时NULL排在最后）
+        a > 1
+"""
+import base64
+import binascii
+import json
+from urllib.parse import urlencode
+
+DEFAULT_PAGE_LIMIT = 200
+MAX_PAGE_LIMIT = 1000
+
+# 每种列表的表、过滤条件和排序键 (列名, 是否升序)，
+# 与 idx_tasks_active / idx_tasks_completed / idx_archived_tasks_completed 一致
+LISTINGS = {
+    "active": (
+        "tasks",
+        "is_completed = 0",
+        (("quadrant", True), ("order_index", True), ("created_at", False), ("id", False)),
+    ),
+    "completed": (
+        "tasks",
+        "is_completed = 1",
+        (("created_at", False), ("id", False)),
+    ),
+    # 归档索引（见 database.archive），只能用 fetch_page 读取
+    "archived": (
+        "archived_tasks",
+        "1",
+        (("completed_at", False), ("id", False)),
+    ),
+}
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+def parse_limit(value):
+    """解析 limit 参数：缺省为 DEFAULT_PAGE_LIMIT，超过上限时取 MAX_PAGE_LIMIT"""
+    if value is None or value == "":
+        return DEFAULT_PAGE_LIMIT
+    try:
+        limit = int(value)
+    except (TypeError, ValueError):
+        raise ValueError("limit must be an integer")
+    if limit < 1:
+        raise ValueError("limit must be positive")
+    return min(limit, MAX_PAGE_LIMIT)
+
+
+def encode_cursor(listing, values):
+    payload = json.dumps({"l": listing, "k": list(values)}, ensure_ascii=False, separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_cursor(listing, cursor):
+    """解析游标，返回排序键取值；游标损坏或属于其他列表时抛出 InvalidCursor"""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        payload = json.loads(raw)
+        values = payload["k"]
+        valid = payload["l"] == listing and isinstance(values, list)
+    except (binascii.Error, UnicodeDecodeError, ValueError, TypeError, KeyError):
+        raise InvalidCursor(cursor)
+    if not valid or len(values) != len(LISTINGS[listing][2]):
+        raise InvalidCursor(cursor)
+    if not all(value is None or isinstance(value, (str, int, float)) for value in values):
+        raise InvalidCursor(cursor)
+    return values
+
+
+def _segments(order, after):
+    """按排序先后生成 after 之后各段的 (条件, 参数)"""
+    if after is None:
+        yield "", ()
+        return
+    for depth in range(len(order) - 1, -1, -1):
+        prefix = " ".join(f"AND {column} IS ?" for column, _ in order[:depth])
+        params = tuple(after[:depth])
+        column, ascending = order[depth]
+        value = after[depth]
+        if ascending:
+            # 升序时NULL最小：之后是更大的值，NULL之后是全部非NULL值
+            if value is None:
+                yield f"{prefix} AND {column} IS NOT NULL", params
+            else:
+                yield f"{prefix} AND {column} > ?", params + (value,)
+        elif value is not None:
+            # 降序时NULL最大（排在最后）：之后是更小的值，再之后是NULL
+            yield f"{prefix} AND {column} < ?", params + (value,)
+            if column != "id":  # 主键不会为NULL
+                yield f"{prefix} AND {column} IS NULL", params
+
+
+def fetch_page(conn, listing, columns="*", limit=DEFAULT_PAGE_LIMIT, after=None):
+    """读取一页，返回 (行列表, 下一页游标或None)
+
+    after 为上一页返回的游标字符串或已解码的排序键取值列表。
+    columns 必须包含排序键的所有列。
+    """
+    table, where, order = LISTINGS[listing]
+    if isinstance(after, str):
+        after = decode_cursor(listing, after)
+    order_by = ", ".join(f"{column} {'ASC' if ascending else 'DESC'}" for column, ascending in order)
+    # 多读一行用来判断是否还有下一页
+    wanted = limit + 1
+    rows = []
+    for condition, params in _segments(order, after):
+        rows.extend(conn.execute(
+            f"SELECT {columns} FROM {table} WHERE {where} {condition} ORDER BY {order_by} LIMIT ?",
+            params + (wanted - len(rows),)
+        ))
+        if len(rows) >= wanted:
+            break
+    if len(rows) <= limit:
+        return rows, None
+    rows = rows[:limit]
+    last = rows[-1]
+    return rows, encode_cursor(listing, [last[column] for column, _ in order])
+
+
+# 接口返回的任务JSON（与两个服务器中 row_to_task / _row 的字段一致），由SQLite直接生成
+TASK_JSON_SQL = """json_object(
+    'id', id,
+    'title', COALESCE(title, ''),
+    'description', COALESCE(description, ''),
+    'quadrant', quadrant,
+    'isCompleted', json(CASE WHEN is_completed THEN 'true' ELSE 'false' END),
+    'createdAt', created_at,
+    'orderIndex', order_index
+)"""
+
+
+def fetch_page_json(conn, listing, limit=DEFAULT_PAGE_LIMIT, after=None, fields=TASK_JSON_SQL):
+    """与 fetch_page 相同的分页，但直接返回 (JSON数组字节串, 下一页游标或None)
+
+    每段查询在SQLite内把各行渲染为JSON并拼接，Python 只拿到一个字符串，
+    不再逐行创建 Row、字典，也不需要 json.dumps。
+    """
+    table, where, order = LISTINGS[listing]
+    if isinstance(after, str):
+        after = decode_cursor(listing, after)
+    keys = ", ".join(column for column, _ in order)
+    order_by = ", ".join(f"{column} {'ASC' if ascending else 'DESC'}" for column, ascending in order)
+    parts = []
+    last_key = None
+    taken = 0
+    for condition, params in _segments(order, after):
+        take = limit - taken
+        # 本段多读一行判断是否还有下一页；同时取出本页最后一行的排序键作为游标。
+        # 物化后的 page 没有顺序保证：先在 LIMIT 之后的行上按排序键编号 n，两个子查询都按 n 读取
+        count, body, key = conn.execute(f"""
+        WITH page AS MATERIALIZED (
+            SELECT *, row_number() OVER (ORDER BY {order_by}) AS n FROM (
+                SELECT {fields} AS item, {keys} FROM {table} WHERE {where} {condition} ORDER BY {order_by} LIMIT ?
+            )
+        )
+        SELECT COUNT(*),
+               (SELECT group_concat(item, ',') FROM (SELECT item FROM page ORDER BY n LIMIT ?)),
+               (SELECT json_array({keys}) FROM page ORDER BY n LIMIT 1 OFFSET ?)
+        FROM page
+        """, params + (take + 1, take, max(take - 1, 0))).fetchone()
+        if take and count >= take:
+            last_key = key
+        if body:
+            parts.append(body)
+        taken += min(count, take)
+        if count > take:
+            return f"[{','.join(parts)}]".encode(), encode_cursor(listing, json.loads(last_key))
+    return f"[{','.join(parts)}]".encode(), None
+
+
+def count_tasks(conn, listing):
+    """列表的任务数，读取触发器维护的 task_counts（迁移8），与列表长度无关"""
+    return conn.execute("SELECT count FROM task_counts WHERE listing = ?", (listing,)).fetchone()[0]
+
+
+def page_headers(path, total, limit, next_cursor):
+    """分页响应头：总数、下一页游标及 RFC 8288 Link"""
+    headers = {"X-Total-Count": str(total)}
+    if next_cursor is not None:
+        headers["X-Next-Cursor"] = next_cursor
+        headers["Link"] = f'<{path}?{urlencode({"limit": limit, "after": next_cursor})}>; rel="next"'
+    return headers
@@ -0,0 +1,241 @@
+"""SQLite连接池
+
+桌面端模型、FastAPI服务和内置Web服务器共用同一套长连接：
+- 每个线程一个只读连接（WAL模式下读写互不阻塞）
+- 全局唯一的写连接，由锁串行化所有写操作
+- 依赖sqlite3内置的语句缓存（cached_statements）复用已编译语句
+- 连接空闲过久时在检出前做健康检查，失效则自动重连
+- 记录检出次数与等待时间，便于观察高负载下的排队情况
+"""
+import os
+import sqlite3
+import threading
+import time
+import weakref
+from contextlib import contextmanager
+
+
+# 每个连接缓存的预编译语句数量（sqlite3默认只有128条）
+STATEMENT_CACHE_SIZE = 256
+# 连接空闲超过该秒数后，检出前先执行一次健康检查
+HEALTH_CHECK_INTERVAL = 30.0
+# 等待数据库锁的超时时间（毫秒）
+BUSY_TIMEOUT_MS = 5000
+
+
+class _WaitStats:
+    """单类连接的检出统计"""
+
+    def __init__(self):
+        self.checkouts = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+
+    def record(self, wait):
+        self.checkouts += 1
+        self.total_wait += wait
+        if wait > self.max_wait:
+            self.max_wait = wait
+
+    def as_dict(self):
+        avg = self.total_wait / self.checkouts if self.checkouts else 0.0
+        return {
+            "checkouts": self.checkouts,
+            "avgWaitMs": round(avg * 1000, 3),
+            "maxWaitMs": round(self.max_wait * 1000, 3),
+        }
+
+
+class _PooledConnection:
+    """包装sqlite3连接，记录最近一次使用时间"""
+
+    __slots__ = ("conn", "last_used")
+
+    def __init__(self, conn):
+        self.conn = conn
+        self.last_used = time.monotonic()
+
+
+class ConnectionPool:
+    def __init__(self, db_path, max_readers=16, health_check_interval=HEALTH_CHECK_INTERVAL):
+        self.db_path = db_path
+        self.health_check_interval = health_check_interval
+        self._reader_slots = threading.BoundedSemaphore(max_readers)
+        self._max_readers = max_readers
+        self._local = threading.local()
+        # 线程弱引用 -> 连接，用于回收已退出线程的读连接
+        self._readers = {}
+        self._readers_lock = threading.Lock()
+        self._writer = None
+        self._writer_lock = threading.RLock()
+        self._writer_depth = 0
+        self._stats_lock = threading.Lock()
+        self._reader_stats = _WaitStats()
+        self._writer_stats = _WaitStats()
+        self._health_check_failures = 0
+        self._reconnects = 0
+        self._closed = False
+
+    def _connect(self, readonly):
+        conn = sqlite3.connect(
+            self.db_path,
+            check_same_thread=False,
+            cached_statements=STATEMENT_CACHE_SIZE,
+        )
+        conn.row_factory = sqlite3.Row
+        conn.execute(f"PRAGMA busy_timeout = {BUSY_TIMEOUT_MS}")
+        if readonly:
+            conn.execute("PRAGMA query_only = ON")
+        else:
+            conn.execute("PRAGMA journal_mode = WAL")
+        conn.execute("PRAGMA synchronous = NORMAL")
+        conn.execute("PRAGMA temp_store = MEMORY")
+        return conn
+
+    def _check_health(self, pooled, readonly):
+        """空闲过久的连接先探测一次，失效则重建"""
+        now = time.monotonic()
+        if now - pooled.last_used < self.health_check_interval:
+            pooled.last_used = now
+            return pooled
+        try:
+            pooled.conn.execute("SELECT 1").fetchone()
+            pooled.last_used = now
+            return pooled
+        except sqlite3.Error:
+            with self._stats_lock:
+                self._health_check_failures += 1
+                self._reconnects += 1
+            try:
+                pooled.conn.close()
+            except sqlite3.Error:
+                pass
+            return _PooledConnection(self._connect(readonly))
+
+    def _reader_connection(self):
+        pooled = getattr(self._local, "reader", None)
+        if pooled is None:
+            pooled = _PooledConnection(self._connect(readonly=True))
+            thread = threading.current_thread()
+            with self._readers_lock:
+                self._prune_dead_readers()
+                self._readers[weakref.ref(thread)] = pooled
+        else:
+            checked = self._check_health(pooled, readonly=True)
+            if checked is not pooled:
+                with self._readers_lock:
+                    for ref, value in self._readers.items():
+                        if value is pooled:
+                            self._readers[ref] = checked
+                            break
+                pooled = checked
+        self._local.reader = pooled
+        return pooled.conn
+
+    def _prune_dead_readers(self):
+        for ref in [ref for ref in self._readers if ref() is None or not ref().is_alive()]:
+            try:
+                self._readers.pop(ref).conn.close()
+            except sqlite3.Error:
+                pass
+
+    @contextmanager
+    def reader(self):
+        """检出当前线程的只读连接"""
+        if self._closed:
+            raise sqlite3.ProgrammingError("connection pool is closed")
+        start = time.perf_counter()
+        self._reader_slots.acquire()
+        wait = time.perf_counter() - start
+        try:
+            conn = self._reader_connection()
+            with self._stats_lock:
+                self._reader_stats.record(wait)
+            yield conn
+        finally:
+            self._reader_slots.release()
+
+    @contextmanager
+    def writer(self):
+        """检出全局写连接；最外层正常退出时提交，异常时回滚"""
+        if self._closed:
+            raise sqlite3.ProgrammingError("connection pool is closed")
+        start = time.perf_counter()
+        self._writer_lock.acquire()
+        wait = time.perf_counter() - start
+        try:
+            if self._writer is None:
+                self._writer = _PooledConnection(self._connect(readonly=False))
+            elif self._writer_depth == 0:
+                self._writer = self._check_health(self._writer, readonly=False)
+            with self._stats_lock:
+                self._writer_stats.record(wait)
+            conn = self._writer.conn
+            self._writer_depth += 1
+            try:
+                yield conn
+            except BaseException:
+                self._writer_depth -= 1
+                if self._writer_depth == 0 and conn.in_transaction:
+                    conn.rollback()
+                raise
+            self._writer_depth -= 1
+            if self._writer_depth == 0 and conn.in_transaction:
+                conn.commit()
+        finally:
+            self._writer_lock.release()
+
+    def stats(self):
+        """返回连接池统计信息"""
+        with self._readers_lock:
+            open_readers = sum(1 for ref in self._readers if ref() is not None and ref().is_alive())
+        with self._stats_lock:
+            return {
+                "dbPath": self.db_path,
+                "maxReaders": self._max_readers,
+                "openReaders": open_readers,
+                "writerOpen": self._writer is not None,
+                "reader": self._reader_stats.as_dict(),
+                "writer": self._writer_stats.as_dict(),
+                "healthCheckFailures": self._health_check_failures,
+                "reconnects": self._reconnects,
+            }
+
+    def close(self):
+        """关闭池中所有连接"""
+        self._closed = True
+        with self._writer_lock:
+            if self._writer is not None:
+                self._writer.conn.close()
+                self._writer = None
+        with self._readers_lock:
+            for pooled in self._readers.values():
+                try:
+                    pooled.conn.close()
+                except sqlite3.Error:
+                    pass
+            self._readers.clear()
+
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+def get_pool(db_path):
+    """按数据库路径获取共享连接池，同一个文件在进程内只有一个池"""
+    key = os.path.abspath(db_path)
+    with _pools_lock:
+        pool = _pools.get(key)
+        if pool is None or pool._closed:
+            pool = ConnectionPool(key)
+            _pools[key] = pool
+        return pool
+
+
+def close_pool(db_path):
+    """关闭并移除指定数据库的连接池"""
+    key = os.path.abspath(db_path)
+    with _pools_lock:
+        pool = _pools.pop(key, None)
+    if pool is not None:
+        pool.close()
@@ -0,0 +1,138 @@
+"""象限内任务的排序值（rank）
+
+order_index 保存小数排序值，同一象限内的活动任务按 order_index 升序排列：
+- 新任务（以及移动到新象限的任务）取该象限最小值再减 RANK_STEP，排在最前
+- 把任务拖到两个任务之间时取两者的中点，只改写被移动的这一行
+- 反复在同一位置插入会让间隔不断减半；间隔小于 MIN_RANK_GAP 时
+  安排一次后台重排（rebalance），把整个象限重新按 RANK_STEP 等距编号；
+  中点已无法表示（或存在相同排序值）时先同步重排再放置
+"""
+
+RANK_STEP = 1024.0
+
+# 约20次连续对半插入后触发后台重排，远在双精度耗尽之前
+MIN_RANK_GAP = RANK_STEP / 2 ** 20
+
+# 插入到象限最前面时使用的排序值子查询，参数为象限
+TOP_RANK_SQL = f"(SELECT COALESCE(MIN(order_index), 0) - {RANK_STEP} FROM tasks WHERE quadrant = ? AND is_completed = 0)"
+
+
+def rebalance(conn, quadrant):
+    """按当前顺序把象限内活动任务重新等距编号，返回改写的行数"""
+    return conn.execute(f'''
+    WITH ordered AS (
+        SELECT id, ROW_NUMBER() OVER (ORDER BY order_index ASC, created_at DESC, id DESC) AS position
+        FROM tasks
+        WHERE quadrant = ? AND is_completed = 0
+    )
+    UPDATE tasks SET order_index = ordered.position * {RANK_STEP}
+    FROM ordered
+    WHERE tasks.id = ordered.id
+    ''', (quadrant,)).rowcount
+
+
+def rebalance_quadrant(pool, quadrant):
+    """在独立的写事务中重排一个象限，供后台线程或延迟任务调用"""
+    with pool.writer() as conn:
+        rebalance(conn, quadrant)
+
+
+def _active(conn, task_id):
+    if task_id is None or task_id < 0:
+        return None
+    return conn.execute(
+        "SELECT id, quadrant, order_index FROM tasks WHERE id = ? AND is_completed = 0",
+        (task_id,)
+    ).fetchone()
+
+
+def _is_rank(value):
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+
+def _tied(conn, quadrant, rank, task_id):
+    """除被移动任务外，是否有多个任务共享 rank（此时中点无法区分先后）"""
+    return conn.execute(
+        "SELECT COUNT(*) FROM tasks WHERE quadrant = ? AND is_completed = 0 AND order_index = ? AND id != ?",
+        (quadrant, rank, task_id)
+    ).fetchone()[0] > 1
+
+
+def _bounds(conn, task_id, quadrant, before, after):
+    """返回放置位置两侧的排序值 (low, high)，None 表示该侧没有任务"""
+    if before is not None and after is not None and after["quadrant"] == before["quadrant"] \
+            and _is_rank(before["order_index"]) and _is_rank(after["order_index"]) \
+            and before["order_index"] < after["order_index"]:
+        return before["order_index"], after["order_index"]
+    if before is not None:
+        low = before["order_index"]
+        high = conn.execute(
+            "SELECT MIN(order_index) FROM tasks WHERE quadrant = ? AND is_completed = 0 AND order_index > ? AND id != ?",
+            (quadrant, low, task_id)
+        ).fetchone()[0]
+        return low, high
+    if after is not None:
+        high = after["order_index"]
+        low = conn.execute(
+            "SELECT MAX(order_index) FROM tasks WHERE quadrant = ? AND is_completed = 0 AND order_index < ? AND id != ?",
+            (quadrant, high, task_id)
+        ).fetchone()[0]
+        return low, high
+    high = conn.execute(
+        "SELECT MIN(order_index) FROM tasks WHERE quadrant = ? AND is_completed = 0 AND id != ?",
+        (quadrant, task_id)
+    ).fetchone()[0]
+    return None, high
+
+
+def _midpoint(low, high):
+    """两个排序值之间的新值，无法放入时返回None"""
+    if (low is not None and not _is_rank(low)) or (high is not None and not _is_rank(high)):
+        return None
+    if low is None and high is None:
+        return 0.0
+    if low is None:
+        return high - RANK_STEP
+    if high is None:
+        return low + RANK_STEP
+    middle = (low + high) / 2
+    return middle if low < middle < high else None
+
+
+def move_between(conn, task_id, before_id=None, after_id=None):
+    """把任务放到 before_id 之后、after_id 之前（None或负数表示该侧不限定）
+
+    两侧都不限定时放到象限最前面。邻居所在的象限与任务不同时，任务同时
+    移动到该象限。正常情况下只更新被移动任务这一行。
+    返回 (象限, 新排序值, 是否需要后台重排, 是否已同步重排)；任务不存在时返回None，
+    邻居不存在时抛出 LookupError。
+    """
+    task = _active(conn, task_id)
+    if task is None:
+        return None
+    before = _active(conn, before_id) if before_id != task_id else None
+    after = _active(conn, after_id) if after_id != task_id else None
+    if (before is None and before_id is not None and before_id >= 0 and before_id != task_id) or \
+            (after is None and after_id is not None and after_id >= 0 and after_id != task_id):
+        raise LookupError("neighbor not found")
+    quadrant = (before or after or task)["quadrant"]
+    if before is not None and after is not None and after["quadrant"] != quadrant:
+        after = None
+
+    low, high = _bounds(conn, task_id, quadrant, before, after)
+    rank = _midpoint(low, high)
+    anchor = before or after
+    rebalanced = rank is None or (anchor is not None and _tied(conn, quadrant, anchor["order_index"], task_id))
+    if rebalanced:
+        # 没有空间或邻居与其他任务排序值相同：先同步重排，再按新的排序值放置
+        rebalance(conn, quadrant)
+        before = _active(conn, before["id"]) if before is not None else None
+        after = _active(conn, after["id"]) if after is not None else None
+        low, high = _bounds(conn, task_id, quadrant, before, after)
+        rank = _midpoint(low, high)
+    conn.execute(
+        "UPDATE tasks SET quadrant = ?, order_index = ? WHERE id = ?",
+        (quadrant, rank, task_id)
+    )
+    crowded = low is not None and high is not None and high - low < 2 * MIN_RANK_GAP
+    return quadrant, rank, crowded, rebalanced
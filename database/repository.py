@@ -0,0 +1,286 @@
+"""任务数据访问层
+
+桌面端（TaskModel、CompletedTasksModel）、FastAPI 服务（server/app.py）和
+内置服务器（server/fallback.py）共用，不依赖 Qt：
+- 所有任务相关的 SQL 都在这里，语句文本固定，每个连接的语句缓存都能命中
+- 行到接口字典的转换只有 row_to_task 一处
+- 列表页按数据版本（tasks_version）缓存：版本不变时同一页直接从内存返回，
+  任何写入（包括其他进程）都会改变版本，缓存自然失效
+
+查询方法的第一个参数是连接，同一个方法两种用法：
+    record = repo.write(repo.create, "标题")               # 桌面端，同步
+    record = await repo.db.write(repo.create, "标题")     # 异步服务器，交给执行器的写通道
+"""
+import os
+import threading
+from collections import OrderedDict
+
+from database.archive import ARCHIVE_AFTER_DAYS, SEGMENT_SIZE, archive_page, archive_segment, \
+    archive_stats, decode_segment
+from database.batch import apply_batch
+from database.executor import close_executor, get_executor
+from database.migrations import ensure_schema
+from database.pagination import count_tasks, fetch_page, fetch_page_json
+from database.pool import close_pool, get_pool
+from database.ranking import TOP_RANK_SQL, move_between, rebalance
+from database.search import DEFAULT_SEARCH_LIMIT, search_tasks
+from database.versioning import not_modified, read_version
+
+# 与 TaskStore.COLUMNS 顺序一致的查询列
+TASK_COLUMNS = "id, title, description, quadrant, is_completed, created_at, order_index"
+
+# 每个数据库缓存的列表页数量
+PAGE_CACHE_SIZE = 128
+# 每个数据库缓存的已解压归档段数量（段写入后不再修改，缓存无需失效）
+SEGMENT_CACHE_SIZE = 32
+
+_INSERT_SQL = (
+    f"INSERT INTO tasks (title, description, quadrant, order_index) VALUES (?, ?, ?, {TOP_RANK_SQL}) "
+    f"RETURNING {TASK_COLUMNS}"
+)
+_UPDATE_SQL = (
+    "UPDATE tasks SET title = COALESCE(?, title), description = COALESCE(?, description) WHERE id = ? "
+    f"RETURNING {TASK_COLUMNS}"
+)
+# 移入新象限的任务排在最前面，象限不变时保持原位置
+_MOVE_SQL = (
+    f"UPDATE tasks SET quadrant = ?, order_index = CASE WHEN quadrant IS ? THEN order_index ELSE {TOP_RANK_SQL} END "
+    f"WHERE id = ? RETURNING {TASK_COLUMNS}"
+)
+_COMPLETE_SQL = f"UPDATE tasks SET is_completed = ? WHERE id = ? RETURNING {TASK_COLUMNS}"
+_ORDER_SQL = f"UPDATE tasks SET order_index = ? WHERE id = ? RETURNING {TASK_COLUMNS}"
+_GET_SQL = f"SELECT {TASK_COLUMNS} FROM tasks WHERE id = ?"
+
+
+def row_to_task(row):
+    """把任务行转换为接口返回的字典（与 pagination.TASK_JSON_SQL 的字段一致）"""
+    return {
+        "id": row["id"],
+        "title": row["title"] if row["title"] is not None else "",
+        "description": row["description"] if row["description"] is not None else "",
+        "quadrant": row["quadrant"],
+        "isCompleted": bool(row["is_completed"]),
+        "createdAt": row["created_at"],
+        "orderIndex": row["order_index"],
+    }
+
+
+def archived_to_task(record):
+    """把归档段中的任务转换为接口字典，比 row_to_task 多一个 completedAt"""
+    return {
+        "id": record["id"],
+        "title": record["title"] if record["title"] is not None else "",
+        "description": record["description"] if record["description"] is not None else "",
+        "quadrant": record["quadrant"],
+        "isCompleted": True,
+        "createdAt": record["created_at"],
+        "orderIndex": record["order_index"],
+        "completedAt": record["completed_at"],
+    }
+
+
+class TaskRepository:
+    def __init__(self, db_path):
+        ensure_schema(db_path)
+        self.db_path = db_path
+        self.pool = get_pool(db_path)
+        # (列表, 每页条数, 游标) -> (版本, 响应体, 下一页游标, 总数)
+        self._pages = OrderedDict()
+        self._pages_lock = threading.Lock()
+        self._page_hits = 0
+        self._page_misses = 0
+        # 段id -> decode_segment 的结果
+        self._segments = OrderedDict()
+
+    @property
+    def db(self):
+        """异步服务器使用的读/写执行器"""
+        return get_executor(self.db_path)
+
+    def read(self, fn, *args):
+        """同步执行 fn(conn, *args)，conn 为只读连接"""
+        with self.pool.reader() as conn:
+            return fn(conn, *args)
+
+    def write(self, fn, *args):
+        """同步执行 fn(conn, *args)，返回后提交"""
+        with self.pool.writer() as conn:
+            return fn(conn, *args)
+
+    # ---- 读取 ----
+
+    def get(self, conn, task_id):
+        return conn.execute(_GET_SQL, (task_id,)).fetchone()
+
+    def active_rows(self, conn):
+        """全部活动任务（不排序，列顺序同 TASK_COLUMNS）"""
+        return conn.execute(f"SELECT {TASK_COLUMNS} FROM tasks WHERE is_completed = 0").fetchall()
+
+    def quadrant_ranks(self, conn, quadrant):
+        """象限内活动任务的 (id, order_index)"""
+        return conn.execute(
+            "SELECT id, order_index FROM tasks WHERE quadrant = ? AND is_completed = 0", (quadrant,)
+        ).fetchall()
+
+    def quadrant_rows(self, conn, quadrant):
+        return conn.execute(
+            f"SELECT {TASK_COLUMNS} FROM tasks WHERE quadrant = ? AND is_completed = 0 "
+            "ORDER BY order_index ASC, created_at DESC",
+            (quadrant,)
+        ).fetchall()
+
+    def sorted_active_rows(self, conn):
+        return conn.execute(
+            f"SELECT {TASK_COLUMNS} FROM tasks WHERE is_completed = 0 "
+            "ORDER BY quadrant ASC, order_index ASC, created_at DESC"
+        ).fetchall()
+
+    def completed_rows(self, conn):
+        return conn.execute(
+            f"SELECT {TASK_COLUMNS} FROM tasks WHERE is_completed = 1 ORDER BY created_at DESC"
+        ).fetchall()
+
+    def completed_page(self, conn, columns, limit, after=None):
+        """已完成任务的一页行，返回 (行列表, 下一页游标或None)"""
+        return fetch_page(conn, "completed", columns, limit, after)
+
+    def search(self, conn, query, limit=DEFAULT_SEARCH_LIMIT, open_tag="<mark>", close_tag="</mark>"):
+        """全文搜索（见 database.search），结果为接口字典加 titleHighlight 和 snippet"""
+        return search_tasks(conn, query, row_to_task, limit, open_tag, close_tag)
+
+    def page(self, conn, listing, limit, after=None, if_none_match=None, tenant=None):
+        """读取一页接口JSON；客户端缓存仍是最新版本时只读版本号
+
+        tenant 是本仓库所属的租户名，用于比较 If-None-Match（见 database.versioning）。
+        返回 (版本, None) 或 (版本, (响应体, 下一页游标, 总数))。
+        """
+        # 先读版本再读数据：两者之间若有写入，返回的旧版本号只会让客户端多下载一次
+        version = read_version(conn)
+        if not_modified(if_none_match, version, tenant):
+            return version, None
+        key = (listing, limit, after)
+        with self._pages_lock:
+            cached = self._pages.get(key)
+            if cached is not None and cached[0] == version:
+                self._pages.move_to_end(key)
+                self._page_hits += 1
+                return version, cached[1:]
+            self._page_misses += 1
+        body, next_cursor = fetch_page_json(conn, listing, limit=limit, after=after)
+        page = (body, next_cursor, count_tasks(conn, listing))
+        with self._pages_lock:
+            self._pages[key] = (version,) + page
+            self._pages.move_to_end(key)
+            while len(self._pages) > PAGE_CACHE_SIZE:
+                self._pages.popitem(last=False)
+        return version, page
+
+    def cache_stats(self):
+        with self._pages_lock:
+            return {"pages": len(self._pages), "hits": self._page_hits, "misses": self._page_misses}
+
+    def _load_segment(self, segment_id, data):
+        with self._pages_lock:
+            segment = self._segments.get(segment_id)
+            if segment is not None:
+                self._segments.move_to_end(segment_id)
+                return segment
+        segment = decode_segment(data)
+        with self._pages_lock:
+            self._segments[segment_id] = segment
+            while len(self._segments) > SEGMENT_CACHE_SIZE:
+                self._segments.popitem(last=False)
+        return segment
+
+    def archived_page(self, conn, limit, after=None):
+        """按完成时间倒序的一页归档任务（接口字典加 completedAt），返回 (列表, 下一页游标或None)"""
+        records, next_cursor = archive_page(conn, limit, after, self._load_segment)
+        return [archived_to_task(record) for record in records], next_cursor
+
+    def archive_listing(self, conn, limit, after=None):
+        """Web接口使用：返回 (一页归档任务, 下一页游标或None, 归档总数)"""
+        tasks, next_cursor = self.archived_page(conn, limit, after)
+        return tasks, next_cursor, count_tasks(conn, "archived")
+
+    def archive_stats(self, conn):
+        return archive_stats(conn)
+
+    # ---- 写入（返回修改后的行，任务不存在时为None） ----
+
+    def create(self, conn, title, description="", quadrant=4):
+        """新建任务，排在象限最前面"""
+        return conn.execute(_INSERT_SQL, (title, description, quadrant, quadrant)).fetchone()
+
+    def update(self, conn, task_id, title=None, description=None):
+        """修改标题和/或描述，为None的字段保持不变"""
+        if title is None and description is None:
+            return self.get(conn, task_id)
+        return conn.execute(_UPDATE_SQL, (title, description, task_id)).fetchone()
+
+    def move(self, conn, task_id, quadrant):
+        return conn.execute(_MOVE_SQL, (quadrant, quadrant, quadrant, task_id)).fetchone()
+
+    def set_completed(self, conn, task_id, completed):
+        return conn.execute(_COMPLETE_SQL, (1 if completed else 0, task_id)).fetchone()
+
+    def set_order(self, conn, task_id, order_index):
+        return conn.execute(_ORDER_SQL, (order_index, task_id)).fetchone()
+
+    def position(self, conn, task_id, before_id, after_id):
+        """放到 before_id 之后、after_id 之前，返回 (move_between 的结果, 修改后的行)
+
+        任务不存在时返回 (None, None)；邻居无效时抛出 LookupError。
+        """
+        placed = move_between(conn, task_id, before_id, after_id)
+        if placed is None:
+            return None, None
+        return placed, self.get(conn, task_id)
+
+    def rebalance(self, conn, quadrant):
+        rebalance(conn, quadrant)
+
+    def delete(self, conn, task_id):
+        conn.execute("DELETE FROM tasks WHERE id = ?", (task_id,))
+
+    def clear_completed(self, conn):
+        conn.execute("DELETE FROM tasks WHERE is_completed = 1")
+
+    def archive(self, conn, days=ARCHIVE_AFTER_DAYS):
+        """归档一段完成超过 days 天的任务，返回归档的任务数（等于 SEGMENT_SIZE 时可能还有剩余）"""
+        return archive_segment(conn, days)
+
+    def archive_expired(self, days=ARCHIVE_AFTER_DAYS):
+        """同步归档全部到期任务，每段一个事务，返回归档的任务数"""
+        total = 0
+        while True:
+            count = self.write(self.archive, days)
+            total += count
+            if count < SEGMENT_SIZE:
+                return total
+
+    def batch(self, conn, operations):
+        """批量操作，结果中的任务已转换为接口字典"""
+        return apply_batch(conn, operations, row_to_task)
+
+
+_repositories = {}
+_repositories_lock = threading.Lock()
+
+
+def get_repository(db_path):
+    """按数据库路径获取共享的仓库，首次获取时执行结构迁移；连接池重建后仓库随之重建"""
+    pool = get_pool(db_path)
+    with _repositories_lock:
+        repository = _repositories.get(pool.db_path)
+        if repository is None or repository.pool is not pool:
+            repository = TaskRepository(db_path)
+            _repositories[pool.db_path] = repository
+        return repository
+
+
+def close_repository(db_path):
+    """关闭指定数据库的仓库：先等执行器处理完排队的操作，再关闭连接池"""
+    with _repositories_lock:
+        _repositories.pop(os.path.abspath(db_path), None)
+    close_executor(db_path)
+    close_pool(db_path)
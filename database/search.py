@@ -0,0 +1,183 @@
+"""任务全文搜索
+
+索引是迁移6建立的 tasks_fts（FTS5，外部内容表为 tasks，由触发器同步），
+使用 trigram 分词：中文没有空格分词，按三字符片段建索引后任意位置的
+子串都能命中，英文同样不区分大小写。
+
+查询按空白拆成多个词，要求全部出现（AND）：
+- 不少于3个字符的词走 FTS5 索引，按 bm25 排序（标题权重高于描述），
+  高亮和摘要由 SQLite 的 highlight()/snippet() 生成
+- 1～2个字符的词 trigram 索引无法匹配，作为附加条件（LIKE）在候选行上过滤；
+  查询中全是短词时，候选任务来自迁移9建立的 tasks_fts_short（任务文本的两字符片段，
+  两字符词查同样的片段，一个字符的词按前缀查），按创建先后（id）倒序取结果，
+  不需要排序全部候选；片段索引只负责找候选，每个候选仍用 LIKE 确认，匹配的任务与逐行 LIKE 相同。
+  全部由空白以外的ASCII标点组成的短词（如 "%"、"--"）不在片段索引里，
+  查询中只有这种词时才扫描 tasks 表。高亮在 Python 中生成
+
+结果中的高亮文本已做 HTML 转义，匹配部分用调用方给出的标签包裹。
+"""
+import html
+
+DEFAULT_SEARCH_LIMIT = 20
+MAX_SEARCH_LIMIT = 100
+# trigram 分词能匹配的最短词长
+MIN_INDEXED_TERM = 3
+# 摘要长度（FTS5 snippet 的词数，trigram 下约等于字符数）
+SNIPPET_TOKENS = 24
+
+# SQLite 生成高亮时使用的临时标记，转义后再替换为调用方的标签
+_OPEN, _CLOSE = "\x02", "\x03"
+
+# 标题匹配的权重是描述的10倍
+_BM25 = "bm25(tasks_fts, 10.0, 1.0)"
+
+
+def parse_terms(query):
+    """把查询字符串拆成词（去重，保持顺序）"""
+    terms = []
+    for term in (query or "").split():
+        if term.lower() not in (t.lower() for t in terms):
+            terms.append(term)
+    return terms
+
+
+def parse_search_limit(value):
+    if value is None or value == "":
+        return DEFAULT_SEARCH_LIMIT
+    try:
+        limit = int(value)
+    except (TypeError, ValueError):
+        raise ValueError("limit must be an integer")
+    if limit < 1:
+        raise ValueError("limit must be positive")
+    return min(limit, MAX_SEARCH_LIMIT)
+
+
+def _fts_query(terms):
+    # 每个词作为一个短语，双引号转义后不会被解析成 FTS5 运算符
+    return " ".join('"' + term.replace('"', '""') + '"' for term in terms)
+
+
+def _short_indexed(term):
+    """tasks_fts_short 的 ascii 分词只在ASCII标点和空白处切分，短词中有字母、数字或非ASCII字符时才能查索引"""
+    return any(not char.isascii() or char.isalnum() for char in term)
+
+
+def _short_fts_query(terms):
+    # 每个字符都是某个两字符片段的开头：两字符词按短语查片段，一个字符的词按前缀查
+    return " ".join('"' + term.replace('"', '""') + '"' + ("*" if len(term) == 1 else "") for term in terms)
+
+
+def _like(term):
+    escaped = term.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+    return f"%{escaped}%"
+
+
+def _short_term_filter(terms, alias):
+    """短词的过滤条件：每个词都要出现在标题或描述中（LIKE 对 ASCII 不区分大小写）"""
+    sql = " ".join(
+        f"AND ({alias}.title LIKE ? ESCAPE '\\' OR {alias}.description LIKE ? ESCAPE '\\')" for _ in terms
+    )
+    params = tuple(value for term in terms for value in (_like(term), _like(term)))
+    return sql, params
+
+
+def _render(marked, open_tag, close_tag):
+    """SQLite 生成的带临时标记的文本 -> 转义后的 HTML"""
+    if marked is None:
+        return ""
+    return html.escape(marked).replace(_OPEN, open_tag).replace(_CLOSE, close_tag)
+
+
+def _mark(text, terms):
+    """在 Python 中标出 text 里所有词的位置（不区分大小写），返回带临时标记的文本"""
+    lowered = text.lower()
+    spans = []
+    for term in terms:
+        needle = term.lower()
+        start = lowered.find(needle)
+        while start != -1:
+            spans.append((start, start + len(needle)))
+            start = lowered.find(needle, start + len(needle))
+    if not spans:
+        return text, None
+    spans.sort()
+    merged = [list(spans[0])]
+    for start, end in spans[1:]:
+        if start <= merged[-1][1]:
+            merged[-1][1] = max(merged[-1][1], end)
+        else:
+            merged.append([start, end])
+    parts, last = [], 0
+    for start, end in merged:
+        parts.append(text[last:start] + _OPEN + text[start:end] + _CLOSE)
+        last = end
+    parts.append(text[last:])
+    return "".join(parts), merged[0][0]
+
+
+def _snippet(text, terms):
+    """短词查询的描述摘要：第一个匹配附近的 SNIPPET_TOKENS 个字符"""
+    if not text:
+        return ""
+    _, first = _mark(text, terms)
+    start = max(0, (first or 0) - SNIPPET_TOKENS // 3)
+    end = min(len(text), start + SNIPPET_TOKENS)
+    window, _ = _mark(text[start:end], terms)
+    return ("…" if start else "") + window + ("…" if end < len(text) else "")
+
+
+def search_tasks(conn, query, to_task, limit=DEFAULT_SEARCH_LIMIT, open_tag="<mark>", close_tag="</mark>"):
+    """搜索任务（含已完成任务），返回按相关度排序的结果列表
+
+    每个结果是 to_task(行) 的字典加上 titleHighlight（高亮标题）和 snippet（描述摘要）两个字段。
+    """
+    terms = parse_terms(query)
+    if not terms:
+        return []
+    indexed = [term for term in terms if len(term) >= MIN_INDEXED_TERM]
+    short = [term for term in terms if len(term) < MIN_INDEXED_TERM]
+
+    if indexed:
+        condition, params = _short_term_filter(short, "t")
+        rows = conn.execute(f"""
+            SELECT t.*,
+                   highlight(tasks_fts, 0, '{_OPEN}', '{_CLOSE}') AS marked_title,
+                   snippet(tasks_fts, 1, '{_OPEN}', '{_CLOSE}', '…', {SNIPPET_TOKENS}) AS marked_snippet
+            FROM tasks_fts JOIN tasks t ON t.id = tasks_fts.rowid
+            WHERE tasks_fts MATCH ? {condition}
+            ORDER BY {_BM25}
+            LIMIT ?
+        """, (_fts_query(indexed),) + params + (limit,)).fetchall()
+        results = []
+        for row in rows:
+            title, description = row["marked_title"], row["marked_snippet"]
+            if short:
+                # 短词不在索引里，补上它们的高亮
+                title = _mark(title or "", short)[0]
+                description = _mark(description or "", short)[0]
+            results.append({
+                **to_task(row),
+                "titleHighlight": _render(title, open_tag, close_tag),
+                "snippet": _render(description, open_tag, close_tag),
+            })
+        return results
+
+    condition, params = _short_term_filter(short, "t")
+    candidates = [term for term in short if _short_indexed(term)]
+    if candidates:
+        rows = conn.execute(f"""
+            SELECT t.* FROM tasks_fts_short JOIN tasks t ON t.id = tasks_fts_short.rowid
+            WHERE tasks_fts_short MATCH ? {condition}
+            ORDER BY tasks_fts_short.rowid DESC
+            LIMIT ?
+        """, (_short_fts_query(candidates),) + params + (limit,)).fetchall()
+    else:
+        rows = conn.execute(
+            f"SELECT * FROM tasks t WHERE 1 {condition} ORDER BY t.id DESC LIMIT ?", params + (limit,)
+        ).fetchall()
+    return [{
+        **to_task(row),
+        "titleHighlight": _render(_mark(row["title"] or "", short)[0], open_tag, close_tag),
+        "snippet": _render(_snippet(row["description"] or "", short), open_tag, close_tag),
+    } for row in rows]
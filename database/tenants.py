@@ -0,0 +1,234 @@
+"""多租户：每个租户一个 SQLite 文件，进程内只保留有限个打开的租户
+
+租户 t 的数据库是 <数据目录>/<t>.db，首次访问时创建并执行结构迁移。
+打开的租户（仓库、连接池、执行器，以及它们的页面缓存和语句缓存）
+放在一个按最近使用排序的 LRU 中：
+- 请求处理期间持有租户的租约（lease），有租约的租户不会被关闭
+- 打开的租户超过 TODO_TENANT_CAPACITY 个时，关闭最久未使用的空闲租户；
+  全部都有租约时暂时超出上限，租约归还后再关闭
+- 空闲超过 TODO_TENANT_IDLE_SECONDS 秒的租户在下一次取得或归还租约时关闭
+- 每个租户的执行器只有 TODO_TENANT_DB_READERS 个读线程，
+  打开的租户再多，线程和连接总数也有上限
+- 打开租户时归档其到期的已完成任务（见 database.archive）
+
+关闭在后台线程中进行（先等写通道把排队的操作提交完，再关闭连接），
+同一租户在关闭完成之前不会被重新打开。
+
+参数可通过环境变量配置：
+    TODO_TENANT_CAPACITY        同时打开的租户数（默认32）
+    TODO_TENANT_IDLE_SECONDS    空闲多久后关闭（默认600）
+    TODO_TENANT_DB_READERS      每个租户执行器的读线程数（默认2）
+"""
+import asyncio
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+from contextlib import asynccontextmanager
+
+from database.config import env_int
+from database.executor import get_executor
+from database.repository import close_repository, get_repository
+
+
+TENANT_CAPACITY = env_int("TODO_TENANT_CAPACITY", 32)
+TENANT_IDLE_TIMEOUT = env_int("TODO_TENANT_IDLE_SECONDS", 600)
+TENANT_DB_READERS = env_int("TODO_TENANT_DB_READERS", 2)
+
+# 租户名同时是文件名：只允许字母、数字、下划线和连字符
+_TENANT_RE = re.compile(r"^[A-Za-z0-9][A-Za-z0-9_-]{0,63}$")
+
+
+class InvalidTenant(ValueError):
+    pass
+
+
+def parse_tenant(value):
+    """校验租户名，不合法时抛出 InvalidTenant"""
+    if not isinstance(value, str) or not _TENANT_RE.match(value):
+        raise InvalidTenant("invalid tenant")
+    return value
+
+
+class _Tenant:
+    __slots__ = ("repo", "leases", "last_used")
+
+    def __init__(self, repo):
+        self.repo = repo
+        self.leases = 0
+        self.last_used = time.monotonic()
+
+
+class TenantRegistry:
+    def __init__(self, data_dir, capacity=TENANT_CAPACITY, idle_timeout=TENANT_IDLE_TIMEOUT,
+                 readers=TENANT_DB_READERS):
+        self.data_dir = data_dir
+        self.capacity = capacity
+        self.idle_timeout = idle_timeout
+        self.readers = readers
+        self._lock = threading.Lock()
+        # 租户 -> _Tenant，最久未使用的在前
+        self._tenants = OrderedDict()
+        # 正在关闭的租户 -> 关闭完成时设置的事件
+        self._closing = {}
+        self._hits = 0
+        self._opens = 0
+        self._evictions = 0
+        self._closed = False
+
+    def path(self, tenant):
+        return os.path.join(self.data_dir, parse_tenant(tenant) + ".db")
+
+    def _checkout(self, tenant):
+        """租户已打开时取得租约并返回仓库，否则返回None（不阻塞）"""
+        with self._lock:
+            entry = self._tenants.get(tenant)
+            if entry is None:
+                return None
+            entry.leases += 1
+            entry.last_used = time.monotonic()
+            self._tenants.move_to_end(tenant)
+            self._hits += 1
+            return entry.repo
+
+    def acquire(self, tenant):
+        """取得租户的租约并返回其仓库，必要时打开（阻塞：可能等待关闭、创建文件、执行迁移）"""
+        parse_tenant(tenant)
+        repo = self._checkout(tenant)
+        if repo is not None:
+            return repo
+        path = self.path(tenant)
+        while True:
+            with self._lock:
+                if self._closed:
+                    raise RuntimeError("tenant registry is closed")
+                closed = self._closing.get(tenant)
+            if closed is not None:
+                closed.wait()
+            os.makedirs(self.data_dir, exist_ok=True)
+            repo = get_repository(path)
+            # 执行器在这里首次创建，读线程数按租户的配置
+            get_executor(path, self.readers)
+            opened = False
+            with self._lock:
+                entry = self._tenants.get(tenant)
+                if entry is None:
+                    # 打开期间同一租户被其他请求打开后又关闭，重新打开
+                    if tenant in self._closing or repo.pool._closed:
+                        continue
+                    entry = self._tenants[tenant] = _Tenant(repo)
+                    self._opens += 1
+                    opened = True
+                else:
+                    self._hits += 1
+                entry.leases += 1
+                entry.last_used = time.monotonic()
+                self._tenants.move_to_end(tenant)
+                victims = self._select_victims()
+            self._close(victims)
+            if opened:
+                # 已持有租约，归档期间租户不会被关闭
+                try:
+                    entry.repo.archive_expired()
+                except Exception as e:
+                    print(f"租户 {tenant} 归档失败: {e}")
+            return entry.repo
+
+    def release(self, tenant):
+        with self._lock:
+            entry = self._tenants.get(tenant)
+            if entry is not None:
+                entry.leases -= 1
+                entry.last_used = time.monotonic()
+            victims = self._select_victims()
+        self._close(victims)
+
+    @asynccontextmanager
+    async def lease(self, tenant):
+        """异步服务器使用：已打开的租户直接取得租约，否则在线程中打开，不阻塞事件循环"""
+        repo = self._checkout(tenant)
+        if repo is None:
+            repo = await asyncio.to_thread(self.acquire, tenant)
+        try:
+            yield repo
+        finally:
+            self.release(tenant)
+
+    def _select_victims(self):
+        """在锁内选出要关闭的租户：超出容量时最久未使用的，以及空闲超时的；有租约的跳过
+
+        选中的租户在同一次加锁中移出 LRU 并登记为正在关闭，之后再打开它的请求会等待关闭完成。
+        """
+        now = time.monotonic()
+        victims = []
+        for tenant, entry in list(self._tenants.items()):
+            if entry.leases:
+                continue
+            if len(self._tenants) <= self.capacity and now - entry.last_used < self.idle_timeout:
+                break
+            del self._tenants[tenant]
+            self._closing[tenant] = threading.Event()
+            self._evictions += 1
+            victims.append(tenant)
+        return victims
+
+    def _close(self, tenants):
+        for tenant in tenants:
+            threading.Thread(target=self._close_tenant, args=(tenant,), name=f"tenant-close-{tenant}",
+                             daemon=True).start()
+
+    def _close_tenant(self, tenant):
+        try:
+            close_repository(self.path(tenant))
+        finally:
+            with self._lock:
+                self._closing.pop(tenant).set()
+
+    def sweep(self):
+        """关闭空闲超时的租户，返回关闭的租户数"""
+        with self._lock:
+            victims = self._select_victims()
+        self._close(victims)
+        return len(victims)
+
+    def stats(self):
+        with self._lock:
+            return {
+                "capacity": self.capacity,
+                "idleTimeoutSeconds": self.idle_timeout,
+                "open": len(self._tenants),
+                "leased": sum(1 for entry in self._tenants.values() if entry.leases),
+                "closing": len(self._closing),
+                "hits": self._hits,
+                "opens": self._opens,
+                "evictions": self._evictions,
+            }
+
+    def close(self):
+        """关闭全部租户（测试和进程退出时使用），等待关闭完成"""
+        with self._lock:
+            self._closed = True
+            tenants = list(self._tenants)
+            self._tenants.clear()
+            for tenant in tenants:
+                self._closing[tenant] = threading.Event()
+            closing = list(self._closing.values())
+        self._close(tenants)
+        for closed in closing:
+            closed.wait()
+
+
+_registries = {}
+_registries_lock = threading.Lock()
+
+
+def get_tenant_registry(data_dir):
+    """按数据目录获取共享的租户注册表；两个服务器在同一进程中时共用同一个"""
+    key = os.path.abspath(data_dir)
+    with _registries_lock:
+        registry = _registries.get(key)
+        if registry is None or registry._closed:
+            registry = TenantRegistry(key)
+            _registries[key] = registry
+        return registry
@@ -0,0 +1,48 @@
+"""任务列表的条件请求（ETag / If-None-Match）
+
+两个Web服务器共用。版本号来自迁移4建立的 tasks_version 计数器：
+tasks 表的任何修改都会让它加一。列表接口先读这一行，客户端带来的
+If-None-Match 与当前版本一致时直接返回 304，不查询 tasks 表。
+
+ETag 由租户和版本号决定：同一租户的同一URL（含 limit/after 参数）在版本
+不变时内容必然相同，所以可以跨分页参数共用同一个版本。各租户的版本号
+各自计数，同一URL只靠 X-Tenant-Id 请求头区分租户，因此ETag带上租户名
+（W/"<租户>:<版本>"，没有指定租户时为 W/"<版本>"），响应带 Vary: X-Tenant-Id，
+另一个租户的缓存不会被当作命中。使用弱ETag，压缩等传输层变换不影响比较。
+"""
+from email.utils import formatdate
+
+
+def read_version(conn):
+    """返回 (版本号, 最后修改时间的Unix秒)"""
+    return tuple(conn.execute("SELECT version, modified_at FROM tasks_version WHERE id = 1").fetchone())
+
+
+def etag(version, tenant=None):
+    if tenant is None:
+        return f'W/"{version[0]}"'
+    return f'W/"{tenant}:{version[0]}"'
+
+
+def version_headers(version, tenant=None):
+    """列表响应（包括304）都带上的缓存相关响应头"""
+    return {
+        "ETag": etag(version, tenant),
+        # 同一URL的内容随租户请求头变化（见 server.tenancy）
+        "Vary": "X-Tenant-Id",
+        "Last-Modified": formatdate(version[1], usegmt=True),
+        # 允许缓存，但每次使用前都要带 If-None-Match 重新验证
+        "Cache-Control": "no-cache",
+    }
+
+
+def not_modified(if_none_match, version, tenant=None):
+    """按弱比较判断 If-None-Match 是否命中租户的当前版本"""
+    if not if_none_match:
+        return False
+    current = etag(version, tenant).removeprefix("W/")
+    for tag in if_none_match.split(","):
+        tag = tag.strip()
+        if tag == "*" or tag.removeprefix("W/") == current:
+            return True
+    return False
@@ -3,194 +3,28 @@ import os
 import locale
 import threading
 import time
-import json
-import sqlite3
-from urllib.parse import urlparse
-from http.server import HTTPServer, SimpleHTTPRequestHandler, BaseHTTPRequestHandler
-from socketserver import ThreadingMixIn
 
 from PySide6.QtWidgets import QApplication
 from PySide6.QtQml import QQmlApplicationEngine
 from PySide6.QtCore import QObject, Slot, QUrl, QCoreApplication, Qt
 from PySide6.QtQuickControls2 import QQuickStyle
 
+from server import fallback
+
 # 创建一个日志处理类，用于处理QML中的console.log输出
 class ConsoleLogger(QObject):
     @Slot(str)
     def log(self, message):
         print(str(message))
 
-# 简单的Web服务器类
-class ThreadedHTTPServer(ThreadingMixIn, HTTPServer):
-    pass
-
-class AppHTTPRequestHandler(BaseHTTPRequestHandler):
-    def _json(self, data, code=200):
-        body = json.dumps(data, ensure_ascii=False).encode()
-        self.send_response(code)
-        self.send_header('Content-Type', 'application/json; charset=utf-8')
-        self.send_header('Content-Length', str(len(body)))
-        self.end_headers()
-        self.wfile.write(body)
-
-    def _db(self):
-        db_path = os.path.join(os.path.dirname(__file__), 'data', 'tasks.db')
-        conn = sqlite3.connect(db_path)
-        conn.row_factory = sqlite3.Row
-        return conn
-
-    def _row(self, row):
-        return {
-            'id': row['id'],
-            'title': row['title'] or '',
-            'description': row['description'] or '',
-            'quadrant': row['quadrant'],
-            'isCompleted': bool(row['is_completed']),
-            'createdAt': row['created_at'],
-            'orderIndex': row['order_index'] if 'order_index' in row.keys() else 0
-        }
-
-    def do_GET(self):
-        parsed = urlparse(self.path)
-        if parsed.path == '/':
-            index_path = os.path.join(os.path.dirname(__file__), 'webui', 'index.html')
-            if os.path.exists(index_path):
-                with open(index_path, 'rb') as f:
-                    content = f.read()
-                self.send_response(200)
-                self.send_header('Content-Type', 'text/html; charset=utf-8')
-                self.send_header('Content-Length', str(len(content)))
-                self.end_headers()
-                self.wfile.write(content)
-                return
-        if parsed.path == '/api/tasks':
-            conn = self._db()
-            cur = conn.cursor()
-            cur.execute('SELECT * FROM tasks WHERE is_completed = 0 ORDER BY quadrant ASC, order_index ASC, created_at DESC')
-            rows = cur.fetchall()
-            conn.close()
-            self._json([self._row(r) for r in rows])
-            return
-        if parsed.path == '/api/tasks/completed':
-            conn = self._db()
-            cur = conn.cursor()
-            cur.execute('SELECT * FROM tasks WHERE is_completed = 1 ORDER BY created_at DESC')
-            rows = cur.fetchall()
-            conn.close()
-            self._json([self._row(r) for r in rows])
-            return
-        self.send_response(404)
-        self.end_headers()
-
-    def do_POST(self):
-        parsed = urlparse(self.path)
-        if parsed.path == '/api/tasks':
-            length = int(self.headers.get('Content-Length', '0'))
-            payload = json.loads(self.rfile.read(length) or b'{}')
-            title = payload.get('title', '').strip()
-            description = payload.get('description', '')
-            quadrant = int(payload.get('quadrant', 4))
-            if not title:
-                self._json({'error': 'title required'}, 400)
-                return
-            conn = self._db()
-            cur = conn.cursor()
-            cur.execute('INSERT INTO tasks (title, description, quadrant) VALUES (?, ?, ?)', (title, description, quadrant))
-            conn.commit()
-            task_id = cur.lastrowid
-            cur.execute('SELECT * FROM tasks WHERE id = ?', (task_id,))
-            row = cur.fetchone()
-            conn.close()
-            self._json(self._row(row), 201)
-            return
-        self.send_response(404)
-        self.end_headers()
-
-    def do_PATCH(self):
-        parsed = urlparse(self.path)
-        length = int(self.headers.get('Content-Length', '0'))
-        payload = json.loads(self.rfile.read(length) or b'{}')
-        if parsed.path.startswith('/api/tasks/') and parsed.path.endswith('/quadrant'):
-            task_id = int(parsed.path.split('/')[3])
-            quadrant = int(payload.get('quadrant', 4))
-            conn = self._db()
-            cur = conn.cursor()
-            cur.execute('UPDATE tasks SET quadrant = ? WHERE id = ?', (quadrant, task_id))
-            conn.commit()
-            cur.execute('SELECT * FROM tasks WHERE id = ?', (task_id,))
-            row = cur.fetchone()
-            conn.close()
-            if row is None:
-                self._json({'error': 'not found'}, 404)
-            else:
-                self._json(self._row(row))
-            return
-        if parsed.path.startswith('/api/tasks/') and parsed.path.endswith('/complete'):
-            task_id = int(parsed.path.split('/')[3])
-            completed = bool(payload.get('completed', True))
-            conn = self._db()
-            cur = conn.cursor()
-            cur.execute('UPDATE tasks SET is_completed = ? WHERE id = ?', (1 if completed else 0, task_id))
-            conn.commit()
-            cur.execute('SELECT * FROM tasks WHERE id = ?', (task_id,))
-            row = cur.fetchone()
-            conn.close()
-            if row is None:
-                self._json({'error': 'not found'}, 404)
-            else:
-                self._json(self._row(row))
-            return
-        if parsed.path.startswith('/api/tasks/') and not parsed.path.endswith('/complete') and not parsed.path.endswith('/quadrant'):
-            task_id = int(parsed.path.split('/')[3])
-            title = payload.get('title')
-            description = payload.get('description')
-            conn = self._db()
-            cur = conn.cursor()
-            cur.execute('UPDATE tasks SET title = COALESCE(?, title), description = COALESCE(?, description) WHERE id = ?', (title, description, task_id))
-            conn.commit()
-            cur.execute('SELECT * FROM tasks WHERE id = ?', (task_id,))
-            row = cur.fetchone()
-            conn.close()
-            if row is None:
-                self._json({'error': 'not found'}, 404)
-            else:
-                self._json(self._row(row))
-            return
-        self.send_response(404)
-        self.end_headers()
-
-    def do_DELETE(self):
-        parsed = urlparse(self.path)
-        if parsed.path.startswith('/api/tasks/') and parsed.path.count('/') == 3:
-            task_id = int(parsed.path.split('/')[3])
-            conn = self._db()
-            cur = conn.cursor()
-            cur.execute('DELETE FROM tasks WHERE id = ?', (task_id,))
-            conn.commit()
-            conn.close()
-            self._json({'ok': True})
-            return
-        if parsed.path == '/api/tasks/completed':
-            conn = self._db()
-            cur = conn.cursor()
-            cur.execute('DELETE FROM tasks WHERE is_completed = 1')
-            conn.commit()
-            conn.close()
-            self._json({'ok': True})
-            return
-        self.send_response(404)
-        self.end_headers()
-
 # 导入应用程序所需的模型和控制器类
 from models.task_model_optimized import TaskModel
 from controllers.task_controller_optimized import TaskController
 
 def start_web_server():
+    # 没有安装 uvicorn 时使用的内置服务器（asyncio，支持持久连接）
     try:
-        port = 8080
-        server = ThreadedHTTPServer(('localhost', port), AppHTTPRequestHandler)
-        print(f"Web服务器已启动，访问 http://localhost:{port}")
-        server.serve_forever()
+        fallback.run('localhost', 8080)
     except Exception as e:
         print(f"Web服务器启动失败: {str(e)}")
 
@@ -275,12 +109,53 @@ def main():
         traceback.print_exc()
         return -6
 
+def export_tasks(db_path, fmt, output_path):
+    # 逐块写出全部任务（含归档），内存占用与任务数无关
+    from database.export import export_to_file
+    from database.migrations import ensure_schema
+    ensure_schema(db_path)
+    if output_path in (None, "-"):
+        return export_to_file(db_path, sys.stdout.buffer, fmt)
+    with open(output_path, "wb") as output:
+        size = export_to_file(db_path, output, fmt)
+    print(f"已导出到 {output_path}（{size} 字节）", file=sys.stderr)
+    return size
+
+def import_tasks(db_path, input_path, fmt):
+    # 批量导入（一个事务），每批之后在标准错误输出进度；
+    # 超过 SMALL_IMPORT 个任务时是离线导入，需先关闭桌面端和Web服务器（见 database.bulk_import）
+    from database.bulk_import import import_file
+    def progress(count):
+        print(f"已导入 {count} 个任务...", file=sys.stderr)
+    count = import_file(db_path, input_path, fmt, progress)
+    print(f"已从 {input_path} 导入 {count} 个任务", file=sys.stderr)
+    return count
+
 if __name__ == "__main__":
     import argparse
     parser = argparse.ArgumentParser()
-    parser.add_argument("--mode", choices=["desktop", "web"], default="desktop")
+    parser.add_argument("--mode", choices=["desktop", "web", "export", "import"], default="desktop")
+    parser.add_argument("--format", choices=["ndjson", "csv", "todotxt"],
+                        help="导出格式，默认 ndjson；导入格式，默认按扩展名判断（todotxt 只能导入）")
+    parser.add_argument("--output", default="-", help="导出文件，默认写到标准输出（--mode export）")
+    parser.add_argument("--input", help="要导入的文件（--mode import）；大批量导入期间占用写锁，请先关闭桌面端和Web服务器")
+    parser.add_argument("--db", default=fallback.DB_PATH, help="数据库文件（--mode export/import）")
     args = parser.parse_args()
-    if args.mode == "web":
+    if args.mode == "export":
+        if args.format == "todotxt":
+            parser.error("todotxt 只支持导入")
+        export_tasks(args.db, args.format or "ndjson", args.output)
+    elif args.mode == "import":
+        if not args.input:
+            parser.error("--mode import 需要 --input")
+        from database.bulk_import import ImportBusy
+        try:
+            import_tasks(args.db, args.input, args.format)
+        except ImportBusy:
+            sys.exit("导入失败: 数据库正在被其他进程写入，请先关闭桌面端和Web服务器后重试")
+        except ValueError as e:
+            sys.exit(f"导入失败: {e}")
+    elif args.mode == "web":
         try:
             import uvicorn
             from server.app import app
@@ -0,0 +1,165 @@
+"""已完成任务的分页列表模型
+
+已完成任务页面直接绑定本模型，不再用定时器反复全表查询。
+- 按 created_at DESC, id DESC 排序（与 idx_tasks_completed 一致）
+- 视图滚动到底部时通过 canFetchMore/fetchMore 按页加载，
+  每页以上一页最后一行的 (created_at, id) 作为游标做键集分页
+  （database.pagination），翻到第几页都只扫描一页的索引
+- 完成、取消完成、删除、清空时由 TaskModel 调用对应方法增量更新
+"""
+from bisect import bisect_left
+
+from PySide6.QtCore import QAbstractListModel, QModelIndex, Qt, QByteArray
+
+from models.task_store import _timestamp_key
+
+# 每次 fetchMore 读取的行数
+COMPLETED_PAGE_SIZE = 200
+
+COMPLETED_FIELDS = ("id", "title", "description", "quadrant", "created_at")
+COMPLETED_COLUMNS = ", ".join(COMPLETED_FIELDS)
+
+
+def _sort_key(task_id, created_at):
+    """与SQL排序一致的升序键：创建时间新的在前，created_at为NULL的排在最后"""
+    return (-_timestamp_key(created_at), -task_id)
+
+
+class CompletedTasksModel(QAbstractListModel):
+    TaskIdRole = Qt.UserRole + 1
+    TaskTitleRole = Qt.UserRole + 2
+    TaskDescriptionRole = Qt.UserRole + 3
+    TaskQuadrantRole = Qt.UserRole + 4
+    CreatedAtRole = Qt.UserRole + 5
+
+    # 角色 -> (QML属性名, 行元组中的下标)，属性名与 CompletedTaskItem 保持一致
+    ROLE_FIELDS = {
+        TaskIdRole: (b'taskId', 0),
+        TaskTitleRole: (b'taskTitle', 1),
+        TaskDescriptionRole: (b'taskDescription', 2),
+        TaskQuadrantRole: (b'taskQuadrant', 3),
+        CreatedAtRole: (b'createdAt', 4),
+    }
+
+    def __init__(self, repo, page_size=COMPLETED_PAGE_SIZE, parent=None):
+        super().__init__(parent)
+        self.repo = repo
+        self.page_size = page_size
+        self._role_names = {role: QByteArray(name) for role, (name, _) in self.ROLE_FIELDS.items()}
+        self._rows = []
+        self._keys = []
+        # 任务id -> 排序键，按id定位行时用二分查找
+        self._key_of = {}
+        # 数据库中已没有更多行可加载
+        self._exhausted = False
+
+    def rowCount(self, parent=QModelIndex()):
+        if parent.isValid():
+            return 0
+        return len(self._rows)
+
+    def roleNames(self):
+        return self._role_names
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid() or index.row() >= len(self._rows):
+            return None
+        field = self.ROLE_FIELDS.get(role)
+        if field is None:
+            return None
+        value = self._rows[index.row()][field[1]]
+        if role == self.TaskTitleRole and value is None:
+            return "(无标题任务)"
+        if role == self.TaskDescriptionRole and value is None:
+            return ""
+        return value
+
+    def canFetchMore(self, parent=QModelIndex()):
+        return not parent.isValid() and not self._exhausted
+
+    def fetchMore(self, parent=QModelIndex()):
+        if parent.isValid() or self._exhausted:
+            return
+        after = self._rows[-1] if self._rows else None
+        rows, self._exhausted = self._query_page(after, self.page_size)
+        if not rows:
+            return
+        first = len(self._rows)
+        self.beginInsertRows(QModelIndex(), first, first + len(rows) - 1)
+        self._append(rows)
+        self.endInsertRows()
+
+    def _append(self, rows):
+        for row in rows:
+            key = _sort_key(row[0], row[4])
+            self._rows.append(row)
+            self._keys.append(key)
+            self._key_of[row[0]] = key
+
+    def _query_page(self, after, limit):
+        """读取排在 after 之后的最多 limit 行，同时返回是否已读完"""
+        after = None if after is None else [after[4], after[0]]
+        rows, next_cursor = self.repo.read(self.repo.completed_page, COMPLETED_COLUMNS, limit, after)
+        return [tuple(row) for row in rows], next_cursor is None
+
+    def row_of(self, task_id):
+        key = self._key_of.get(task_id)
+        if key is None:
+            return None
+        return bisect_left(self._keys, key)
+
+    def task_completed(self, row):
+        """任务被标记为完成后调用，row 为 UPDATE ... RETURNING 返回的行
+
+        落在已加载范围内时插入，否则留给后续 fetchMore。
+        """
+        task_id = row["id"]
+        if self.row_of(task_id) is not None:
+            return
+        record = tuple(row[name] for name in COMPLETED_FIELDS)
+        key = _sort_key(record[0], record[4])
+        position = bisect_left(self._keys, key)
+        if position == len(self._rows) and not self._exhausted:
+            # 排在已加载的最后一行之后，下一页游标会自然读到它
+            return
+        self.beginInsertRows(QModelIndex(), position, position)
+        self._rows.insert(position, record)
+        self._keys.insert(position, key)
+        self._key_of[task_id] = key
+        self.endInsertRows()
+
+    def remove(self, task_id):
+        """任务被取消完成或删除后调用"""
+        row = self.row_of(task_id)
+        if row is None:
+            return False
+        self.beginRemoveRows(QModelIndex(), row, row)
+        del self._rows[row]
+        del self._keys[row]
+        del self._key_of[task_id]
+        self.endRemoveRows()
+        return True
+
+    def clear(self):
+        """已完成任务被全部清空后调用"""
+        self._exhausted = True
+        if not self._rows:
+            return
+        self.beginRemoveRows(QModelIndex(), 0, len(self._rows) - 1)
+        self._rows = []
+        self._keys = []
+        self._key_of = {}
+        self.endRemoveRows()
+
+    def reload(self):
+        """与数据库重新同步，保留当前已加载的行数"""
+        loaded = len(self._rows)
+        self.beginResetModel()
+        self._rows = []
+        self._keys = []
+        self._key_of = {}
+        self._exhausted = False
+        if loaded:
+            rows, self._exhausted = self._query_page(None, loaded)
+            self._append(rows)
+        self.endResetModel()
@@ -0,0 +1,130 @@
+"""单个象限的实时任务列表模型
+
+QuadrantPanel 直接绑定这里的模型，不再在每次更新后重新查询数据库、
+重建整张列表。数据本身保存在 TaskModel 的 TaskStore 中，本模型只维护
+该象限内按排序键有序的任务id，并由 TaskModel 在每次修改后调用
+insert/remove/reposition/changed 发出细粒度的行通知。
+"""
+from bisect import bisect_left
+
+from PySide6.QtCore import QAbstractListModel, QModelIndex, Qt
+
+
+class QuadrantTaskModel(QAbstractListModel):
+    def __init__(self, store, quadrant, role_columns, role_names, parent=None):
+        super().__init__(parent)
+        self.quadrant = quadrant
+        self._store = store
+        self._role_columns = role_columns
+        self._role_names = role_names
+        self._ids = []
+        self._keys = []
+        # 任务id -> 插入时的排序键，删除时无需依赖存储中的当前值
+        self._key_of = {}
+
+    def rowCount(self, parent=QModelIndex()):
+        return len(self._ids)
+
+    def roleNames(self):
+        return self._role_names
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid() or index.row() >= len(self._ids):
+            return None
+        column = self._role_columns.get(role)
+        if column is None:
+            return None
+        value = column[self._store.slot_of(self._ids[index.row()])]
+        if column is self._store.completed:
+            return bool(value)
+        return value
+
+    def row_of(self, task_id):
+        key = self._key_of.get(task_id)
+        if key is None:
+            return None
+        return bisect_left(self._keys, key)
+
+    def reset(self):
+        """从存储中重建本象限的列表"""
+        self.beginResetModel()
+        store = self._store
+        entries = sorted(
+            (store.sort_key(task_id), task_id)
+            for task_id in store.ids
+            if task_id and store.quadrants[store.slot_of(task_id)] == self.quadrant
+        )
+        self._keys = [key for key, _ in entries]
+        self._ids = [task_id for _, task_id in entries]
+        self._key_of = dict(zip(self._ids, self._keys))
+        self.endResetModel()
+
+    def insert(self, task_id):
+        """任务已写入存储后调用，按排序键插入"""
+        key = self._store.sort_key(task_id)
+        row = bisect_left(self._keys, key)
+        self.beginInsertRows(QModelIndex(), row, row)
+        self._keys.insert(row, key)
+        self._ids.insert(row, task_id)
+        self._key_of[task_id] = key
+        self.endInsertRows()
+
+    def remove(self, task_id):
+        row = self.row_of(task_id)
+        if row is None:
+            return
+        self.beginRemoveRows(QModelIndex(), row, row)
+        del self._keys[row]
+        del self._ids[row]
+        del self._key_of[task_id]
+        self.endRemoveRows()
+
+    def reposition(self, task_id):
+        """排序相关字段变化后，把任务移动到新位置"""
+        old_row = self.row_of(task_id)
+        if old_row is None:
+            return
+        key = self._store.sort_key(task_id)
+        # 在移动前的列表中查找插入点，它同时就是 beginMoveRows 的目标行
+        destination = bisect_left(self._keys, key)
+        new_row = destination - 1 if destination > old_row else destination
+        self._key_of[task_id] = key
+        if new_row == old_row:
+            self._keys[old_row] = key
+            self.changed(task_id)
+            return
+        self.beginMoveRows(QModelIndex(), old_row, old_row, QModelIndex(), destination)
+        del self._keys[old_row]
+        del self._ids[old_row]
+        self._keys.insert(new_row, key)
+        self._ids.insert(new_row, task_id)
+        self.endMoveRows()
+
+    def resort(self):
+        """排序值被整体改写（如象限重排）后重新计算排序键
+
+        先后顺序不变时不发出任何行通知；顺序有变化时按布局变化通知视图。
+        """
+        entries = sorted((self._store.sort_key(task_id), task_id) for task_id in self._ids)
+        ids = [task_id for _, task_id in entries]
+        keys = [key for key, _ in entries]
+        if ids == self._ids:
+            self._keys = keys
+            self._key_of = dict(zip(ids, keys))
+            return
+        self.layoutAboutToBeChanged.emit()
+        new_row = {task_id: row for row, task_id in enumerate(ids)}
+        persistent = self.persistentIndexList()
+        moved = [self.createIndex(new_row[self._ids[index.row()]], 0) for index in persistent]
+        self._ids = ids
+        self._keys = keys
+        self._key_of = dict(zip(ids, keys))
+        self.changePersistentIndexList(persistent, moved)
+        self.layoutChanged.emit()
+
+    def changed(self, task_id, roles=()):
+        row = self.row_of(task_id)
+        if row is None:
+            return
+        index = self.createIndex(row, 0)
+        self.dataChanged.emit(index, index, list(roles))
@@ -1,17 +1,15 @@
-from PySide6.QtCore import QObject, Signal, Property, Slot, QAbstractListModel, QModelIndex, Qt, QByteArray
-import sqlite3
+from PySide6.QtCore import QObject, Signal, Property, Slot, QAbstractListModel, QModelIndex, Qt, QByteArray, QTimer
 import os
-from contextlib import contextmanager
 
-class Task:
-    def __init__(self, id=None, title="", description="", quadrant=4, is_completed=False, created_at=None, order_index=0):
-        self.id = id
-        self.title = title
-        self.description = description
-        self.quadrant = quadrant  # 1-4对应四个象限
-        self.is_completed = is_completed
-        self.created_at = created_at
-        self.order_index = order_index
+from database.pagination import DEFAULT_PAGE_LIMIT, parse_limit
+from database.repository import get_repository
+from database.search import DEFAULT_SEARCH_LIMIT, parse_search_limit
+from models.completed_model import CompletedTasksModel
+from models.quadrant_model import QuadrantTaskModel
+from models.task_store import Task, TaskStore
+
+# 同步时变化行数超过该值（且超过当前行数一半）时，直接重置模型更划算
+REFRESH_RESET_THRESHOLD = 500
 
 class TaskModel(QAbstractListModel):
     # 定义角色
@@ -23,204 +21,172 @@ class TaskModel(QAbstractListModel):
     CreatedAtRole = Qt.UserRole + 6
     OrderIndexRole = Qt.UserRole + 7
     
-    # 信号
-    dataChanged = Signal(QModelIndex, QModelIndex, list)
+    # 角色 -> (QML属性名, TaskStore列名)
+    ROLE_COLUMNS = {
+        IdRole: (b'id', 'id'),
+        TitleRole: (b'title', 'title'),
+        DescriptionRole: (b'description', 'description'),
+        QuadrantRole: (b'quadrant', 'quadrant'),
+        IsCompletedRole: (b'isCompleted', 'is_completed'),
+        CreatedAtRole: (b'createdAt', 'created_at'),
+        OrderIndexRole: (b'orderIndex', 'order_index'),
+    }
+    
+    COLUMN_ROLES = {name: role for role, (_, name) in ROLE_COLUMNS.items()}
+    
+    # 影响象限内排序位置的列
+    SORT_COLUMNS = ('order_index', 'created_at')
+    
+    # 信号（dataChanged沿用基类信号，视图才能收到细粒度的修改通知）
     taskAdded = Signal()
     taskRemoved = Signal()
     taskMoved = Signal(int, int, arguments=["oldQuadrant", "newQuadrant"])
     
-    def __init__(self, parent=None):
+    def __init__(self, parent=None, db_path=None):
         super().__init__(parent)
-        self.tasks = []
-        self.db_path = os.path.join(os.path.dirname(os.path.dirname(__file__)), "data", "tasks.db")
-        self.init_database()
+        self.tasks = TaskStore()  # 按id倒序的活动任务（列式存储），支持按id快速定位行号
+        self._role_columns = {role: self.tasks.column(name) for role, (_, name) in self.ROLE_COLUMNS.items()}
+        self._role_names = {role: QByteArray(qml_name) for role, (qml_name, _) in self.ROLE_COLUMNS.items()}
+        # 四个象限各自的实时列表模型，与本模型共用同一份列存储
+        self._quadrant_models = {
+            quadrant: QuadrantTaskModel(self.tasks, quadrant, self._role_columns, self._role_names, self)
+            for quadrant in range(1, 5)
+        }
+        self.db_path = db_path or os.path.join(os.path.dirname(os.path.dirname(__file__)), "data", "tasks.db")
+        # SQL、连接和行转换都由仓库负责（与Web服务器共用），首次获取时执行结构迁移
+        self.repo = get_repository(self.db_path)
+        self.pool = self.repo.pool
+        # 已完成任务的分页模型，由视图按需 fetchMore
+        self._completed_model = CompletedTasksModel(self.repo, parent=self)
+        # 已安排延迟重排的象限
+        self._pending_rebalance = set()
+        # 完成时间早于 TODO_ARCHIVE_AFTER_DAYS 天的任务先移入归档（见 database.archive）
+        self.repo.archive_expired()
         self.load_tasks()
     
-    @contextmanager
-    def _get_db_connection(self):
-        """获取数据库连接，使用上下文管理器模式"""
-        conn = sqlite3.connect(self.db_path)
-        conn.row_factory = sqlite3.Row  # 使结果可以通过列名访问
-        try:
-            yield conn
-        finally:
-            conn.close()
-    
-    def _execute_query(self, query, params=(), fetch_all=False, commit=False):
-        """执行SQL查询并返回结果，减少代码重复"""
-        with self._get_db_connection() as conn:
-            cursor = conn.cursor()
-            cursor.execute(query, params)
-            
-            if commit:
-                conn.commit()
-                return cursor.lastrowid if cursor.lastrowid else True
-            
-            if fetch_all:
-                return cursor.fetchall()
-            else:
-                return cursor.fetchone()
-    
-    def init_database(self):
-        # 确保数据目录存在
-        data_dir = os.path.dirname(self.db_path)
-        if not os.path.exists(data_dir):
-            os.makedirs(data_dir)
-        
-        # 创建数据库连接和表
-        with self._get_db_connection() as conn:
-            cursor = conn.cursor()
-            
-            # 创建任务表
-            cursor.execute('''
-            CREATE TABLE IF NOT EXISTS tasks (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                title TEXT NOT NULL,
-                description TEXT,
-                quadrant INTEGER DEFAULT 4,
-                is_completed BOOLEAN DEFAULT 0,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                order_index INTEGER DEFAULT 0
-            )
-            ''')
-            
-            # 检查是否需要添加order_index列
-            cursor.execute("PRAGMA table_info(tasks)")
-            columns = cursor.fetchall()
-            has_order_index = any(column[1] == 'order_index' for column in columns)
-            
-            if not has_order_index:
-                cursor.execute("ALTER TABLE tasks ADD COLUMN order_index INTEGER DEFAULT 0")
-            
-            conn.commit()
-    
     def load_tasks(self):
         # 从数据库加载任务
-        rows = self._execute_query(
-            "SELECT * FROM tasks WHERE is_completed = 0 ORDER BY created_at DESC",
-            fetch_all=True
-        )
-        
+        # 行顺序由TaskStore按id倒序维护，这里无需排序；列顺序与TaskStore.COLUMNS一致
+        self._reset_rows(self.repo.read(self.repo.active_rows))
+    
+    def _reset_rows(self, rows):
         self.beginResetModel()
-        self.tasks = []
-        if rows:
-            for row in rows:
-                task = Task(
-                    id=row['id'],
-                    title=row['title'],
-                    description=row['description'],
-                    quadrant=row['quadrant'],
-                    is_completed=row['is_completed'],
-                    created_at=row['created_at'],
-                    order_index=row['order_index']
-                )
-                self.tasks.append(task)
+        self.tasks.reset(rows)
         self.endResetModel()
+        for quadrant_model in self._quadrant_models.values():
+            quadrant_model.reset()
+    
+    def _insert_row(self, record):
+        """插入一条记录（字段顺序同 TaskStore.COLUMNS），并通知所属象限模型"""
+        task_id = record[0]
+        row = self.tasks.insert_row(task_id)
+        self.beginInsertRows(QModelIndex(), row, row)
+        self.tasks.insert(*record)
+        self.endInsertRows()
+        quadrant_model = self._quadrant_models.get(self.tasks.get(task_id).quadrant)
+        if quadrant_model is not None:
+            quadrant_model.insert(task_id)
+    
+    def _remove_row(self, task_id):
+        row = self.tasks.row_of(task_id)
+        if row is None:
+            return False
+        quadrant_model = self._quadrant_models.get(self.tasks.get(task_id).quadrant)
+        if quadrant_model is not None:
+            quadrant_model.remove(task_id)
+        self.beginRemoveRows(QModelIndex(), row, row)
+        self.tasks.remove(task_id)
+        self.endRemoveRows()
+        return True
+    
+    def _update_row(self, task_id, fields):
+        """更新任务的若干列，并向本模型和象限模型发出对应的修改/移动通知"""
+        row = self.tasks.row_of(task_id)
+        if row is None:
+            return False
+        old_quadrant = self.tasks.get(task_id).quadrant
+        self.tasks.update(task_id, **fields)
+        roles = [self.COLUMN_ROLES[name] for name in fields]
+        index = self.createIndex(row, 0)
+        self.dataChanged.emit(index, index, roles)
+        
+        new_quadrant = self.tasks.get(task_id).quadrant
+        old_model = self._quadrant_models.get(old_quadrant)
+        new_model = self._quadrant_models.get(new_quadrant)
+        if new_quadrant != old_quadrant:
+            if old_model is not None:
+                old_model.remove(task_id)
+            if new_model is not None:
+                new_model.insert(task_id)
+        elif new_model is not None:
+            if any(name in self.SORT_COLUMNS for name in fields):
+                new_model.reposition(task_id)
+            else:
+                new_model.changed(task_id, roles)
+        return True
+    
+    @Slot(int, result=QObject)
+    def quadrantModel(self, quadrant):
+        """返回指定象限的实时列表模型，供QML绑定"""
+        return self._quadrant_models.get(quadrant)
+    
+    @Slot(result=QObject)
+    def completedModel(self):
+        """返回已完成任务的分页列表模型，供QML绑定"""
+        return self._completed_model
     
     def rowCount(self, parent=QModelIndex()):
         return len(self.tasks)
     
     def roleNames(self):
-        roles = {
-            self.IdRole: QByteArray(b'id'),
-            self.TitleRole: QByteArray(b'title'),
-            self.DescriptionRole: QByteArray(b'description'),
-            self.QuadrantRole: QByteArray(b'quadrant'),
-            self.IsCompletedRole: QByteArray(b'isCompleted'),
-            self.CreatedAtRole: QByteArray(b'createdAt'),
-            self.OrderIndexRole: QByteArray(b'orderIndex')
-        }
-        return roles
+        return self._role_names
     
     def data(self, index, role=Qt.DisplayRole):
         if not index.isValid() or index.row() >= len(self.tasks):
             return None
         
-        task = self.tasks[index.row()]
-        
-        if role == self.IdRole:
-            return task.id
-        elif role == self.TitleRole:
-            return task.title
-        elif role == self.DescriptionRole:
-            return task.description
-        elif role == self.QuadrantRole:
-            return task.quadrant
-        elif role == self.IsCompletedRole:
-            return task.is_completed
-        elif role == self.CreatedAtRole:
-            return task.created_at
-        elif role == self.OrderIndexRole:
-            return task.order_index
-        
-        return None
+        column = self._role_columns.get(role)
+        if column is None:
+            return None
+        
+        # 直接从列存储读取，不构造任务对象
+        value = column[self.tasks.slot_at(index.row())]
+        if role == self.IsCompletedRole:
+            return bool(value)
+        return value
     
     @Slot(str, str, int, result=bool)
     def addTask(self, title, description, quadrant=4):
         if not title.strip():
             return False
         
-        # 插入任务到数据库
-        task_id = self._execute_query(
-            "INSERT INTO tasks (title, description, quadrant) VALUES (?, ?, ?)",
-            (title, description, quadrant),
-            commit=True
-        )
-        
-        # 获取创建时间
-        created_at_row = self._execute_query(
-            "SELECT created_at FROM tasks WHERE id = ?", 
-            (task_id,)
-        )
-        created_at = created_at_row['created_at'] if created_at_row else None
-        
-        # 添加到模型
-        self.beginInsertRows(QModelIndex(), 0, 0)
-        new_task = Task(
-            id=task_id,
-            title=title,
-            description=description,
-            quadrant=quadrant,
-            is_completed=False,
-            created_at=created_at
-        )
-        self.tasks.insert(0, new_task)  # 添加到列表开头
-        self.endInsertRows()
+        # 插入任务到数据库，新任务排在象限最前面；返回的行带有id、创建时间和排序值，无需再查询一次
+        record = self.repo.write(self.repo.create, title, description, quadrant)
+        
+        # 添加到模型（新任务id最大，总是落在第0行）
+        self._insert_row(record)
         
         self.taskAdded.emit()
         return True
     
     @Slot(int, bool)
     def setTaskCompleted(self, task_id, completed):
-        # 在数据库中更新任务状态
-        self._execute_query(
-            "UPDATE tasks SET is_completed = ? WHERE id = ?",
-            (1 if completed else 0, task_id),
-            commit=True
-        )
+        # 在数据库中更新任务状态并取回这一行，任务不存在时没有结果
+        record = self.repo.write(self.repo.set_completed, task_id, completed)
+        if record is None:
+            return
         
-        # 在模型中更新任务
-        task_found = False
-        for i, task in enumerate(self.tasks):
-            if task.id == task_id:
-                task_found = True
-                task.is_completed = completed
-                index = self.createIndex(i, 0)
-                self.dataChanged.emit(index, index, [self.IsCompletedRole])
-                
-                # 如果任务完成，从未完成任务列表中移除
-                if completed:
-                    self.beginRemoveRows(QModelIndex(), i, i)
-                    self.tasks.pop(i)
-                    self.endRemoveRows()
-                    self.taskRemoved.emit()
-                break
-        
-        # 如果任务被标记为未完成且存在于任务列表中，刷新未完成任务列表
-        if not completed and task_found:
-            self.refreshTasks()
-            # 确保发出信号通知UI更新
-            self.taskAdded.emit()
+        if completed:
+            # 任务完成，从未完成任务列表中移除
+            if self._remove_row(task_id):
+                self.taskRemoved.emit()
+            self._completed_model.task_completed(record)
+        else:
+            # 取消完成的任务不在列表中：直接用返回的行插入到排序位置
+            if task_id not in self.tasks:
+                self._insert_row(record)
+                self.taskAdded.emit()
+            self._completed_model.remove(task_id)
     
     @Slot(int, str, str)
     def updateTask(self, task_id, title, description):
@@ -228,62 +194,85 @@ class TaskModel(QAbstractListModel):
             return
         
         # 在数据库中更新任务
-        self._execute_query(
-            "UPDATE tasks SET title = ?, description = ? WHERE id = ?",
-            (title, description, task_id),
-            commit=True
-        )
+        self.repo.write(self.repo.update, task_id, title, description)
         
         # 在模型中更新任务
-        for i, task in enumerate(self.tasks):
-            if task.id == task_id:
-                task.title = title
-                task.description = description
-                index = self.createIndex(i, 0)
-                self.dataChanged.emit(index, index, [self.TitleRole, self.DescriptionRole])
-                break
+        self._update_row(task_id, {'title': title, 'description': description})
     
     @Slot(int, int)
     def moveTaskToQuadrant(self, task_id, new_quadrant):
         if new_quadrant < 1 or new_quadrant > 4:
             return
         
-        # 先获取旧的象限
-        old_quadrant_row = self._execute_query(
-            "SELECT quadrant FROM tasks WHERE id = ?", 
-            (task_id,)
-        )
-        
-        if not old_quadrant_row:
+        # 旧象限取自内存中的活动任务，象限不变时无需写入
+        task = self.tasks.get(task_id)
+        old_quadrant = task.quadrant if task is not None else None
+        if new_quadrant == old_quadrant:
             return
         
-        # 使用字典方式访问sqlite3.Row对象可能导致类型错误，改用索引访问
-        old_quadrant = old_quadrant_row['quadrant']
-        
-        # 更新象限
-        self._execute_query(
-            "UPDATE tasks SET quadrant = ? WHERE id = ?",
-            (new_quadrant, task_id),
-            commit=True
-        )
+        # 更新象限，移入的任务排在新象限最前面；没有返回行说明任务不存在
+        moved = self.repo.write(self.repo.move, task_id, new_quadrant)
+        if moved is None:
+            return
+        order_index = moved['order_index']
         
         # 在模型中更新任务
-        for i, task in enumerate(self.tasks):
-            if task.id == task_id:
-                task.quadrant = new_quadrant
-                index = self.createIndex(i, 0)
-                self.dataChanged.emit(index, index, [self.QuadrantRole])
-                self.taskMoved.emit(old_quadrant, new_quadrant)
-                break
+        if self._update_row(task_id, {'quadrant': new_quadrant, 'order_index': order_index}):
+            self.taskMoved.emit(old_quadrant, new_quadrant)
+    
+    @Slot(int, int, int, result=bool)
+    def moveTaskBetween(self, task_id, before_id, after_id):
+        """把任务放到 before_id 之后、after_id 之前（-1 表示该侧没有任务）
+
+        排序值取两侧的中点，通常只改写被移动的这一行；
+        邻居在其他象限时任务同时移动到该象限。
+        """
+        try:
+            placed, _ = self.repo.write(self.repo.position, task_id, before_id, after_id)
+        except LookupError:
+            return False
+        if placed is None:
+            return False
+        quadrant, order_index, crowded, rebalanced = placed
+        
+        old_quadrant = self.tasks.get(task_id).quadrant if task_id in self.tasks else quadrant
+        if rebalanced:
+            # 放置前已同步重排，先读回整个象限的新排序值
+            self._reload_ranks(quadrant)
+        if self._update_row(task_id, {'quadrant': quadrant, 'order_index': order_index}) and old_quadrant != quadrant:
+            self.taskMoved.emit(old_quadrant, quadrant)
+        if crowded:
+            self._schedule_rebalance(quadrant)
+        return True
+    
+    def _schedule_rebalance(self, quadrant):
+        """间隔过小时安排一次重排，放到事件循环空闲时执行，不阻塞本次拖动"""
+        if quadrant in self._pending_rebalance:
+            return
+        self._pending_rebalance.add(quadrant)
+        QTimer.singleShot(0, lambda: self._rebalance(quadrant))
+    
+    def _rebalance(self, quadrant):
+        self._pending_rebalance.discard(quadrant)
+        self.repo.write(self.repo.rebalance, quadrant)
+        self._reload_ranks(quadrant)
+    
+    def _reload_ranks(self, quadrant):
+        """象限被重排后，从数据库读回排序值（重排不改变先后顺序）"""
+        rows = self.repo.read(self.repo.quadrant_ranks, quadrant)
+        for task_id, order_index in rows:
+            if task_id in self.tasks:
+                self.tasks.update(task_id, order_index=order_index)
+        if rows and len(self.tasks):
+            self.dataChanged.emit(self.createIndex(0, 0), self.createIndex(len(self.tasks) - 1, 0), [self.OrderIndexRole])
+        quadrant_model = self._quadrant_models.get(quadrant)
+        if quadrant_model is not None:
+            quadrant_model.resort()
     
     @Slot(int, result='QVariant')
     def getTasksByQuadrant(self, quadrant):
         # 获取指定象限的任务，并按order_index排序
-        rows = self._execute_query(
-            "SELECT * FROM tasks WHERE quadrant = ? AND is_completed = 0 ORDER BY order_index ASC, created_at DESC",
-            (quadrant,),
-            fetch_all=True
-        )
+        rows = self.repo.read(self.repo.quadrant_rows, quadrant)
         
         if not rows:
             return []
@@ -309,10 +298,7 @@ class TaskModel(QAbstractListModel):
     @Slot(result='QVariant')
     def getCompletedTasks(self):
         # 获取所有已完成任务，按创建时间倒序排列
-        rows = self._execute_query(
-            "SELECT * FROM tasks WHERE is_completed = 1 ORDER BY created_at DESC",
-            fetch_all=True
-        )
+        rows = self.repo.read(self.repo.completed_rows)
         
         if not rows:
             return []
@@ -330,9 +316,78 @@ class TaskModel(QAbstractListModel):
         
         return completed_tasks
     
+    @Slot(str, int, result='QVariant')
+    def searchTasks(self, query, limit=DEFAULT_SEARCH_LIMIT):
+        """全文搜索任务（含已完成任务），按相关度排序
+        
+        titleHighlight/snippet 是已转义的富文本，匹配处用 <b> 标出，
+        QML 中以 Text.StyledText 显示
+        """
+        if not query.strip():
+            return []
+        results = self.repo.read(self.repo.search, query, parse_search_limit(limit), '<b>', '</b>')
+        return [{
+            'id': result['id'],
+            'title': result['title'] or "(无标题任务)",
+            'description': result['description'],
+            'quadrant': result['quadrant'],
+            'isCompleted': result['isCompleted'],
+            'titleHighlight': result['titleHighlight'],
+            'snippet': result['snippet'],
+            'quadrantColor': "#4361ee"
+        } for result in results]
+    
+    @Slot(str, int, result='QVariant')
+    def getArchivedTasks(self, after="", limit=DEFAULT_PAGE_LIMIT):
+        """按完成时间倒序读取一页归档任务，返回 {tasks, nextCursor}；after 为空表示第一页"""
+        tasks, next_cursor = self.repo.read(self.repo.archived_page, parse_limit(limit), after or None)
+        return {
+            'tasks': [{
+                'id': task['id'],
+                'title': task['title'] or "(无标题任务)",
+                'description': task['description'],
+                'quadrant': task['quadrant'],
+                'createdAt': task['createdAt'],
+                'completedAt': task['completedAt'],
+                'quadrantColor': "#4361ee"
+            } for task in tasks],
+            'nextCursor': next_cursor or ""
+        }
+    
     @Slot()
     def refreshTasks(self):
-        self.load_tasks()
+        """与数据库同步活动任务，只对有变化的行发出插入、删除和修改通知"""
+        rows = self.repo.read(self.repo.active_rows)
+        # 已完成任务只保留已加载的页数，直接重新读取
+        self._completed_model.reload()
+        fresh = {record['id']: record for record in rows}
+        removed = [task_id for task_id in self.tasks.ids if task_id and task_id not in fresh]
+        added = [task_id for task_id in fresh if task_id not in self.tasks]
+        
+        changes = len(removed) + len(added)
+        if changes > REFRESH_RESET_THRESHOLD and changes > len(self.tasks) // 2:
+            self._reset_rows(rows)
+            return
+        
+        for task_id in removed:
+            self._remove_row(task_id)
+        
+        for task_id in added:
+            self._insert_row(fresh[task_id])
+        
+        # 其余行逐列比较，只通知真正变化的角色
+        added_ids = set(added)
+        for task_id, record in fresh.items():
+            if task_id in added_ids:
+                continue
+            names = self.tasks.changed_fields(task_id, record)
+            if names:
+                self._update_row(task_id, {name: record[name] for name in names})
+        
+        if removed:
+            self.taskRemoved.emit()
+        if added:
+            self.taskAdded.emit()
     
     @Slot(int, int)
     def updateTaskOrder(self, task_id, new_order_index):
@@ -340,29 +395,15 @@ class TaskModel(QAbstractListModel):
         if new_order_index < 0:
             return
         
-        # 获取任务的象限
-        quadrant_row = self._execute_query(
-            "SELECT quadrant FROM tasks WHERE id = ?", 
-            (task_id,)
-        )
-        
-        if not quadrant_row:
+        # 更新排序索引，任务不存在时没有返回行
+        if self.repo.write(self.repo.set_order, task_id, new_order_index) is None:
             return
-        
-        # 更新排序索引
-        self._execute_query(
-            "UPDATE tasks SET order_index = ? WHERE id = ?",
-            (new_order_index, task_id),
-            commit=True
-        )
+        self._update_row(task_id, {'order_index': new_order_index})
     
     @Slot(result='QVariant')
     def getAllTasks(self):
         # 获取所有任务（不包括已完成任务），按象限和order_index排序
-        rows = self._execute_query(
-            "SELECT * FROM tasks WHERE is_completed = 0 ORDER BY quadrant ASC, order_index ASC, created_at DESC",
-            fetch_all=True
-        )
+        rows = self.repo.read(self.repo.sorted_active_rows)
         
         if not rows:
             return []
@@ -383,28 +424,18 @@ class TaskModel(QAbstractListModel):
     def deleteTask(self, task_id):
         """删除任务"""
         # 从数据库中删除任务
-        self._execute_query(
-            "DELETE FROM tasks WHERE id = ?",
-            (task_id,),
-            commit=True
-        )
+        self.repo.write(self.repo.delete, task_id)
         
         # 从模型中删除任务
-        for i, task in enumerate(self.tasks):
-            if task.id == task_id:
-                self.beginRemoveRows(QModelIndex(), i, i)
-                self.tasks.pop(i)
-                self.endRemoveRows()
-                self.taskRemoved.emit()
-                break
+        if self._remove_row(task_id):
+            self.taskRemoved.emit()
+        self._completed_model.remove(task_id)
     
     @Slot()
     def clearCompletedTasks(self):
         """清空所有已完成任务"""
         # 从数据库中删除所有已完成任务
-        self._execute_query(
-            "DELETE FROM tasks WHERE is_completed = 1",
-            commit=True
-        )
+        self.repo.write(self.repo.clear_completed)
+        self._completed_model.clear()
         
         print("所有已完成任务已清空")
\ No newline at end of file
@@ -0,0 +1,309 @@
+"""活动任务的列式行存储
+
+TaskModel 按任务id倒序展示活动任务（新建任务id最大，排在第0行）。
+
+行顺序：一棵以任务id为下标的树状数组（Fenwick树）记录哪些id在列表中
+- id -> 行号：行号等于比它大的id个数，O(log n)
+- 行号 -> 任务：在树上做第k小查找，O(log n)
+- 插入/删除：只更新树上 O(log n) 个节点，不移动其他元素
+因为行号由id顺序决定，取消完成的旧任务重新插入时会自动落在正确位置，
+调用方只需先取 insert_row() 作为 beginInsertRows 的行号即可。
+
+字段存储：不再为每个任务创建对象，而是按列存放在紧凑数组中
+- id/象限/完成状态/排序值 使用 array，每行只占十几个字节
+- 标题、描述、创建时间为字符串列表，描述和创建时间经过驻留（intern），
+  大量空描述和同一秒创建的任务共享同一个字符串对象
+- 删除任务后槽位放入空闲列表，下次插入时复用
+"""
+import sys
+from array import array
+
+
+class Task:
+    def __init__(self, id=None, title="", description="", quadrant=4, is_completed=False, created_at=None, order_index=0):
+        self.id = id
+        self.title = title
+        self.description = description
+        self.quadrant = quadrant  # 1-4对应四个象限
+        self.is_completed = is_completed
+        self.created_at = created_at
+        self.order_index = order_index
+
+
+def _intern(value):
+    return sys.intern(value) if isinstance(value, str) else value
+
+
+_NON_DIGITS = {ord(char): None for char in "-: T."}
+
+
+def _timestamp_key(created_at):
+    """把 "YYYY-MM-DD HH:MM:SS" 转成可比较的整数，无法解析时返回0"""
+    if not created_at:
+        return 0
+    try:
+        return int(created_at.translate(_NON_DIGITS))
+    except (AttributeError, ValueError):
+        return 0
+
+
+def _as_number(value, convert, default):
+    """数值列只能存数字，数据库里的脏数据（如错位写入的文本）退回默认值"""
+    try:
+        return convert(value)
+    except (TypeError, ValueError):
+        return default
+
+
+class TaskStore:
+    # 列名，顺序与 Task 构造参数一致
+    COLUMNS = ("id", "title", "description", "quadrant", "is_completed", "created_at", "order_index")
+
+    def __init__(self):
+        self._init_columns()
+        self._reset_index(0)
+
+    def _init_columns(self):
+        self.ids = array("q")
+        self.titles = []
+        self.descriptions = []
+        self.quadrants = array("b")
+        self.completed = array("b")
+        self.created_ats = []
+        self.order_indexes = array("d")
+        self._free_slots = []
+
+    def _reset_index(self, max_id):
+        self._count = 0
+        self._capacity = 0
+        self._tree = array("i", [0])
+        self._slot_of = array("i", [-1])
+        self._top_bit = 0
+        # data() 会对同一行连续读取多个角色，缓存最近一次行号查找结果
+        self._cached_row = -1
+        self._cached_slot = -1
+        self._grow(max_id)
+
+    def column(self, name):
+        """按列名返回列存储，供模型按角色直接读取"""
+        return {
+            "id": self.ids,
+            "title": self.titles,
+            "description": self.descriptions,
+            "quadrant": self.quadrants,
+            "is_completed": self.completed,
+            "created_at": self.created_ats,
+            "order_index": self.order_indexes,
+        }[name]
+
+    def __len__(self):
+        return self._count
+
+    def __contains__(self, task_id):
+        return self.slot_of(task_id) is not None
+
+    def __iter__(self):
+        """按行顺序（id倒序）遍历任务快照"""
+        for task_id in sorted((task_id for task_id in self.ids if task_id), reverse=True):
+            yield self.get(task_id)
+
+    def slot_of(self, task_id):
+        if task_id is None or task_id <= 0 or task_id > self._capacity:
+            return None
+        slot = self._slot_of[task_id]
+        return slot if slot >= 0 else None
+
+    def get(self, task_id):
+        """返回任务快照（Task对象），不存在时返回None"""
+        slot = self.slot_of(task_id)
+        if slot is None:
+            return None
+        return Task(
+            id=self.ids[slot],
+            title=self.titles[slot],
+            description=self.descriptions[slot],
+            quadrant=self.quadrants[slot],
+            is_completed=bool(self.completed[slot]),
+            created_at=self.created_ats[slot],
+            order_index=self.order_indexes[slot],
+        )
+
+    @staticmethod
+    def _normalize(name, value):
+        """把外部传入的值转换成列中实际保存的形式"""
+        if name in ("description", "created_at"):
+            return _intern(value)
+        if name == "is_completed":
+            return 1 if value else 0
+        if name == "quadrant":
+            return _as_number(value, int, 4)
+        if name == "order_index":
+            return _as_number(value, float, 0.0)
+        return value
+
+    def update(self, task_id, **fields):
+        """更新任务的若干列"""
+        slot = self.slot_of(task_id)
+        if slot is None:
+            raise KeyError(task_id)
+        for name, value in fields.items():
+            if name == "id":
+                raise ValueError("task id is immutable")
+            self.column(name)[slot] = self._normalize(name, value)
+
+    def changed_fields(self, task_id, record):
+        """与一条数据库记录（字段顺序同 COLUMNS）比较，返回取值不同的列名列表"""
+        slot = self.slot_of(task_id)
+        if slot is None:
+            raise KeyError(task_id)
+        return [
+            name for name, value in zip(self.COLUMNS[1:], tuple(record)[1:])
+            if self.column(name)[slot] != self._normalize(name, value)
+        ]
+
+    def sort_key(self, task_id):
+        """象限内的排序键，与SQL的 ORDER BY order_index ASC, created_at DESC, id DESC 一致"""
+        slot = self._slot_of[task_id]
+        return (self.order_indexes[slot], -_timestamp_key(self.created_ats[slot]), -task_id)
+
+    def _grow(self, task_id):
+        """容量不足时按倍数扩容并以 O(n) 重建整棵树"""
+        capacity = max(task_id, self._capacity * 2, 1024)
+        tree = array("i", bytes(4 * (capacity + 1)))
+        slot_of = array("i", [-1]) * (capacity + 1)
+        for slot, existing_id in enumerate(self.ids):
+            if existing_id:
+                tree[existing_id] += 1
+                slot_of[existing_id] = slot
+        for i in range(1, capacity + 1):
+            parent = i + (i & -i)
+            if parent <= capacity:
+                tree[parent] += tree[i]
+        self._capacity = capacity
+        self._tree = tree
+        self._slot_of = slot_of
+        self._top_bit = 1 << (capacity.bit_length() - 1)
+
+    def _add(self, task_id, delta):
+        tree = self._tree
+        capacity = self._capacity
+        i = task_id
+        while i <= capacity:
+            tree[i] += delta
+            i += i & -i
+
+    def _prefix(self, task_id):
+        """返回 id <= task_id 的任务数量"""
+        tree = self._tree
+        total = 0
+        i = min(task_id, self._capacity)
+        while i > 0:
+            total += tree[i]
+            i -= i & -i
+        return total
+
+    def row_of(self, task_id):
+        """返回任务所在行号，不存在时返回None"""
+        if self.slot_of(task_id) is None:
+            return None
+        return self._count - self._prefix(task_id)
+
+    def insert_row(self, task_id):
+        """返回插入该任务后它将处于的行号"""
+        return self._count - self._prefix(task_id)
+
+    def slot_at(self, row):
+        """返回第row行任务所在的列槽位"""
+        if row == self._cached_row:
+            return self._cached_slot
+        if row < 0 or row >= self._count:
+            raise IndexError(row)
+        # 第row行是第(count - row)小的id
+        remaining = self._count - row
+        tree = self._tree
+        position = 0
+        step = self._top_bit
+        while step:
+            candidate = position + step
+            if candidate <= self._capacity and tree[candidate] < remaining:
+                position = candidate
+                remaining -= tree[candidate]
+            step >>= 1
+        slot = self._slot_of[position + 1]
+        self._cached_row = row
+        self._cached_slot = slot
+        return slot
+
+    def at(self, row):
+        """返回第row行的任务快照"""
+        return self.get(self.ids[self.slot_at(row)])
+
+    def _store(self, id, title="", description="", quadrant=4, is_completed=False, created_at=None, order_index=0):
+        """写入列存储并返回槽位，不更新行索引"""
+        normalize = self._normalize
+        values = (
+            id,
+            title,
+            normalize("description", description),
+            normalize("quadrant", quadrant),
+            normalize("is_completed", is_completed),
+            normalize("created_at", created_at),
+            normalize("order_index", order_index),
+        )
+        if self._free_slots:
+            slot = self._free_slots.pop()
+            self.ids[slot], self.titles[slot], self.descriptions[slot], self.quadrants[slot], \
+                self.completed[slot], self.created_ats[slot], self.order_indexes[slot] = values
+        else:
+            slot = len(self.ids)
+            self.ids.append(values[0])
+            self.titles.append(values[1])
+            self.descriptions.append(values[2])
+            self.quadrants.append(values[3])
+            self.completed.append(values[4])
+            self.created_ats.append(values[5])
+            self.order_indexes.append(values[6])
+        return slot
+
+    def insert(self, id, title="", description="", quadrant=4, is_completed=False, created_at=None, order_index=0):
+        """插入任务并返回其行号"""
+        if self.slot_of(id) is not None:
+            raise KeyError(f"task {id} already present")
+        if id > self._capacity:
+            self._grow(id)
+        row = self.insert_row(id)
+        self._slot_of[id] = self._store(id, title, description, quadrant, is_completed, created_at, order_index)
+        self._add(id, 1)
+        self._count += 1
+        self._cached_row = -1
+        return row
+
+    def remove(self, task_id):
+        """移除任务并返回它原来的行号"""
+        row = self.row_of(task_id)
+        if row is None:
+            raise KeyError(task_id)
+        slot = self._slot_of[task_id]
+        self._slot_of[task_id] = -1
+        self.ids[slot] = 0
+        self.titles[slot] = None
+        self.descriptions[slot] = None
+        self.created_ats[slot] = None
+        self._free_slots.append(slot)
+        self._add(task_id, -1)
+        self._count -= 1
+        self._cached_row = -1
+        return row
+
+    def reset(self, rows):
+        """用给定记录整体替换存储内容，记录字段顺序同 COLUMNS
+
+        各列原地清空，column() 返回的列对象在重置后依然有效。
+        """
+        for name in self.COLUMNS:
+            del self.column(name)[:]
+        self._free_slots = []
+        for row in rows:
+            self._store(*row)
+        self._reset_index(max(self.ids, default=0))
+        self._count = len(self.ids)
@@ -55,7 +55,7 @@ Rectangle {
                 
                 Text {
                     id: taskCount
-                    text: "0"
+                    text: taskListView.count
                     font.pixelSize: 14
                     color: "#8d99ae"
                 }
@@ -69,23 +69,17 @@ Rectangle {
             Layout.fillHeight: true
             // 添加clip属性确保内容不会溢出到四象限面板边界外
             clip: true
-            model: taskController.getTasksForQuadrant(quadrantNumber)
+            // 绑定象限的实时模型，任务增删改由模型的行通知驱动，无需手动刷新
+            model: taskController.quadrantModel(quadrantNumber)
             delegate: TaskItem {
                 width: ListView.view.width
                 
-                // 控制器返回字典数组，数据在model.modelData中
-                title: model.modelData ? model.modelData.title : ""
-                description: model.modelData ? model.modelData.description : ""
-                quadrant: model.modelData ? model.modelData.quadrant : 1
-                isCompleted: model.modelData ? model.modelData.isCompleted : false
+                // 数据直接来自模型角色
+                title: model.title
+                description: model.description || ""
+                quadrant: model.quadrant
+                isCompleted: model.isCompleted
                 quadrantColor: quadrantPanel.quadrantColor
-                
-                // 调试信息
-                Component.onCompleted: {
-                    console.log("TaskItem创建 - 标题:", title, "象限:", quadrant, "是否完成:", isCompleted)
-                    console.log("模型数据 - 原始model:", model)
-                    console.log("模型数据 - modelData:", model ? model.modelData : "无")
-                }
             }
             spacing: 1
             
@@ -135,25 +129,4 @@ Rectangle {
             }
         }
     }
-    
-    // 更新任务计数
-    function updateTaskCount() {
-        taskCount.text = taskListView.count
-    }
-    
-    // 监听任务列表变化
-    Connections {
-        target: taskController
-        function onTaskUpdated() {
-            // 重新设置模型以获取最新任务数据
-            taskListView.model = taskController.getTasksForQuadrant(quadrantNumber)
-            updateTaskCount()
-        }
-    }
-    
-    Component.onCompleted: {
-        // 初始设置模型
-        taskListView.model = taskController.getTasksForQuadrant(quadrantNumber)
-        updateTaskCount()
-    }
 }
\ No newline at end of file
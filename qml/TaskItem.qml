@@ -40,6 +40,7 @@ Rectangle {
     // 调试信息
     Component.onCompleted: {
         console.log("TaskItem创建 - 标题:", title, "从四象限:", quadrant, "是否完成:", isCompleted)
+        opacity = 1
     }
     
     onTitleChanged: {
@@ -58,14 +59,29 @@ Rectangle {
         duration: 300
         easing.type: Easing.InOutQuad
     }
-
-    Component.onCompleted: {
-        opacity = 1
-    }
     
     // 拖放相关属性
     property bool dragActive: false
     property point dragStart
+    readonly property int taskId: model.id
+    
+    // 松开拖动手柄时按落点所在行重新排序，只改写被拖动任务的排序值
+    function dropAt(point) {
+        var view = taskItem.ListView.view
+        if (!view) return
+        var target = view.indexAt(point.x, point.y)
+        if (target < 0 || target === index) return
+        // 向下拖放到目标之后，向上拖放到目标之前
+        var beforeRow = target > index ? target : target - 1
+        var afterRow = target > index ? target + 1 : target
+        taskController.moveTaskBetween(taskId, rowTaskId(view, beforeRow), rowTaskId(view, afterRow))
+    }
+    
+    // 未创建的行返回-1，由后端按排序值查找实际相邻的任务
+    function rowTaskId(view, row) {
+        var item = row >= 0 ? view.itemAtIndex(row) : null
+        return item ? item.taskId : -1
+    }
     
     ColumnLayout {
         id: contentLayout
@@ -91,8 +107,8 @@ Rectangle {
                 MouseArea {
                     anchors.fill: parent
                     onClicked: {
-                        // 控制器返回字典数组，任务ID在model.modelData.id中
-                        taskController.setTaskCompleted(model.modelData.id, !isCompleted)
+                        // 任务ID来自象限模型的id角色
+                        taskController.setTaskCompleted(model.id, !isCompleted)
                     }
                 }
                 
@@ -123,8 +139,8 @@ Rectangle {
                     MouseArea {
                         anchors.fill: parent
                         onClicked: {
-                            // 控制器返回字典数组，任务ID在model.modelData.id中
-                            editTaskDialog.open(model.modelData.id, title, description, quadrant)
+                            // 任务ID来自象限模型的id角色
+                            editTaskDialog.open(model.id, title, description, quadrant)
                         }
                     }
                 }
@@ -186,13 +202,14 @@ Rectangle {
                         dragActive = true
                         dragStart = Qt.point(mouseX, mouseY)
                     }
-                    onReleased: {
-                        dragActive = false
-                    }
-                    onPositionChanged: {
+                    onReleased: function(mouse) {
                         if (dragActive) {
-                            // 这里可以实现拖动功能
+                            var view = taskItem.ListView.view
+                            if (view) {
+                                taskItem.dropAt(mapToItem(view.contentItem, mouse.x, mouse.y))
+                            }
                         }
+                        dragActive = false
                     }
                     cursorShape: Qt.OpenHandCursor
                 }
@@ -215,8 +232,8 @@ Rectangle {
                 MouseArea {
                     anchors.fill: parent
                     onClicked: {
-                        // 控制器返回字典数组，任务ID在model.modelData.id中
-                        editTaskDialog.open(model.modelData.id, title, description, quadrant)
+                        // 任务ID来自象限模型的id角色
+                        editTaskDialog.open(model.id, title, description, quadrant)
                     }
                 }
                 
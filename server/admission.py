@@ -0,0 +1,237 @@
+"""Web服务器的准入控制（两个服务器共用）
+
+请求进入路由之前先取得一个处理名额：
+- 全局最多 HTTP_MAX_ACTIVE 个请求同时处理，其余按到达顺序排队；
+  排队数达到 HTTP_MAX_QUEUE 或等待超过 HTTP_QUEUE_TIMEOUT 秒时直接拒绝
+- 每类路由另有并发上限（包括排队中的请求），超过时直接拒绝，
+  一类请求（例如大量写入）不会占满全部名额
+- /api/events 是长连接，不占用全局名额，只受自己的连接数上限约束
+- 被拒绝的请求返回 503 和 Retry-After，快速失败，不在服务端堆积
+
+名额在请求完全处理完（流式响应发送结束）后归还。带租户路径前缀（/t/<租户>）的请求按去掉前缀后的路径分类。
+参数可通过环境变量配置：
+    TODO_HTTP_MAX_ACTIVE        同时处理的请求数（默认64）
+    TODO_HTTP_MAX_QUEUE         最多排队的请求数（默认128）
+    TODO_HTTP_QUEUE_TIMEOUT_MS  排队的最长时间（默认1000）
+    TODO_HTTP_WRITE_LIMIT       写请求的并发上限（默认32）
+    TODO_HTTP_EVENT_STREAMS     /api/events 连接数上限（默认100）
+    TODO_HTTP_MAX_CONNECTIONS   内置服务器的连接数上限（默认1024）
+"""
+import asyncio
+import collections
+import json
+import threading
+from contextlib import asynccontextmanager
+
+from database.config import env_int
+from server.tenancy import strip_tenant_prefix
+
+
+HTTP_MAX_ACTIVE = env_int("TODO_HTTP_MAX_ACTIVE", 64)
+HTTP_MAX_QUEUE = env_int("TODO_HTTP_MAX_QUEUE", 128)
+HTTP_QUEUE_TIMEOUT = env_int("TODO_HTTP_QUEUE_TIMEOUT_MS", 1000) / 1000
+HTTP_WRITE_LIMIT = env_int("TODO_HTTP_WRITE_LIMIT", 32)
+HTTP_EVENT_STREAMS = env_int("TODO_HTTP_EVENT_STREAMS", 100)
+HTTP_MAX_CONNECTIONS = env_int("TODO_HTTP_MAX_CONNECTIONS", 1024)
+
+# 被拒绝时建议客户端等待的秒数
+RETRY_AFTER = 1
+
+# 不占用全局名额的路由类别（长连接）
+UNPOOLED_ROUTES = ("events",)
+
+
+def classify(method, path):
+    """请求所属的路由类别；静态资源和统计接口不做准入控制，返回None"""
+    path = strip_tenant_prefix(path)
+    if not path.startswith("/api/") or path.startswith("/api/stats/"):
+        return None
+    if path == "/api/events":
+        return "events"
+    return "read" if method in ("GET", "HEAD") else "write"
+
+
+class Overloaded(Exception):
+    def __init__(self, reason, retry_after=RETRY_AFTER):
+        super().__init__(reason)
+        self.reason = reason
+        self.retry_after = retry_after
+
+    def headers(self):
+        return {"Retry-After": str(self.retry_after)}
+
+
+class _Waiter:
+    __slots__ = ("loop", "future", "granted")
+
+    def __init__(self, loop):
+        self.loop = loop
+        self.future = loop.create_future()
+        self.granted = False
+
+
+def _wake(future):
+    if not future.done():
+        future.set_result(None)
+
+
+class AdmissionController:
+    """全局名额 + 排队 + 按路由类别的并发上限
+
+    计数由线程锁保护，同一个控制器可以被多个事件循环（例如测试中
+    先后创建的服务器）使用；名额在请求之间直接移交给排在最前的等待者。
+    """
+
+    def __init__(self, max_active=HTTP_MAX_ACTIVE, max_queue=HTTP_MAX_QUEUE, queue_timeout=HTTP_QUEUE_TIMEOUT,
+                 route_limits=None, max_connections=HTTP_MAX_CONNECTIONS, retry_after=RETRY_AFTER):
+        self.max_active = max_active
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self.max_connections = max_connections
+        self.retry_after = retry_after
+        if route_limits is None:
+            route_limits = {"write": HTTP_WRITE_LIMIT, "events": HTTP_EVENT_STREAMS}
+        self.route_limits = dict(route_limits)
+        self._lock = threading.Lock()
+        self._active = 0
+        self._waiters = collections.deque()
+        self._routes = collections.Counter()
+        self._connections = 0
+        self._admitted = 0
+        self._queued = 0
+        self._peak_queue = 0
+        self._rejected = collections.Counter()
+
+    def _reject(self, reason):
+        self._rejected[reason] += 1
+        return Overloaded(reason, self.retry_after)
+
+    async def acquire(self, route):
+        """取得名额，超出限制时抛出 Overloaded"""
+        with self._lock:
+            limit = self.route_limits.get(route)
+            if limit is not None and self._routes[route] >= limit:
+                raise self._reject(f"route:{route}")
+            if route in UNPOOLED_ROUTES or (self._active < self.max_active and not self._waiters):
+                if route not in UNPOOLED_ROUTES:
+                    self._active += 1
+                self._routes[route] += 1
+                self._admitted += 1
+                return
+            if len(self._waiters) >= self.max_queue:
+                raise self._reject("queue_full")
+            waiter = _Waiter(asyncio.get_running_loop())
+            self._waiters.append(waiter)
+            self._routes[route] += 1
+            self._queued += 1
+            self._peak_queue = max(self._peak_queue, len(self._waiters))
+        try:
+            await asyncio.wait_for(waiter.future, self.queue_timeout)
+        except (asyncio.TimeoutError, asyncio.CancelledError) as e:
+            with self._lock:
+                granted = waiter.granted
+                if not granted:
+                    self._waiters.remove(waiter)
+                    self._routes[route] -= 1
+                    if isinstance(e, asyncio.TimeoutError):
+                        raise self._reject("queue_timeout")
+            if isinstance(e, asyncio.CancelledError):
+                # 名额已经移交过来但调用方被取消，立即归还
+                if granted:
+                    self.release(route)
+                raise
+            # 超时与移交同时发生：名额已经是我们的，继续处理
+        with self._lock:
+            self._admitted += 1
+
+    def release(self, route):
+        with self._lock:
+            self._routes[route] -= 1
+            if route in UNPOOLED_ROUTES:
+                return
+            if self._waiters:
+                # 名额直接移交，active 计数不变
+                waiter = self._waiters.popleft()
+                waiter.granted = True
+                waiter.loop.call_soon_threadsafe(_wake, waiter.future)
+            else:
+                self._active -= 1
+
+    @asynccontextmanager
+    async def slot(self, route):
+        if route is None:
+            yield
+            return
+        await self.acquire(route)
+        try:
+            yield
+        finally:
+            self.release(route)
+
+    def connect(self):
+        """内置服务器接受连接时调用，超过连接数上限时返回False"""
+        with self._lock:
+            if self._connections >= self.max_connections:
+                self._rejected["connections"] += 1
+                return False
+            self._connections += 1
+            return True
+
+    def disconnect(self):
+        with self._lock:
+            self._connections -= 1
+
+    def stats(self):
+        with self._lock:
+            return {
+                "maxActive": self.max_active,
+                "maxQueue": self.max_queue,
+                "queueTimeoutMs": self.queue_timeout * 1000,
+                "routeLimits": dict(self.route_limits),
+                "active": self._active,
+                "queueDepth": len(self._waiters),
+                "peakQueueDepth": self._peak_queue,
+                "routes": {route: count for route, count in self._routes.items() if count},
+                "connections": self._connections,
+                "admitted": self._admitted,
+                "queued": self._queued,
+                "rejected": dict(self._rejected),
+            }
+
+
+def overloaded_body(error, key="detail"):
+    """503 响应体；FastAPI 的错误字段是 detail，内置服务器是 error"""
+    return json.dumps({key: "server busy", "reason": error.reason}).encode()
+
+
+class AdmissionMiddleware:
+    """FastAPI（ASGI）的准入控制中间件；名额在响应发送完毕后归还"""
+
+    def __init__(self, app, controller):
+        self.app = app
+        self.controller = controller
+
+    async def __call__(self, scope, receive, send):
+        route = classify(scope.get("method", ""), scope.get("path", "")) if scope["type"] == "http" else None
+        if route is None:
+            await self.app(scope, receive, send)
+            return
+        try:
+            await self.controller.acquire(route)
+        except Overloaded as e:
+            body = overloaded_body(e)
+            await send({
+                "type": "http.response.start",
+                "status": 503,
+                "headers": [
+                    (b"content-type", b"application/json"),
+                    (b"content-length", str(len(body)).encode()),
+                    (b"retry-after", str(e.retry_after).encode()),
+                ],
+            })
+            await send({"type": "http.response.body", "body": body})
+            return
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            self.controller.release(route)
@@ -1,11 +1,28 @@
+import asyncio
+import json
 import os
 import sqlite3
-from contextlib import contextmanager
-from fastapi import FastAPI, HTTPException
+from contextlib import asynccontextmanager
+from fastapi import BackgroundTasks, FastAPI, HTTPException, Query, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.staticfiles import StaticFiles
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel, Field
 
+from database.archive import ARCHIVE_AFTER_DAYS, SEGMENT_SIZE, archive_periodically
+from database.batch import BatchError
+from database.changes import latest_seq, parse_seq
+from database.export import EXPORT_FORMATS, export_stream, parse_format
+from database.pagination import InvalidCursor, page_headers, parse_limit
+from database.repository import TaskRepository, get_repository, row_to_task
+from database.search import parse_search_limit
+from database.tenants import TenantRegistry, get_tenant_registry
+from database.versioning import version_headers
+from server.admission import AdmissionController, AdmissionMiddleware
+from server.assets import JSON_GZIP_LEVEL, MIN_COMPRESS_SIZE, get_assets
+from server.events import change_stream
+from server.tenancy import PREFIX_SCOPE_KEY, TenantMiddleware, current_repository, current_tenant
+
 
 class TaskCreate(BaseModel):
     title: str = Field(min_length=1)
@@ -26,138 +43,263 @@ class TaskComplete(BaseModel):
     completed: bool = True
 
 
+class TaskPosition(BaseModel):
+    beforeId: int | None = None
+    afterId: int | None = None
+
+
+class TaskBatch(BaseModel):
+    operations: list
+
+
+class ArchiveRequest(BaseModel):
+    # 0 表示归档全部已完成任务
+    olderThanDays: int = Field(default=ARCHIVE_AFTER_DAYS, ge=0)
+
+
 DATA_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), "data")
 DB_PATH = os.path.join(DATA_DIR, "tasks.db")
+# 租户数据库所在目录（见 server.tenancy）
+TENANT_DIR = os.environ.get("TODO_TENANT_DIR", os.path.join(DATA_DIR, "tenants"))
 
 
-@contextmanager
-def get_conn():
-    conn = sqlite3.connect(DB_PATH)
-    conn.row_factory = sqlite3.Row
-    try:
-        yield conn
-    finally:
-        conn.close()
+def get_repo() -> TaskRepository:
+    """当前请求所属租户的仓库，没有指定租户时为 DB_PATH 的仓库；迁移只在进程内首次访问时执行一次"""
+    return current_repository() or get_repository(DB_PATH)
 
 
-def row_to_task(row: sqlite3.Row) -> dict:
-    return {
-        "id": row["id"],
-        "title": str(row["title"]) if row["title"] is not None else "",
-        "description": str(row["description"]) if row["description"] is not None else "",
-        "quadrant": row["quadrant"],
-        "isCompleted": bool(row["is_completed"]),
-        "createdAt": row["created_at"],
-        "orderIndex": row["order_index"] if "order_index" in row.keys() else 0,
-    }
+def get_tenants() -> TenantRegistry:
+    """租户注册表，与同一进程中的内置服务器共用"""
+    return get_tenant_registry(TENANT_DIR)
 
 
-app = FastAPI()
+def task_or_404(row: sqlite3.Row | None) -> dict:
+    """仓库写入方法返回None说明任务不存在"""
+    if row is None:
+        raise HTTPException(status_code=404)
+    return row_to_task(row)
 
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # 默认数据库的定期归档；租户在打开时归档（见 database.tenants）
+    archiver = asyncio.create_task(archive_periodically(lambda: get_repository(DB_PATH)))
+    try:
+        yield
+    finally:
+        archiver.cancel()
+
+
+app = FastAPI(lifespan=lifespan)
+
+
+# 最内层：去掉 /t/<租户> 前缀，并在整个响应期间持有租户的租约
+app.add_middleware(TenantMiddleware, get_registry=get_tenants)
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["*"],
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Total-Count", "X-Next-Cursor", "Link", "ETag", "Last-Modified"],
 )
+# 较大的 JSON 响应按 Accept-Encoding 用 gzip 压缩；事件流和已压缩的静态资源不会重复处理
+app.add_middleware(GZipMiddleware, minimum_size=MIN_COMPRESS_SIZE, compresslevel=JSON_GZIP_LEVEL)
+# 最外层：超出并发/排队上限的请求在进入其他中间件和路由之前就返回503
+admission = AdmissionController()
+app.add_middleware(AdmissionMiddleware, controller=admission)
 
+# 启动时读入并预压缩网页端资源
+get_assets()
 
-if os.path.isdir(os.path.join(os.path.dirname(os.path.dirname(__file__)), "webui")):
-    app.mount("/", StaticFiles(directory=os.path.join(os.path.dirname(os.path.dirname(__file__)), "webui"), html=True), name="webui")
+# 以下路由都是 async def：数据库操作交给执行器（repo.db）的专用读/写线程，
+# 事件循环只负责收发请求。SQL 和行转换都在 database.repository 中。
+
+async def list_page(listing: str, request: Request, limit: int | None, after: str | None) -> Response:
+    """按游标读取一页任务，总数和下一页游标通过响应头返回；支持 If-None-Match
+
+    响应体由SQLite直接生成JSON（fetch_page_json），原样返回，不经过 FastAPI 的编码器。
+    """
+    repo = get_repo()
+    tenant = current_tenant()
+    try:
+        limit = parse_limit(limit)
+        version, page = await repo.db.read(
+            repo.page, listing, limit, after, request.headers.get("if-none-match"), tenant
+        )
+    except InvalidCursor:
+        raise HTTPException(status_code=400, detail="invalid cursor")
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if page is None:
+        return Response(status_code=304, headers=version_headers(version, tenant))
+    body, next_cursor, total = page
+    headers = version_headers(version, tenant)
+    headers.update(page_headers(request.scope.get(PREFIX_SCOPE_KEY, "") + request.url.path, total, limit, next_cursor))
+    return Response(content=body, media_type="application/json", headers=headers)
 
 
 @app.get("/api/tasks")
-def get_tasks():
-    with get_conn() as conn:
-        cur = conn.cursor()
-        cur.execute("SELECT * FROM tasks WHERE is_completed = 0 ORDER BY quadrant ASC, order_index ASC, created_at DESC")
-        rows = cur.fetchall()
-        return [row_to_task(r) for r in rows]
+async def get_tasks(request: Request, limit: int | None = None, after: str | None = None):
+    return await list_page("active", request, limit, after)
 
 
 @app.get("/api/tasks/completed")
-def get_completed_tasks():
-    with get_conn() as conn:
-        cur = conn.cursor()
-        cur.execute("SELECT * FROM tasks WHERE is_completed = 1 ORDER BY created_at DESC")
-        rows = cur.fetchall()
-        return [row_to_task(r) for r in rows]
+async def get_completed_tasks(request: Request, limit: int | None = None, after: str | None = None):
+    return await list_page("completed", request, limit, after)
+
+
+@app.get("/api/tasks/search")
+async def search_tasks(q: str = "", limit: int | None = None):
+    """全文搜索标题和描述，按相关度排序；titleHighlight/snippet 为已转义的 HTML，匹配处用 <mark> 标出"""
+    if not q.strip():
+        raise HTTPException(status_code=400, detail="q required")
+    try:
+        limit = parse_search_limit(limit)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    repo = get_repo()
+    return await repo.db.read(repo.search, q, limit)
+
+
+@app.get("/api/tasks/export")
+async def export_tasks(fmt: str | None = Query(default=None, alias="format")):
+    """全部任务（含归档）的 NDJSON/CSV 导出；逐块读取、分块传输，内存占用与任务数无关"""
+    try:
+        fmt = parse_format(fmt)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    repo = get_repo()
+    return StreamingResponse(
+        export_stream(repo.db, repo.db_path, fmt),
+        media_type=EXPORT_FORMATS[fmt],
+        headers={"Content-Disposition": f'attachment; filename="tasks.{fmt}"', "Cache-Control": "no-store"},
+    )
+
+
+@app.get("/api/archive")
+async def get_archived_tasks(request: Request, limit: int | None = None, after: str | None = None):
+    """按完成时间倒序浏览归档任务，总数和下一页游标通过响应头返回"""
+    repo = get_repo()
+    try:
+        limit = parse_limit(limit)
+        tasks, next_cursor, total = await repo.db.read(repo.archive_listing, limit, after)
+    except InvalidCursor:
+        raise HTTPException(status_code=400, detail="invalid cursor")
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    headers = page_headers(request.scope.get(PREFIX_SCOPE_KEY, "") + request.url.path, total, limit, next_cursor)
+    return Response(content=json.dumps(tasks, ensure_ascii=False), media_type="application/json", headers=headers)
+
+
+@app.post("/api/archive")
+async def archive_tasks(payload: ArchiveRequest | None = None):
+    # 立即归档完成超过 olderThanDays 天的任务；每段一个事务
+    days = payload.olderThanDays if payload is not None else ARCHIVE_AFTER_DAYS
+    repo = get_repo()
+    archived = 0
+    while True:
+        count = await repo.db.write(repo.archive, days or None)
+        archived += count
+        if count < SEGMENT_SIZE:
+            return {"archived": archived}
 
 
 @app.post("/api/tasks")
-def create_task(payload: TaskCreate):
-    with get_conn() as conn:
-        cur = conn.cursor()
-        cur.execute(
-            "INSERT INTO tasks (title, description, quadrant) VALUES (?, ?, ?)",
-            (payload.title, payload.description, payload.quadrant),
-        )
-        conn.commit()
-        task_id = cur.lastrowid
-        cur.execute("SELECT * FROM tasks WHERE id = ?", (task_id,))
-        row = cur.fetchone()
-        return row_to_task(row)
+async def create_task(payload: TaskCreate):
+    repo = get_repo()
+    return row_to_task(await repo.db.write(repo.create, payload.title, payload.description, payload.quadrant))
+
+
+@app.post("/api/tasks/batch")
+async def batch_tasks(payload: TaskBatch):
+    # 各操作的校验在 apply_batch 中逐个进行，单个操作出错不影响其他操作
+    repo = get_repo()
+    try:
+        results = await repo.db.write(repo.batch, payload.operations)
+    except BatchError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return {"results": results}
 
 
 @app.patch("/api/tasks/{task_id}")
-def update_task(task_id: int, payload: TaskUpdate):
-    with get_conn() as conn:
-        cur = conn.cursor()
-        cur.execute("SELECT * FROM tasks WHERE id = ?", (task_id,))
-        if cur.fetchone() is None:
-            raise HTTPException(status_code=404)
-        if payload.title is not None or payload.description is not None:
-            cur.execute(
-                "UPDATE tasks SET title = COALESCE(?, title), description = COALESCE(?, description) WHERE id = ?",
-                (payload.title, payload.description, task_id),
-            )
-            conn.commit()
-        cur.execute("SELECT * FROM tasks WHERE id = ?", (task_id,))
-        row = cur.fetchone()
-        return row_to_task(row)
+async def update_task(task_id: int, payload: TaskUpdate):
+    repo = get_repo()
+    return task_or_404(await repo.db.write(repo.update, task_id, payload.title, payload.description))
 
 
 @app.patch("/api/tasks/{task_id}/quadrant")
-def move_task(task_id: int, payload: TaskQuadrant):
-    with get_conn() as conn:
-        cur = conn.cursor()
-        cur.execute("UPDATE tasks SET quadrant = ? WHERE id = ?", (payload.quadrant, task_id))
-        conn.commit()
-        cur.execute("SELECT * FROM tasks WHERE id = ?", (task_id,))
-        row = cur.fetchone()
-        if row is None:
-            raise HTTPException(status_code=404)
-        return row_to_task(row)
+async def move_task(task_id: int, payload: TaskQuadrant):
+    repo = get_repo()
+    return task_or_404(await repo.db.write(repo.move, task_id, payload.quadrant))
 
 
-@app.patch("/api/tasks/{task_id}/complete")
-def complete_task(task_id: int, payload: TaskComplete):
-    with get_conn() as conn:
-        cur = conn.cursor()
-        cur.execute("UPDATE tasks SET is_completed = ? WHERE id = ?", (1 if payload.completed else 0, task_id))
-        conn.commit()
-        cur.execute("SELECT * FROM tasks WHERE id = ?", (task_id,))
-        row = cur.fetchone()
-        if row is None:
-            raise HTTPException(status_code=404)
-        return row_to_task(row)
+@app.patch("/api/tasks/{task_id}/position")
+async def position_task(task_id: int, payload: TaskPosition, background_tasks: BackgroundTasks):
+    # 放到 beforeId 之后、afterId 之前，只改写这一行；间隔过小时在响应后重排象限
+    repo = get_repo()
+    try:
+        placed, row = await repo.db.write(repo.position, task_id, payload.beforeId, payload.afterId)
+    except LookupError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if placed is None:
+        raise HTTPException(status_code=404)
+    quadrant, _, crowded, _ = placed
+    if crowded:
+        background_tasks.add_task(repo.db.write, repo.rebalance, quadrant)
+    return row_to_task(row)
 
 
-@app.delete("/api/tasks/{task_id}")
-def delete_task(task_id: int):
-    with get_conn() as conn:
-        cur = conn.cursor()
-        cur.execute("DELETE FROM tasks WHERE id = ?", (task_id,))
-        conn.commit()
-        return {"ok": True}
+@app.patch("/api/tasks/{task_id}/complete")
+async def complete_task(task_id: int, payload: TaskComplete):
+    repo = get_repo()
+    return task_or_404(await repo.db.write(repo.set_completed, task_id, payload.completed))
 
 
 @app.delete("/api/tasks/completed")
-def clear_completed():
-    with get_conn() as conn:
-        cur = conn.cursor()
-        cur.execute("DELETE FROM tasks WHERE is_completed = 1")
-        conn.commit()
-        return {"ok": True}
\ No newline at end of file
+async def clear_completed():
+    repo = get_repo()
+    await repo.db.write(repo.clear_completed)
+    return {"ok": True}
+
+
+@app.delete("/api/tasks/{task_id}")
+async def delete_task(task_id: int):
+    repo = get_repo()
+    await repo.db.write(repo.delete, task_id)
+    return {"ok": True}
+
+
+@app.get("/api/events")
+async def task_events(request: Request, after: int | None = None):
+    # 浏览器重连时通过 Last-Event-ID 从断开处继续，否则从当前最新的变更开始
+    db = get_repo().db
+    start = parse_seq(request.headers.get("last-event-id"))
+    if start is None:
+        start = parse_seq(after)
+    if start is None:
+        start = await db.read(latest_seq)
+    return StreamingResponse(
+        change_stream(db, start, request.is_disconnected),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@app.get("/api/stats/pool")
+async def get_pool_stats():
+    repo = get_repo()
+    return {**repo.pool.stats(), "executor": repo.db.stats(), "cache": repo.cache_stats(),
+            "admission": admission.stats(), "tenants": get_tenants().stats()}
+
+
+# 静态资源路由匹配所有路径，必须放在所有API路由之后注册，否则会遮蔽API
+@app.api_route("/{asset_path:path}", methods=["GET", "HEAD"], include_in_schema=False)
+async def webui_asset(asset_path: str, request: Request):
+    result = get_assets().respond(
+        "/" + asset_path, request.headers.get("if-none-match"), request.headers.get("accept-encoding")
+    )
+    if result is None:
+        raise HTTPException(status_code=404)
+    status, headers, body = result
+    return Response(content=body, status_code=status, headers=headers)
@@ -0,0 +1,168 @@
+"""网页端静态资源
+
+两个Web服务器共用。启动时一次性读入 webui 目录下的所有文件，预先压缩为
+gzip（安装了 brotli 时再加一份 br），之后全部从内存返回：
+- 按请求的 Accept-Encoding（含 q 值）选择最合适的编码，响应带 Vary
+- 每种编码一个强ETag（内容哈希 + 编码），If-None-Match 命中时返回304
+- HTML 没有带版本号的文件名，使用 no-cache（每次用ETag重新验证）；
+  其他资源允许缓存一段时间
+
+JSON 接口的压缩见 maybe_compress()：响应体达到 MIN_COMPRESS_SIZE 且
+客户端接受 gzip 时才压缩，小响应压缩得不偿失。
+"""
+import gzip
+import hashlib
+import mimetypes
+import os
+import threading
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+WEBUI_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "webui")
+
+# 小于该字节数的内容不压缩
+MIN_COMPRESS_SIZE = 1024
+# 动态 JSON 每次都要压缩，取较快的压缩级别；静态资源只压缩一次，取最高级别
+JSON_GZIP_LEVEL = 5
+
+HTML_CACHE_CONTROL = "no-cache"
+ASSET_CACHE_CONTROL = "public, max-age=3600"
+
+# 同等 q 值时优先选择的编码
+_PREFERENCE = ("br", "gzip", "identity")
+
+
+class Asset:
+    __slots__ = ("content_type", "cache_control", "digest", "bodies")
+
+    def __init__(self, name, content):
+        content_type = mimetypes.guess_type(name)[0] or "application/octet-stream"
+        if content_type.startswith("text/") or content_type in ("application/javascript", "application/json"):
+            content_type += "; charset=utf-8"
+        self.content_type = content_type
+        self.cache_control = HTML_CACHE_CONTROL if name.endswith(".html") else ASSET_CACHE_CONTROL
+        self.digest = hashlib.sha256(content).hexdigest()[:32]
+        self.bodies = {"identity": content}
+        if len(content) >= MIN_COMPRESS_SIZE:
+            # mtime=0 让同一内容的压缩结果稳定，ETag 才有意义
+            compressed = gzip.compress(content, compresslevel=9, mtime=0)
+            if len(compressed) < len(content):
+                self.bodies["gzip"] = compressed
+            if brotli is not None:
+                compressed = brotli.compress(content)
+                if len(compressed) < len(content):
+                    self.bodies["br"] = compressed
+
+    def etag(self, encoding):
+        return f'"{self.digest}-{encoding}"'
+
+    def matches(self, if_none_match):
+        """If-None-Match 中任一编码的ETag都视为命中：内容相同，只是编码不同"""
+        if not if_none_match:
+            return False
+        for tag in if_none_match.split(","):
+            tag = tag.strip().removeprefix("W/")
+            if tag == "*" or tag.strip('"').rsplit("-", 1)[0] == self.digest:
+                return True
+        return False
+
+
+def parse_accept_encoding(header):
+    """返回 {编码: q值}；未声明 identity 时它总是可接受的"""
+    accepted = {}
+    for part in (header or "").split(","):
+        name, _, params = part.strip().partition(";")
+        name = name.strip().lower()
+        if not name:
+            continue
+        q = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        accepted[name] = q
+    wildcard = accepted.pop("*", None)
+    if wildcard is not None:
+        for encoding in _PREFERENCE:
+            accepted.setdefault(encoding, wildcard)
+    accepted.setdefault("identity", 0.001)
+    return accepted
+
+
+def negotiate(header, available):
+    """在 available 中选出 q 值最高的编码，都不可接受时返回None"""
+    accepted = parse_accept_encoding(header)
+    best = None
+    for encoding in _PREFERENCE:
+        if encoding not in available:
+            continue
+        q = accepted.get(encoding, 0.0)
+        if q > 0 and (best is None or q > best[1]):
+            best = (encoding, q)
+    return best[0] if best else None
+
+
+def maybe_compress(body, accept_encoding):
+    """按需用 gzip 压缩 JSON 响应体，返回 (内容, Content-Encoding 或 None)"""
+    if len(body) < MIN_COMPRESS_SIZE or negotiate(accept_encoding, ("gzip", "identity")) != "gzip":
+        return body, None
+    return gzip.compress(body, compresslevel=JSON_GZIP_LEVEL), "gzip"
+
+
+class AssetStore:
+    def __init__(self, directory=WEBUI_DIR):
+        self._assets = {}
+        if not os.path.isdir(directory):
+            return
+        for root, _, files in os.walk(directory):
+            for name in files:
+                full = os.path.join(root, name)
+                with open(full, "rb") as f:
+                    asset = Asset(name, f.read())
+                url = "/" + os.path.relpath(full, directory).replace(os.sep, "/")
+                self._assets[url] = asset
+                if name == "index.html":
+                    self._assets[url[:-len("index.html")]] = asset
+
+    def __contains__(self, path):
+        return path in self._assets
+
+    def respond(self, path, if_none_match=None, accept_encoding=None):
+        """返回 (状态码, 响应头, 响应体)；路径不存在时返回None"""
+        asset = self._assets.get(path)
+        if asset is None:
+            return None
+        encoding = negotiate(accept_encoding, asset.bodies)
+        if encoding is None:
+            return 406, {"Vary": "Accept-Encoding"}, b""
+        headers = {
+            "ETag": asset.etag(encoding),
+            "Cache-Control": asset.cache_control,
+            "Vary": "Accept-Encoding",
+        }
+        if asset.matches(if_none_match):
+            return 304, headers, b""
+        body = asset.bodies[encoding]
+        headers["Content-Type"] = asset.content_type
+        headers["Content-Length"] = str(len(body))
+        if encoding != "identity":
+            headers["Content-Encoding"] = encoding
+        return 200, headers, body
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_assets():
+    """进程内共享的资源表，首次调用时加载并压缩"""
+    global _store
+    with _store_lock:
+        if _store is None:
+            _store = AssetStore()
+        return _store
@@ -0,0 +1,95 @@
+"""异步服务器（FastAPI 与内置的 asyncio 服务器）的变更推送
+
+所有 /api/events 连接共用一个轮询任务：每 POLL_INTERVAL 秒在读通道上读一次
+tasks_version（单行），版本变化时唤醒全部连接，各连接再读取自己序号之后的
+变更日志。没有连接时轮询任务自动退出，空闲时不会读取 task_changes；
+通知器随之移除，不再引用执行器（租户关闭后其执行器可以被回收）。
+"""
+import asyncio
+import weakref
+
+from database.changes import (CHANGE_BATCH, HEARTBEAT, HEARTBEAT_INTERVAL, POLL_INTERVAL, latest_seq,
+                              read_changes, reset_event, sse_event)
+from database.versioning import read_version
+
+
+class ChangeNotifier:
+    def __init__(self, executor):
+        self._executor = executor
+        self._changed = asyncio.Event()
+        self._listeners = 0
+        self._poller = None
+
+    def changed(self):
+        """当前这一轮的变化事件；先取事件再读日志，之后的变化不会被错过"""
+        return self._changed
+
+    def listen(self):
+        self._listeners += 1
+        if self._poller is None or self._poller.done():
+            self._poller = asyncio.get_running_loop().create_task(self._poll())
+
+    def unlisten(self):
+        """返回剩余的连接数"""
+        self._listeners -= 1
+        return self._listeners
+
+    async def _poll(self):
+        # 不在启动时读取基准版本：连接读完变更日志到轮询任务读到基准之间的写入会被漏掉；
+        # 第一轮总是唤醒一次，连接多读一次日志即可
+        version = None
+        while self._listeners > 0:
+            await asyncio.sleep(POLL_INTERVAL)
+            # 最后一个连接已在休眠期间断开：不再读取（租户此时可能已被关闭）
+            if self._listeners <= 0:
+                return
+            current = await self._executor.read(read_version)
+            if current != version:
+                version = current
+                changed, self._changed = self._changed, asyncio.Event()
+                changed.set()
+
+
+# 事件循环 -> {数据库执行器: 通知器}；asyncio 对象不能跨事件循环使用
+_notifiers = weakref.WeakKeyDictionary()
+
+
+def get_notifier(executor):
+    loop = asyncio.get_running_loop()
+    notifiers = _notifiers.setdefault(loop, {})
+    notifier = notifiers.get(executor)
+    if notifier is None:
+        notifier = notifiers[executor] = ChangeNotifier(executor)
+    return notifier
+
+
+async def change_stream(db, after, is_disconnected=None):
+    """按 SSE 格式持续产出序号 after 之后的任务变更
+
+    is_disconnected 为可等待的断开检测函数；没有时由写入失败结束。
+    """
+    notifier = get_notifier(db)
+    notifier.listen()
+    try:
+        while is_disconnected is None or not await is_disconnected():
+            changed = notifier.changed()
+            changes = await db.read(read_changes, after)
+            if changes is None:
+                # 日志已被清理或有 reset 标记：客户端重新加载，从最新序号继续
+                after = await db.read(latest_seq)
+                yield reset_event(after)
+                continue
+            for seq, data in changes:
+                yield sse_event(seq, data)
+                after = seq
+            if len(changes) == CHANGE_BATCH:
+                continue
+            try:
+                await asyncio.wait_for(changed.wait(), HEARTBEAT_INTERVAL)
+            except asyncio.TimeoutError:
+                yield HEARTBEAT
+    finally:
+        if notifier.unlisten() == 0:
+            notifiers = _notifiers.get(asyncio.get_running_loop(), {})
+            if notifiers.get(db) is notifier:
+                del notifiers[db]
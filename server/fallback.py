@@ -0,0 +1,594 @@
+"""内置 HTTP 服务器（没有安装 uvicorn 时使用）
+
+只依赖标准库，基于 asyncio.start_server：
+- HTTP/1.1 持久连接：同一连接上依次处理多个请求，空闲超过
+  KEEP_ALIVE_TIMEOUT 秒后关闭；HTTP/1.0 客户端带 Connection: keep-alive 时同样保持
+- 路由表在导入时编译：固定路径按 (方法, 路径) 直接查字典，带任务id的路径
+  逐个匹配预编译的正则；路径存在但方法不对时返回405
+- 准入控制（server.admission）：并发、排队和连接数都有上限，超出时返回503
+- SQL 和行转换来自 database.repository，数据库操作交给执行器的专用读/写线程，
+  事件循环不阻塞
+- 接口与 server/app.py 一致（含分页、ETag/304、SSE 推送、JSON 压缩、静态资源、
+  按请求头或 /t/<租户> 前缀路由到租户数据库、归档浏览、分块传输的流式导出）
+
+用法: start_in_thread(...) 在后台线程中运行（桌面端、测试），run(...) 在当前线程运行。
+"""
+import asyncio
+import json
+import os
+import re
+import threading
+import traceback
+from http import HTTPStatus
+from urllib.parse import parse_qs, unquote, urlsplit
+
+from database.archive import ARCHIVE_AFTER_DAYS, SEGMENT_SIZE, archive_periodically
+from database.batch import BatchError
+from database.changes import latest_seq, parse_seq
+from database.export import EXPORT_FORMATS, export_stream, parse_format
+from database.pagination import InvalidCursor, page_headers, parse_limit
+from database.repository import get_repository, row_to_task
+from database.search import parse_search_limit
+from database.tenants import InvalidTenant, get_tenant_registry
+from database.versioning import version_headers
+from server.admission import AdmissionController, Overloaded, classify, overloaded_body
+from server.assets import get_assets, maybe_compress
+from server.events import change_stream
+from server.tenancy import TENANT_HEADER, current_repository, current_tenant, resolve_tenant, tenant_scope
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data")
+DB_PATH = os.path.join(DATA_DIR, "tasks.db")
+# 租户数据库所在目录（见 server.tenancy）
+TENANT_DIR = os.environ.get("TODO_TENANT_DIR", os.path.join(DATA_DIR, "tenants"))
+
+# 持久连接空闲多久后关闭（秒）
+KEEP_ALIVE_TIMEOUT = 5.0
+# 请求头和请求体的大小上限
+MAX_HEADER_COUNT = 100
+MAX_BODY_SIZE = 10 * 1024 * 1024
+
+
+class HTTPError(Exception):
+    def __init__(self, status, message=None):
+        super().__init__(message)
+        self.status = status
+        self.message = message or HTTPStatus(status).phrase
+
+
+class Request:
+    __slots__ = ("method", "path", "query", "headers", "body", "version", "tenant", "prefix")
+
+    def __init__(self, method, path, query, headers, body):
+        self.method = method
+        self.path = path
+        self.query = query
+        self.headers = headers
+        self.body = body
+        self.version = "HTTP/1.1"
+        # 请求所属的租户，以及从路径中去掉的前缀（/t/<租户>，生成分页链接时加回去）
+        self.tenant = None
+        self.prefix = ""
+
+    def param(self, name):
+        values = self.query.get(name)
+        return values[0] if values else None
+
+    def json(self):
+        try:
+            payload = json.loads(self.body or b"{}")
+        except ValueError:
+            raise HTTPError(400, "invalid JSON")
+        if not isinstance(payload, dict):
+            raise HTTPError(400, "body must be an object")
+        return payload
+
+
+class Response:
+    __slots__ = ("status", "body", "headers", "stream", "chunked")
+
+    def __init__(self, status=200, body=b"", headers=None, stream=None, chunked=False):
+        self.status = status
+        self.body = body
+        self.headers = headers or {}
+        # 异步生成器：逐块写出，写完后关闭连接（SSE）
+        self.stream = stream
+        # 流式响应按分块传输编码发送，写完后连接可以继续使用（HTTP/1.0 客户端仍以关闭连接结束）
+        self.chunked = chunked
+
+
+def json_response(data, status=200, headers=None):
+    return json_bytes(json.dumps(data, ensure_ascii=False).encode(), status, headers)
+
+
+def json_bytes(body, status=200, headers=None):
+    headers = dict(headers or {})
+    headers["Content-Type"] = "application/json; charset=utf-8"
+    return Response(status, body, headers)
+
+
+def error_response(status, message):
+    return json_response({"error": message}, status)
+
+
+# 本服务器的准入控制，所有连接共用
+admission = AdmissionController()
+
+
+def get_repo():
+    """当前请求所属租户的仓库，没有指定租户时为 DB_PATH 的仓库；迁移只在进程内首次访问时执行一次"""
+    return current_repository() or get_repository(DB_PATH)
+
+
+def get_tenants():
+    """租户注册表，与同一进程中的 FastAPI 服务共用"""
+    return get_tenant_registry(TENANT_DIR)
+
+
+def _task_or_404(row):
+    if row is None:
+        raise HTTPError(404, "not found")
+    return json_response(row_to_task(row))
+
+
+def _quadrant(value):
+    if not isinstance(value, int) or isinstance(value, bool) or not 1 <= value <= 4:
+        raise HTTPError(400, "quadrant must be 1-4")
+    return value
+
+
+# ---- 路由处理函数：async def handler(request, **路径参数) -> Response ----
+
+async def _list_page(listing, request):
+    repo = get_repo()
+    tenant = current_tenant()
+    try:
+        limit = parse_limit(request.param("limit"))
+        version, page = await repo.db.read(
+            repo.page, listing, limit, request.param("after"), request.headers.get("if-none-match"), tenant
+        )
+    except InvalidCursor:
+        raise HTTPError(400, "invalid cursor")
+    except ValueError as e:
+        raise HTTPError(400, str(e))
+    if page is None:
+        return Response(304, headers=version_headers(version, tenant))
+    body, next_cursor, total = page
+    headers = version_headers(version, tenant)
+    headers.update(page_headers(request.prefix + request.path, total, limit, next_cursor))
+    return json_bytes(body, headers=headers)
+
+
+async def list_active(request):
+    return await _list_page("active", request)
+
+
+async def list_completed(request):
+    return await _list_page("completed", request)
+
+
+async def search_tasks(request):
+    query = request.param("q") or ""
+    if not query.strip():
+        raise HTTPError(400, "q required")
+    try:
+        limit = parse_search_limit(request.param("limit"))
+    except ValueError as e:
+        raise HTTPError(400, str(e))
+    repo = get_repo()
+    return json_response(await repo.db.read(repo.search, query, limit))
+
+
+async def list_archived(request):
+    repo = get_repo()
+    try:
+        limit = parse_limit(request.param("limit"))
+        tasks, next_cursor, total = await repo.db.read(repo.archive_listing, limit, request.param("after"))
+    except InvalidCursor:
+        raise HTTPError(400, "invalid cursor")
+    except ValueError as e:
+        raise HTTPError(400, str(e))
+    return json_response(tasks, headers=page_headers(request.prefix + request.path, total, limit, next_cursor))
+
+
+async def archive_tasks(request):
+    # 立即归档完成超过 olderThanDays 天的任务，0 表示全部已完成任务；每段一个事务
+    days = request.json().get("olderThanDays", ARCHIVE_AFTER_DAYS)
+    if not isinstance(days, int) or isinstance(days, bool) or days < 0:
+        raise HTTPError(400, "olderThanDays must be a non-negative integer")
+    repo = get_repo()
+    archived = 0
+    while True:
+        count = await repo.db.write(repo.archive, days or None)
+        archived += count
+        if count < SEGMENT_SIZE:
+            return json_response({"archived": archived})
+
+
+async def export_tasks(request):
+    # 全部任务（含归档）逐块导出，内存占用与任务数无关（见 database.export）
+    try:
+        fmt = parse_format(request.param("format"))
+    except ValueError as e:
+        raise HTTPError(400, str(e))
+    repo = get_repo()
+    headers = {
+        "Content-Type": EXPORT_FORMATS[fmt],
+        "Content-Disposition": f'attachment; filename="tasks.{fmt}"',
+        "Cache-Control": "no-store",
+    }
+    return Response(headers=headers, stream=export_stream(repo.db, repo.db_path, fmt), chunked=True)
+
+
+async def events(request):
+    # 浏览器重连时通过 Last-Event-ID 从断开处继续，否则从当前最新的变更开始
+    db = get_repo().db
+    start = parse_seq(request.headers.get("last-event-id"))
+    if start is None:
+        start = parse_seq(request.param("after"))
+    if start is None:
+        start = await db.read(latest_seq)
+    return Response(
+        headers={"Content-Type": "text/event-stream", "Cache-Control": "no-cache"},
+        stream=change_stream(db, start),
+    )
+
+
+async def pool_stats(request):
+    repo = get_repo()
+    return json_response({**repo.pool.stats(), "executor": repo.db.stats(), "cache": repo.cache_stats(),
+                          "admission": admission.stats(), "tenants": get_tenants().stats()})
+
+
+async def create_task(request):
+    payload = request.json()
+    title = payload.get("title")
+    description = payload.get("description", "")
+    if not isinstance(title, str) or not title.strip():
+        raise HTTPError(400, "title required")
+    if not isinstance(description, str):
+        raise HTTPError(400, "description must be a string")
+    quadrant = _quadrant(payload.get("quadrant", 4))
+    repo = get_repo()
+    row = await repo.db.write(repo.create, title.strip(), description, quadrant)
+    return json_response(row_to_task(row), 201)
+
+
+async def batch_tasks(request):
+    payload = request.json()
+    repo = get_repo()
+    try:
+        results = await repo.db.write(repo.batch, payload.get("operations"))
+    except BatchError as e:
+        raise HTTPError(400, str(e))
+    return json_response({"results": results})
+
+
+async def move_task(request, task_id):
+    quadrant = _quadrant(request.json().get("quadrant"))
+    repo = get_repo()
+    return _task_or_404(await repo.db.write(repo.move, task_id, quadrant))
+
+
+_background = set()
+
+
+async def _rebalance(tenant, quadrant):
+    # 在响应之后执行，自己持有租户的租约，执行期间租户不会被关闭
+    async with tenant_scope(get_tenants(), tenant):
+        repo = get_repo()
+        await repo.db.write(repo.rebalance, quadrant)
+
+
+async def position_task(request, task_id):
+    payload = request.json()
+    before_id, after_id = payload.get("beforeId"), payload.get("afterId")
+    if any(value is not None and (not isinstance(value, int) or isinstance(value, bool)) for value in (before_id, after_id)):
+        raise HTTPError(400, "beforeId and afterId must be integers")
+    repo = get_repo()
+    try:
+        placed, row = await repo.db.write(repo.position, task_id, before_id, after_id)
+    except LookupError as e:
+        raise HTTPError(400, str(e))
+    if placed is None:
+        raise HTTPError(404, "not found")
+    quadrant, _, crowded, _ = placed
+    if crowded:
+        # 间隔过小，响应之后在写通道上重排整个象限
+        task = asyncio.get_running_loop().create_task(_rebalance(request.tenant, quadrant))
+        _background.add(task)
+        task.add_done_callback(_background.discard)
+    return json_response(row_to_task(row))
+
+
+async def complete_task(request, task_id):
+    completed = bool(request.json().get("completed", True))
+    repo = get_repo()
+    return _task_or_404(await repo.db.write(repo.set_completed, task_id, completed))
+
+
+async def update_task(request, task_id):
+    payload = request.json()
+    title, description = payload.get("title"), payload.get("description")
+    if any(value is not None and not isinstance(value, str) for value in (title, description)):
+        raise HTTPError(400, "title and description must be strings")
+    repo = get_repo()
+    return _task_or_404(await repo.db.write(repo.update, task_id, title, description))
+
+
+async def clear_completed(request):
+    repo = get_repo()
+    await repo.db.write(repo.clear_completed)
+    return json_response({"ok": True})
+
+
+async def delete_task(request, task_id):
+    repo = get_repo()
+    await repo.db.write(repo.delete, task_id)
+    return json_response({"ok": True})
+
+
+ROUTES = [
+    ("GET", "/api/tasks", list_active),
+    ("GET", "/api/tasks/completed", list_completed),
+    ("GET", "/api/tasks/search", search_tasks),
+    ("GET", "/api/tasks/export", export_tasks),
+    ("GET", "/api/events", events),
+    ("GET", "/api/stats/pool", pool_stats),
+    ("GET", "/api/archive", list_archived),
+    ("POST", "/api/archive", archive_tasks),
+    ("POST", "/api/tasks", create_task),
+    ("POST", "/api/tasks/batch", batch_tasks),
+    ("PATCH", "/api/tasks/{task_id}/quadrant", move_task),
+    ("PATCH", "/api/tasks/{task_id}/position", position_task),
+    ("PATCH", "/api/tasks/{task_id}/complete", complete_task),
+    ("PATCH", "/api/tasks/{task_id}", update_task),
+    ("DELETE", "/api/tasks/completed", clear_completed),
+    ("DELETE", "/api/tasks/{task_id}", delete_task),
+]
+
+
+class Router:
+    """预编译的路由表；路径参数 {name} 只匹配非负整数"""
+
+    def __init__(self, routes):
+        self._static = {}
+        self._dynamic = []
+        self._paths = {}
+        for method, pattern, handler in routes:
+            if "{" not in pattern:
+                self._static[(method, pattern)] = handler
+                self._paths.setdefault(pattern, set()).add(method)
+            else:
+                regex = re.compile("^" + re.sub(r"\{(\w+)\}", r"(?P<\1>\\d+)", pattern) + "$")
+                self._dynamic.append((method, regex, handler))
+
+    def match(self, method, path):
+        """返回 (处理函数, 路径参数)；路径不存在返回 (None, None)，方法不允许返回 (None, 允许的方法)"""
+        handler = self._static.get((method, path))
+        if handler is not None:
+            return handler, {}
+        allowed = set(self._paths.get(path, ()))
+        for route_method, regex, handler in self._dynamic:
+            match = regex.match(path)
+            if match is None:
+                continue
+            if route_method == method:
+                return handler, {name: int(value) for name, value in match.groupdict().items()}
+            allowed.add(route_method)
+        return None, (allowed or None)
+
+
+router = Router(ROUTES)
+
+
+async def dispatch(request):
+    handler, params = router.match(request.method, request.path)
+    if handler is None:
+        if request.method in ("GET", "HEAD"):
+            asset = get_assets().respond(
+                request.path, request.headers.get("if-none-match"), request.headers.get("accept-encoding")
+            )
+            if asset is not None:
+                status, headers, body = asset
+                return Response(status, body, headers)
+        if params:
+            return Response(405, headers={"Allow": ", ".join(sorted(params))})
+        return error_response(404, "not found")
+    try:
+        return await handler(request, **params)
+    except HTTPError as e:
+        return error_response(e.status, e.message)
+    except Exception:
+        traceback.print_exc()
+        return error_response(500, "internal error")
+
+
+async def _read_request(reader):
+    """读取一个请求；连接在请求之间被关闭时返回None"""
+    line = await reader.readline()
+    if not line:
+        return None
+    try:
+        method, target, version = line.decode("latin-1").split()
+    except ValueError:
+        raise HTTPError(400, "bad request line")
+    headers = {}
+    while True:
+        line = await reader.readline()
+        if line in (b"\r\n", b"\n"):
+            break
+        if not line:
+            return None
+        if len(headers) >= MAX_HEADER_COUNT:
+            raise HTTPError(431)
+        name, _, value = line.decode("latin-1").partition(":")
+        headers[name.strip().lower()] = value.strip()
+    if "chunked" in headers.get("transfer-encoding", "").lower():
+        raise HTTPError(411)
+    try:
+        length = int(headers.get("content-length", "0"))
+    except ValueError:
+        raise HTTPError(400, "bad Content-Length")
+    if length > MAX_BODY_SIZE:
+        raise HTTPError(413)
+    body = await reader.readexactly(length) if length else b""
+    split = urlsplit(target)
+    request = Request(method.upper(), unquote(split.path), parse_qs(split.query), headers, body)
+    request.version = version
+    connection = headers.get("connection", "").lower()
+    if version == "HTTP/1.1":
+        keep_alive = connection != "close"
+    else:
+        keep_alive = connection == "keep-alive"
+    return request, keep_alive
+
+
+def _head(status, headers, keep_alive):
+    lines = [f"HTTP/1.1 {status} {HTTPStatus(status).phrase}"]
+    lines.extend(f"{name}: {value}" for name, value in headers.items())
+    lines.append("Connection: keep-alive" if keep_alive else "Connection: close")
+    return ("\r\n".join(lines) + "\r\n\r\n").encode("latin-1")
+
+
+def _chunked(request, response):
+    return response.stream is not None and response.chunked and request.version == "HTTP/1.1"
+
+
+async def _write_response(writer, request, response, keep_alive):
+    headers = dict(response.headers)
+    body = response.body
+    if response.stream is not None:
+        chunked = _chunked(request, response)
+        if chunked:
+            headers["Transfer-Encoding"] = "chunked"
+        writer.write(_head(response.status, headers, keep_alive and chunked))
+        await writer.drain()
+        async for chunk in response.stream:
+            if chunked:
+                chunk = b"%x\r\n%s\r\n" % (len(chunk), chunk) if chunk else b""
+            writer.write(chunk)
+            await writer.drain()
+        if chunked:
+            writer.write(b"0\r\n\r\n")
+            await writer.drain()
+        return
+    if headers.get("Content-Type", "").startswith("application/json"):
+        body, encoding = maybe_compress(body, request.headers.get("accept-encoding"))
+        headers["Vary"] = ", ".join(filter(None, (headers.get("Vary"), "Accept-Encoding")))
+        if encoding:
+            headers["Content-Encoding"] = encoding
+    if response.status != 304:
+        headers["Content-Length"] = str(len(body))
+    writer.write(_head(response.status, headers, keep_alive))
+    if request.method != "HEAD" and response.status != 304:
+        writer.write(body)
+    await writer.drain()
+
+
+async def _process(writer, request, keep_alive):
+    """取得处理名额后处理请求；超出上限时快速返回503，返回本次发送的响应"""
+    try:
+        tenant, path = resolve_tenant(request.path, request.headers.get(TENANT_HEADER))
+    except InvalidTenant as e:
+        response = error_response(400, str(e))
+        await _write_response(writer, request, response, keep_alive)
+        return response
+    request.tenant = tenant
+    request.prefix = request.path[:len(request.path) - len(path)]
+    request.path = path
+    route = classify(request.method, request.path)
+    try:
+        async with admission.slot(route):
+            # 流式响应（SSE）发送结束前一直占用名额和租户的租约
+            async with tenant_scope(get_tenants(), tenant):
+                response = await dispatch(request)
+                await _write_response(writer, request, response, keep_alive)
+            return response
+    except Overloaded as e:
+        response = json_bytes(overloaded_body(e, "error"), 503, e.headers())
+        await _write_response(writer, request, response, keep_alive)
+        return response
+
+
+async def handle_connection(reader, writer):
+    if not admission.connect():
+        # 连接数已满：不读取请求，直接拒绝
+        overloaded = Overloaded("connections")
+        writer.write(_head(503, {**overloaded.headers(), "Content-Length": "0"}, False))
+        try:
+            await writer.drain()
+        except ConnectionError:
+            pass
+        writer.close()
+        return
+    try:
+        while True:
+            try:
+                parsed = await asyncio.wait_for(_read_request(reader), KEEP_ALIVE_TIMEOUT)
+            except asyncio.TimeoutError:
+                break
+            except HTTPError as e:
+                writer.write(_head(e.status, {"Content-Length": "0"}, False))
+                await writer.drain()
+                break
+            if parsed is None:
+                break
+            request, keep_alive = parsed
+            response = await _process(writer, request, keep_alive)
+            if not keep_alive or (response.stream is not None and not _chunked(request, response)):
+                break
+    except (ConnectionError, asyncio.IncompleteReadError, asyncio.LimitOverrunError, ValueError):
+        pass
+    finally:
+        admission.disconnect()
+        writer.close()
+
+
+class FallbackServer:
+    """在独立线程中运行的服务器，port 为实际监听的端口（传0时由系统分配）"""
+
+    def __init__(self, host, port):
+        self.host = host
+        self.port = port
+        self._loop = None
+        self._server = None
+        self._started = threading.Event()
+        self._thread = None
+
+    async def _serve(self):
+        get_assets()
+        self._server = await asyncio.start_server(handle_connection, self.host, self.port)
+        self.port = self._server.sockets[0].getsockname()[1]
+        self._loop = asyncio.get_running_loop()
+        # 默认数据库的定期归档；租户在打开时归档（见 database.tenants）
+        archiver = self._loop.create_task(archive_periodically(lambda: get_repository(DB_PATH)))
+        self._started.set()
+        async with self._server:
+            try:
+                await self._server.serve_forever()
+            except asyncio.CancelledError:
+                pass
+            finally:
+                archiver.cancel()
+
+    def start(self):
+        self._thread = threading.Thread(target=asyncio.run, args=(self._serve(),), daemon=True)
+        self._thread.start()
+        self._started.wait()
+        return self
+
+    def stop(self):
+        if self._loop is not None:
+            self._loop.call_soon_threadsafe(self._server.close)
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+
+
+def start_in_thread(host="127.0.0.1", port=0):
+    return FallbackServer(host, port).start()
+
+
+def run(host="127.0.0.1", port=8080):
+    server = FallbackServer(host, port)
+    print(f"Web服务器已启动，访问 http://{host}:{port}")
+    asyncio.run(server._serve())
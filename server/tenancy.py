@@ -0,0 +1,110 @@
+"""Web服务器的租户路由（两个服务器共用）
+
+请求通过以下任一方式指定租户（见 database.tenants）：
+- 请求头 X-Tenant-Id: <租户>
+- 路径前缀 /t/<租户>/...，例如 /t/alice/api/tasks；前缀去掉后再匹配路由，
+  网页端从 /t/<租户>/ 打开时，接口请求也会带上同样的前缀
+两者同时出现且不一致时返回400。没有指定租户的请求使用服务器原来的单一数据库。
+
+请求处理期间持有租户的租约，当前租户的仓库和租户名放在上下文变量中，
+各服务器的 get_repo() 通过 current_repository() 取得，列表的ETag用 current_tenant() 区分租户。
+"""
+import contextvars
+import json
+from contextlib import asynccontextmanager
+
+from database.tenants import InvalidTenant, parse_tenant
+
+TENANT_HEADER = "x-tenant-id"
+PATH_PREFIX = "/t/"
+
+# ASGI scope 中记录被去掉的路径前缀的键
+PREFIX_SCOPE_KEY = "tenant_prefix"
+
+_current = contextvars.ContextVar("tenant_repository", default=None)
+_current_tenant = contextvars.ContextVar("tenant", default=None)
+
+
+def strip_tenant_prefix(path):
+    """去掉 /t/<租户> 前缀（不校验租户名）"""
+    if not path.startswith(PATH_PREFIX):
+        return path
+    _, _, rest = path[len(PATH_PREFIX):].partition("/")
+    return "/" + rest
+
+
+def resolve_tenant(path, header):
+    """返回 (租户或None, 去掉前缀后的路径)；租户名不合法或前缀与请求头不一致时抛出 InvalidTenant"""
+    tenant = None
+    if path.startswith(PATH_PREFIX):
+        tenant = parse_tenant(path[len(PATH_PREFIX):].partition("/")[0])
+        path = strip_tenant_prefix(path)
+    if header:
+        if tenant is not None and header != tenant:
+            raise InvalidTenant("tenant header does not match path")
+        tenant = parse_tenant(header)
+    return tenant, path
+
+
+def current_repository():
+    """当前请求所属租户的仓库；没有指定租户时返回None"""
+    return _current.get()
+
+
+def current_tenant():
+    """当前请求所属的租户名；没有指定租户时返回None"""
+    return _current_tenant.get()
+
+
+@asynccontextmanager
+async def tenant_scope(registry, tenant):
+    """持有租户的租约，期间 current_repository() 返回它的仓库，current_tenant() 返回租户名"""
+    if tenant is None:
+        yield None
+        return
+    async with registry.lease(tenant) as repo:
+        token = _current.set(repo)
+        tenant_token = _current_tenant.set(tenant)
+        try:
+            yield repo
+        finally:
+            _current_tenant.reset(tenant_token)
+            _current.reset(token)
+
+
+class TenantMiddleware:
+    """FastAPI（ASGI）的租户中间件：去掉路径前缀，并在整个响应（包括流式响应和后台任务）期间持有租约"""
+
+    def __init__(self, app, get_registry):
+        self.app = app
+        self.get_registry = get_registry
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        header = None
+        for name, value in scope.get("headers", ()):
+            if name == TENANT_HEADER.encode():
+                header = value.decode("latin-1")
+                break
+        try:
+            tenant, path = resolve_tenant(scope["path"], header)
+        except InvalidTenant as e:
+            body = json.dumps({"detail": str(e)}).encode()
+            await send({
+                "type": "http.response.start",
+                "status": 400,
+                "headers": [(b"content-type", b"application/json"), (b"content-length", str(len(body)).encode())],
+            })
+            await send({"type": "http.response.body", "body": body})
+            return
+        if tenant is not None:
+            # 原路径中被去掉的前缀，生成分页链接时加回去
+            prefix = scope["path"][:len(scope["path"]) - len(path)]
+            scope = dict(scope, path=path)
+            scope[PREFIX_SCOPE_KEY] = prefix
+            if scope.get("raw_path"):
+                scope["raw_path"] = strip_tenant_prefix(scope["raw_path"].decode("latin-1")).encode("latin-1")
+        async with tenant_scope(self.get_registry(), tenant):
+            await self.app(scope, receive, send)
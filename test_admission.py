@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+"""
+测试Web服务器的准入控制：并发名额、排队、按路由的上限和503快速失败
+"""
+import os
+import sys
+import json
+import socket
+import asyncio
+import tempfile
+import http.client
+
+# 添加项目根目录到Python路径
+sys.path.insert(0, os.path.dirname(__file__))
+
+from database.migrations import ensure_schema
+from server.admission import AdmissionController, Overloaded, classify
+
+
+def test_classify():
+    assert classify("GET", "/api/tasks") == "read"
+    assert classify("PATCH", "/api/tasks/1/complete") == "write"
+    assert classify("GET", "/api/events") == "events"
+    assert classify("GET", "/api/stats/pool") is None
+    assert classify("GET", "/index.html") is None
+
+
+def test_queue_and_rejections():
+    controller = AdmissionController(max_active=1, max_queue=1, queue_timeout=0.2,
+                                     route_limits={"write": 1, "events": 1})
+
+    async def scenario():
+        await controller.acquire("read")
+        # 名额已满：第二个请求排队，第三个请求因队列已满被拒绝
+        waiting = asyncio.ensure_future(controller.acquire("read"))
+        await asyncio.sleep(0.01)
+        assert controller.stats()["queueDepth"] == 1
+        try:
+            await controller.acquire("read")
+            assert False
+        except Overloaded as e:
+            assert e.reason == "queue_full" and e.headers() == {"Retry-After": "1"}
+
+        # 释放后名额直接移交给排队的请求
+        controller.release("read")
+        await waiting
+        assert controller.stats()["active"] == 1
+
+        # 写请求的上限包括排队中的请求；排队超时同样拒绝
+        timed_out = asyncio.ensure_future(controller.acquire("write"))
+        await asyncio.sleep(0.01)
+        try:
+            await controller.acquire("write")
+            assert False
+        except Overloaded as e:
+            assert e.reason == "route:write"
+        try:
+            await timed_out
+            assert False
+        except Overloaded as e:
+            assert e.reason == "queue_timeout"
+
+        # 事件流不占用全局名额
+        await controller.acquire("events")
+        controller.release("events")
+        controller.release("read")
+
+    asyncio.run(scenario())
+    stats = controller.stats()
+    assert (stats["active"], stats["queueDepth"], stats["routes"]) == (0, 0, {})
+    assert stats["admitted"] == 3 and stats["queued"] == 2 and stats["peakQueueDepth"] == 1
+    assert stats["rejected"] == {"queue_full": 1, "route:write": 1, "queue_timeout": 1}
+
+
+def _db():
+    path = os.path.join(tempfile.mkdtemp(), "tasks.db")
+    ensure_schema(path)
+    return path
+
+
+def test_fastapi_sheds_load():
+    from fastapi.testclient import TestClient
+    from server import app as server_app
+
+    original, server_app.DB_PATH = server_app.DB_PATH, _db()
+    limits = dict(server_app.admission.route_limits)
+    server_app.admission.route_limits["write"] = 0
+    try:
+        client = TestClient(server_app.app)
+        response = client.post("/api/tasks", json={"title": "任务"})
+        assert response.status_code == 503 and response.headers["Retry-After"] == "1"
+        assert response.json()["detail"] == "server busy"
+        assert client.get("/api/tasks").status_code == 200
+        stats = client.get("/api/stats/pool").json()["admission"]
+        assert stats["rejected"]["route:write"] >= 1 and stats["active"] == 0
+    finally:
+        server_app.admission.route_limits.clear()
+        server_app.admission.route_limits.update(limits)
+        server_app.DB_PATH = original
+
+
+def test_fallback_sheds_load():
+    from server import fallback
+
+    original, fallback.DB_PATH = fallback.DB_PATH, _db()
+    limits = dict(fallback.admission.route_limits)
+    max_connections = fallback.admission.max_connections
+    server = fallback.start_in_thread()
+    conn = http.client.HTTPConnection("127.0.0.1", server.port, timeout=10)
+    try:
+        fallback.admission.route_limits["write"] = 0
+        conn.request("POST", "/api/tasks", body=json.dumps({"title": "任务"}))
+        response = conn.getresponse()
+        assert response.status == 503 and response.getheader("Retry-After") == "1"
+        assert json.loads(response.read())["error"] == "server busy"
+
+        # 连接数已满时新连接直接收到503
+        fallback.admission.max_connections = 1
+        with socket.create_connection(("127.0.0.1", server.port), timeout=10) as sock:
+            sock.sendall(b"GET /api/tasks HTTP/1.1\r\n\r\n")
+            assert sock.recv(1024).startswith(b"HTTP/1.1 503")
+        fallback.admission.max_connections = max_connections
+
+        conn.request("GET", "/api/stats/pool")
+        stats = json.loads(conn.getresponse().read())["admission"]
+        assert stats["rejected"]["connections"] >= 1 and stats["connections"] == 1
+    finally:
+        conn.close()
+        server.stop()
+        fallback.admission.route_limits.clear()
+        fallback.admission.route_limits.update(limits)
+        fallback.admission.max_connections = max_connections
+        fallback.DB_PATH = original
+
+
+if __name__ == "__main__":
+    test_classify()
+    test_queue_and_rejections()
+    test_fastapi_sheds_load()
+    test_fallback_sheds_load()
+    print("✅ 准入控制测试通过")
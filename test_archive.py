@@ -0,0 +1,206 @@
+#!/usr/bin/env python3
+"""
+测试已完成任务的冷归档：completed_at 触发器、按完成时间分段归档、
+归档后的分页浏览、"清空"仍为删除，以及两个Web服务器的 /api/archive
+"""
+import os
+import sys
+import json
+import asyncio
+import threading
+import tempfile
+import http.client
+
+# 添加项目根目录到Python路径
+sys.path.insert(0, os.path.dirname(__file__))
+
+from database import archive
+from database.archive import SEGMENT_SIZE
+from database.repository import TaskRepository
+
+
+def _repo():
+    return TaskRepository(os.path.join(tempfile.mkdtemp(), "tasks.db"))
+
+
+def _complete(repo, title, days_ago):
+    """新建一个在 days_ago 天前完成的任务"""
+    row = repo.write(repo.create, title, f"{title} 的描述", 2)
+    repo.write(repo.set_completed, row["id"], True)
+    with repo.pool.writer() as conn:
+        conn.execute("UPDATE tasks SET completed_at = datetime('now', ?) WHERE id = ?",
+                     (f"-{days_ago} days", row["id"]))
+    return row["id"]
+
+
+def test_completed_at_follows_state():
+    repo = _repo()
+    task_id = repo.write(repo.create, "写周报")["id"]
+    completed_at = "SELECT completed_at FROM tasks WHERE id = ?"
+    assert repo.read(lambda conn: conn.execute(completed_at, (task_id,)).fetchone()[0]) is None
+    repo.write(repo.set_completed, task_id, True)
+    assert repo.read(lambda conn: conn.execute(completed_at, (task_id,)).fetchone()[0]) is not None
+    repo.write(repo.set_completed, task_id, False)
+    assert repo.read(lambda conn: conn.execute(completed_at, (task_id,)).fetchone()[0]) is None
+
+
+def test_archive_expired_moves_old_tasks():
+    repo = _repo()
+    old = [_complete(repo, f"旧任务{i}", 40 + i) for i in range(3)]
+    recent = _complete(repo, "新完成", 1)
+    active = repo.write(repo.create, "进行中")["id"]
+
+    assert repo.archive_expired(30) == 3
+    remaining = {row["id"] for row in repo.read(lambda conn: conn.execute("SELECT id FROM tasks").fetchall())}
+    assert remaining == {recent, active}
+    # 归档任务离开全文索引；再次归档没有新的到期任务
+    assert repo.read(repo.search, "旧任务") == []
+    assert repo.archive_expired(30) == 0
+
+    tasks, next_cursor = repo.read(repo.archived_page, 10)
+    # 按完成时间倒序：最近完成的（40天前）在前
+    assert [task["id"] for task in tasks] == old and next_cursor is None
+    assert tasks[0]["title"] == "旧任务0" and tasks[0]["description"] == "旧任务0 的描述"
+    assert tasks[0]["quadrant"] == 2 and tasks[0]["isCompleted"] is True and tasks[0]["completedAt"]
+    stats = repo.read(repo.archive_stats)
+    assert stats["tasks"] == 3 and stats["segments"] == 1
+
+
+def test_segments_and_paging():
+    repo = _repo()
+    total = SEGMENT_SIZE + 10
+    with repo.pool.writer() as conn:
+        conn.executemany(
+            "INSERT INTO tasks (title, is_completed, completed_at) VALUES (?, 1, datetime('now', ?))",
+            [(f"任务{i}", f"-{100 + i} minutes") for i in range(total)]
+        )
+    assert repo.write(archive.archive_all) == total
+    assert repo.read(repo.archive_stats)["segments"] == 2
+
+    # 逐页读完：顺序与完成时间倒序一致，跨段不重复不遗漏
+    titles, after = [], None
+    while True:
+        tasks, after = repo.read(repo.archived_page, 100, after)
+        titles.extend(task["title"] for task in tasks)
+        if after is None:
+            break
+    assert titles == [f"任务{i}" for i in range(total)]
+    tasks, _, count = repo.read(repo.archive_listing, 5)
+    assert count == total and len(tasks) == 5
+
+
+def test_clear_completed_deletes_without_archiving():
+    repo = _repo()
+    _complete(repo, "要删除的", 0)
+    repo.write(repo.clear_completed)
+    assert repo.read(repo.completed_rows) == []
+    assert repo.read(repo.archive_stats)["tasks"] == 0
+
+
+def test_archive_all_moves_every_completed_task():
+    repo = _repo()
+    task_id = _complete(repo, "刚完成", 0)
+    seq = repo.read(lambda conn: conn.execute("SELECT MAX(seq) FROM task_changes").fetchone()[0])
+    assert repo.write(archive.archive_all) == 1
+    assert repo.read(repo.completed_rows) == []
+    assert [task["id"] for task in repo.read(repo.archived_page, 10)[0]] == [task_id]
+    # 对其他客户端而言归档等同于删除
+    kinds = repo.read(lambda conn: conn.execute(
+        "SELECT kind FROM task_changes WHERE seq > ?", (seq,)).fetchall())
+    assert [kind for (kind,) in kinds] == ["deleted"]
+
+
+def test_segment_roundtrip():
+    rows = [(1, "标题", None, 4, "2024-01-01 00:00:00", "2024-01-02 00:00:00", 1024.0)]
+    segment = archive.decode_segment(archive.encode_segment(rows))
+    assert segment[1]["description"] is None and segment[1]["completed_at"] == "2024-01-02 00:00:00"
+
+
+def test_periodic_archiver_waits_one_interval():
+    repo = _repo()
+    _complete(repo, "旧任务", 40)
+    opened_on = []
+
+    def get_repo():
+        opened_on.append(threading.get_ident())
+        return repo
+
+    async def run():
+        archiver = asyncio.create_task(archive.archive_periodically(get_repo, interval=0.3, days=30))
+        # 启动时不归档，也不在事件循环线程中打开仓库
+        await asyncio.sleep(0.1)
+        assert opened_on == [] and repo.read(repo.archive_stats)["tasks"] == 0
+        await asyncio.sleep(0.4)
+        archiver.cancel()
+        assert opened_on and threading.get_ident() not in opened_on
+
+    asyncio.run(run())
+    assert repo.read(repo.archive_stats)["tasks"] == 1
+
+
+def _request(port, method, path, body=None):
+    conn = http.client.HTTPConnection("127.0.0.1", port, timeout=10)
+    try:
+        conn.request(method, path, body=json.dumps(body) if body is not None else None)
+        response = conn.getresponse()
+        return response.status, dict(response.getheaders()), response.read()
+    finally:
+        conn.close()
+
+
+def test_fallback_endpoints():
+    from server import fallback
+
+    repo = _repo()
+    for i in range(3):
+        _complete(repo, f"任务{i}", 5)
+    original, fallback.DB_PATH = fallback.DB_PATH, repo.db_path
+    server = fallback.start_in_thread()
+    try:
+        port = server.port
+        # 默认阈值30天：5天前完成的任务不归档
+        status, _, body = _request(port, "POST", "/api/archive")
+        assert status == 200 and json.loads(body) == {"archived": 0}
+        assert json.loads(_request(port, "POST", "/api/archive", {"olderThanDays": 1})[2]) == {"archived": 3}
+        assert _request(port, "POST", "/api/archive", {"olderThanDays": -1})[0] == 400
+
+        status, headers, body = _request(port, "GET", "/api/archive?limit=2")
+        assert status == 200 and headers["X-Total-Count"] == "3" and len(json.loads(body)) == 2
+        status, _, body = _request(port, "GET", "/api/archive?after=" + headers["X-Next-Cursor"])
+        assert [task["title"] for task in json.loads(body)] == ["任务0"]
+        assert _request(port, "GET", "/api/archive?after=bad")[0] == 400
+    finally:
+        server.stop()
+        fallback.DB_PATH = original
+
+
+def test_fastapi_endpoints():
+    from fastapi.testclient import TestClient
+    from server import app as server_app
+
+    repo = _repo()
+    _complete(repo, "旧任务", 60)
+    _complete(repo, "新任务", 0)
+    original, server_app.DB_PATH = server_app.DB_PATH, repo.db_path
+    try:
+        client = TestClient(server_app.app)
+        assert client.post("/api/archive").json() == {"archived": 1}
+        assert client.post("/api/archive", json={"olderThanDays": 0}).json() == {"archived": 1}
+        response = client.get("/api/archive")
+        assert [task["title"] for task in response.json()] == ["新任务", "旧任务"]
+        assert response.headers["X-Total-Count"] == "2"
+    finally:
+        server_app.DB_PATH = original
+
+
+if __name__ == "__main__":
+    test_completed_at_follows_state()
+    test_archive_expired_moves_old_tasks()
+    test_segments_and_paging()
+    test_clear_completed_deletes_without_archiving()
+    test_archive_all_moves_every_completed_task()
+    test_segment_roundtrip()
+    test_periodic_archiver_waits_one_interval()
+    test_fallback_endpoints()
+    test_fastapi_endpoints()
+    print("✅ 归档测试通过")
@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+"""
+测试网页端静态资源的预压缩、编码协商、ETag，以及 JSON 响应的压缩
+"""
+import os
+import sys
+import gzip
+import json
+import tempfile
+import urllib.error
+import urllib.request
+
+# 添加项目根目录到Python路径
+sys.path.insert(0, os.path.dirname(__file__))
+
+from database.migrations import ensure_schema
+from database.pool import get_pool
+from server.assets import AssetStore, negotiate
+
+
+def test_negotiate():
+    available = ("br", "gzip", "identity")
+    assert negotiate("gzip, deflate, br", available) == "br"
+    assert negotiate("gzip, deflate, br", ("gzip", "identity")) == "gzip"
+    assert negotiate("br;q=0.5, gzip", available) == "gzip"
+    assert negotiate(None, available) == "identity"
+    assert negotiate("*;q=0", ("gzip",)) is None
+    assert negotiate("identity;q=0, gzip;q=0", ("identity",)) is None
+
+
+def test_asset_store():
+    directory = tempfile.mkdtemp()
+    page = ("<html>" + "任务" * 1000 + "</html>").encode()
+    with open(os.path.join(directory, "index.html"), "wb") as f:
+        f.write(page)
+    with open(os.path.join(directory, "tiny.css"), "wb") as f:
+        f.write(b"a{}")
+    store = AssetStore(directory)
+
+    status, headers, body = store.respond("/", accept_encoding="gzip")
+    assert status == 200 and headers["Content-Encoding"] == "gzip"
+    assert gzip.decompress(body) == page
+    assert headers["Cache-Control"] == "no-cache" and headers["Vary"] == "Accept-Encoding"
+    assert headers["Content-Type"] == "text/html; charset=utf-8"
+
+    status, plain_headers, body = store.respond("/index.html")
+    assert status == 200 and body == page and "Content-Encoding" not in plain_headers
+    # 每种编码的ETag不同，但任一个都能让其他编码的请求命中304
+    assert plain_headers["ETag"] != headers["ETag"]
+    assert store.respond("/", if_none_match=plain_headers["ETag"], accept_encoding="gzip")[0] == 304
+
+    # 太小的文件不压缩
+    status, headers, body = store.respond("/tiny.css", accept_encoding="gzip")
+    assert body == b"a{}" and "Content-Encoding" not in headers
+    assert headers["Cache-Control"].startswith("public")
+    assert store.respond("/missing.js") is None
+
+
+def _db(count=60):
+    path = os.path.join(tempfile.mkdtemp(), "tasks.db")
+    ensure_schema(path)
+    with get_pool(path).writer() as conn:
+        conn.executemany("INSERT INTO tasks (title) VALUES (?)", [(f"任务{i}",) for i in range(count)])
+    return path
+
+
+def test_fastapi_compression():
+    from fastapi.testclient import TestClient
+    from server import app as server_app
+
+    original, server_app.DB_PATH = server_app.DB_PATH, _db()
+    try:
+        client = TestClient(server_app.app)
+        page = client.get("/", headers={"Accept-Encoding": "gzip"})
+        assert page.status_code == 200 and page.headers["Content-Encoding"] == "gzip"
+        assert "四象限" in page.text
+        cached = client.get("/", headers={"Accept-Encoding": "gzip", "If-None-Match": page.headers["ETag"]})
+        assert cached.status_code == 304
+        assert client.get("/missing.js").status_code == 404
+
+        tasks = client.get("/api/tasks", headers={"Accept-Encoding": "gzip"})
+        assert tasks.headers["Content-Encoding"] == "gzip" and len(tasks.json()) == 60
+        small = client.get("/api/tasks?limit=1", headers={"Accept-Encoding": "gzip"})
+        assert "Content-Encoding" not in small.headers
+    finally:
+        server_app.DB_PATH = original
+
+
+def test_fallback_compression():
+    from server import fallback
+
+    original, fallback.DB_PATH = fallback.DB_PATH, _db()
+    server = fallback.start_in_thread()
+    base = f"http://127.0.0.1:{server.port}"
+    try:
+        request = urllib.request.Request(base + "/api/tasks", headers={"Accept-Encoding": "gzip"})
+        with urllib.request.urlopen(request) as response:
+            assert response.headers["Content-Encoding"] == "gzip"
+            assert len(json.loads(gzip.decompress(response.read()))) == 60
+
+        request = urllib.request.Request(base + "/", headers={"Accept-Encoding": "gzip"})
+        with urllib.request.urlopen(request) as response:
+            assert response.headers["Content-Encoding"] == "gzip"
+            etag = response.headers["ETag"]
+        try:
+            urllib.request.urlopen(urllib.request.Request(base + "/", headers={"If-None-Match": etag}))
+            assert False
+        except urllib.error.HTTPError as e:
+            assert e.code == 304
+    finally:
+        server.stop()
+        fallback.DB_PATH = original
+
+
+if __name__ == "__main__":
+    test_negotiate()
+    test_asset_store()
+    test_fastapi_compression()
+    test_fallback_compression()
+    print("✅ 静态资源与压缩测试通过")
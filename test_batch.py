@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+"""
+测试批量修改接口（同一事务内执行多种操作并逐项返回结果）
+"""
+import os
+import sys
+import json
+import tempfile
+import urllib.request
+
+# 添加项目根目录到Python路径
+sys.path.insert(0, os.path.dirname(__file__))
+
+from database.batch import BatchError, MAX_BATCH_OPERATIONS, apply_batch
+from database.migrations import ensure_schema
+from database.pool import get_pool
+
+
+def _db():
+    path = os.path.join(tempfile.mkdtemp(), "tasks.db")
+    ensure_schema(path)
+    with get_pool(path).writer() as conn:
+        conn.executemany("INSERT INTO tasks (title, quadrant) VALUES (?, ?)", [("已有1", 1), ("已有2", 2)])
+    return path
+
+
+def _to_task(row):
+    return {"id": row["id"], "title": row["title"], "quadrant": row["quadrant"], "isCompleted": bool(row["is_completed"])}
+
+
+OPERATIONS = [
+    {"op": "create", "title": "新任务A", "quadrant": 3},
+    {"op": "create", "title": "新任务B"},
+    {"op": "move", "id": 1, "quadrant": 4},
+    {"op": "complete", "id": 2},
+    {"op": "update", "id": 3, "title": "新任务A改"},
+    {"op": "delete", "id": 99},
+    {"op": "move", "id": 1, "quadrant": 9},
+    {"op": "frobnicate"},
+    {"op": "delete", "id": 4},
+    {"op": "update", "id": 4, "title": "已删除"},
+]
+
+
+def _check(results):
+    assert [result["ok"] for result in results] == [True, True, True, True, True, False, False, False, True, False]
+    assert [result.get("id") for result in results[:5]] == [3, 4, 1, 2, 3]
+    assert results[0]["task"]["title"] == "新任务A改"
+    # 新任务B在同一批中被删除，结果中没有最新状态
+    assert "task" not in results[1]
+    assert results[2]["task"]["quadrant"] == 4
+    assert results[3]["task"]["isCompleted"] is True
+    assert results[5]["error"] == "not found"
+    assert results[9]["error"] == "not found"
+    assert "task" not in results[8]
+
+
+def test_batch_runs_in_one_transaction():
+    path = _db()
+    pool = get_pool(path)
+    statements = []
+    with pool.writer() as conn:
+        conn.set_trace_callback(statements.append)
+        try:
+            results = apply_batch(conn, OPERATIONS, _to_task)
+        finally:
+            conn.set_trace_callback(None)
+    _check(results)
+    # 修改计数器的触发器执行时，跟踪回调会再报告一次外层语句，去掉相邻的重复；
+    # 全文索引读写影子表的内部语句以 "-- " 开头，先去掉
+    statements = [s for s in statements if not s.startswith("-- ")]
+    statements = [s for i, s in enumerate(statements) if i == 0 or statements[i - 1] != s]
+    # 相邻的两个create合并为一次executemany，整批只开启一个事务
+    assert sum(statement.startswith("BEGIN") for statement in statements) == 1
+    assert sum(statement.startswith("INSERT") for statement in statements) == 2
+
+    with pool.reader() as conn:
+        titles = [row[0] for row in conn.execute("SELECT title FROM tasks ORDER BY id")]
+    assert titles == ["已有1", "已有2", "新任务A改"]
+
+
+def test_rejects_invalid_body():
+    path = _db()
+    with get_pool(path).writer() as conn:
+        for operations in ({"op": "create"}, [{"op": "delete", "id": 1}] * (MAX_BATCH_OPERATIONS + 1)):
+            try:
+                apply_batch(conn, operations, _to_task)
+                assert False
+            except BatchError:
+                pass
+
+
+def test_fastapi_batch_endpoint():
+    from fastapi.testclient import TestClient
+    from server import app as server_app
+
+    original, server_app.DB_PATH = server_app.DB_PATH, _db()
+    try:
+        client = TestClient(server_app.app)
+        response = client.post("/api/tasks/batch", json={"operations": OPERATIONS})
+        assert response.status_code == 200
+        results = response.json()["results"]
+        _check(results)
+        assert results[0]["task"]["orderIndex"] == -1024
+        assert client.post("/api/tasks/batch", json={"operations": "x"}).status_code in (400, 422)
+    finally:
+        server_app.DB_PATH = original
+
+
+def test_fallback_batch_endpoint():
+    from server import fallback
+
+    original, fallback.DB_PATH = fallback.DB_PATH, _db()
+    server = fallback.start_in_thread()
+    try:
+        request = urllib.request.Request(
+            f"http://127.0.0.1:{server.port}/api/tasks/batch",
+            data=json.dumps({"operations": OPERATIONS}).encode(),
+            headers={"Content-Type": "application/json"},
+            method="POST",
+        )
+        with urllib.request.urlopen(request) as response:
+            _check(json.loads(response.read())["results"])
+    finally:
+        server.stop()
+        fallback.DB_PATH = original
+
+
+if __name__ == "__main__":
+    test_batch_runs_in_one_transaction()
+    test_rejects_invalid_body()
+    test_fastapi_batch_endpoint()
+    test_fallback_batch_endpoint()
+    print("✅ 批量操作测试通过")
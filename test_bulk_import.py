@@ -0,0 +1,252 @@
+#!/usr/bin/env python3
+"""
+测试批量导入：三种解析器、分批与进度回调、导入后补做的全文索引/修改计数器/变更日志、
+排序值分配、小批量导入保留触发器、离线导入不等待写锁、出错时整体回滚，以及导出文件的再导入
+"""
+import os
+import sys
+import io
+import json
+import sqlite3
+import tempfile
+import time
+import http.client
+
+# 添加项目根目录到Python路径
+sys.path.insert(0, os.path.dirname(__file__))
+
+from database.bulk_import import (
+    ImportBusy, InvalidImport, SMALL_IMPORT, detect_format, import_file, import_tasks, parse_csv, parse_ndjson, parse_todotxt,
+    _DEFERRED_INDEXES, _DEFERRED_TRIGGERS,
+)
+from database.changes import RESET_KIND, read_changes
+from database.export import export_to_file
+from database.ranking import RANK_STEP
+from database.repository import TaskRepository
+from database.versioning import read_version
+
+
+def _repo():
+    return TaskRepository(os.path.join(tempfile.mkdtemp(), "tasks.db"))
+
+
+def _ndjson(records):
+    return [json.dumps(record, ensure_ascii=False) + "\n" for record in records]
+
+
+def _schema(repo):
+    names = _DEFERRED_TRIGGERS + _DEFERRED_INDEXES
+    return repo.read(lambda conn: conn.execute(
+        f"SELECT name, sql FROM sqlite_master WHERE name IN ({', '.join('?' * len(names))}) ORDER BY name", names
+    ).fetchall())
+
+
+def test_parsers():
+    records = list(parse_ndjson(["", '{"title": "a"}\n', "  \n", '{"title": "b", "quadrant": 2}\n']))
+    assert records == [(2, {"title": "a"}), (4, {"title": "b", "quadrant": 2})]
+
+    rows = list(parse_csv(io.StringIO('title,description,quadrant\r\n写报告,"含,逗号",1\r\n买菜,,\r\n', newline="")))
+    assert rows == [(2, {"title": "写报告", "description": "含,逗号", "quadrant": "1"}), (3, {"title": "买菜"})]
+    try:
+        list(parse_csv(io.StringIO("name\nx\n")))
+        assert False, "缺少 title 列应报错"
+    except InvalidImport as e:
+        assert e.line == 1
+
+    todo = list(parse_todotxt([
+        "(A) 2024-01-02 打电话给 +客户 @办公室\n",
+        "x 2024-02-03 2024-01-05 买菜 pri:B\n",
+        "普通任务\n",
+    ]))
+    assert todo[0][1]["title"] == "打电话给 +客户 @办公室" and todo[0][1]["quadrant"] == 1
+    assert todo[0][1]["createdAt"] == "2024-01-02 00:00:00" and not todo[0][1]["isCompleted"]
+    assert todo[1][1] == {"title": "买菜", "quadrant": 2, "isCompleted": True,
+                          "createdAt": "2024-01-05 00:00:00", "completedAt": "2024-02-03 00:00:00"}
+    assert todo[2][1]["quadrant"] == 4 and todo[2][1]["createdAt"] is None
+
+    assert detect_format("a.JSONL") == "ndjson" and detect_format("todo.txt") == "todotxt"
+    try:
+        detect_format("a.xml")
+        assert False, "未知扩展名应报错"
+    except ValueError:
+        pass
+
+
+def test_import_batches_and_deferred_work():
+    repo = _repo()
+    existing = repo.write(repo.create, "已有任务", "", 2)
+    schema = _schema(repo)
+    version = repo.read(read_version)
+    seq = repo.read(lambda conn: conn.execute("SELECT MAX(seq) FROM task_changes").fetchone()[0])
+
+    progress = []
+    records = [{"title": f"导入任务{i}", "description": f"描述{i}", "quadrant": 2} for i in range(25)]
+    records.append({"title": "做完了", "isCompleted": True, "createdAt": "2024-01-01 08:00:00"})
+    count = import_tasks(repo.db_path, parse_ndjson(_ndjson(records)), progress.append, batch=10, small_limit=0)
+    assert count == 26 and progress == [10, 20, 26]
+
+    # 推迟的触发器和索引都已恢复
+    assert _schema(repo) == schema
+    # 全文索引可以搜到导入的任务
+    assert [task["title"] for task in repo.read(repo.search, "导入任务7")] == ["导入任务7"]
+    # 短词的片段索引同样补上
+    assert len(repo.read(repo.search, "描述", 100)) == 25
+    # completed_at 已补上，未完成任务没有 completed_at
+    done = repo.read(lambda conn: conn.execute(
+        "SELECT created_at, completed_at FROM tasks WHERE title = '做完了'").fetchone())
+    assert done[0] == "2024-01-01 08:00:00" and done[1] is not None
+    assert repo.read(lambda conn: conn.execute(
+        "SELECT COUNT(*) FROM tasks WHERE is_completed = 0 AND completed_at IS NOT NULL").fetchone()[0]) == 0
+    # 修改计数器只加一，旧的推送位置收到 reset
+    assert repo.read(read_version)[0] == version[0] + 1
+    assert repo.read(read_changes, seq) is None
+    # 日志中只多了一条 reset 标记，位置在标记之后的连接照常继续
+    marker = repo.read(lambda conn: conn.execute("SELECT seq, task_id, kind FROM task_changes WHERE seq > ?",
+                                                 (seq,)).fetchall())
+    assert [tuple(row)[1:] for row in marker] == [(0, RESET_KIND)]
+    assert repo.read(read_changes, marker[0][0]) == []
+    # 排序值接在象限已有任务之后
+    ranks = repo.read(lambda conn: [row[0] for row in conn.execute(
+        "SELECT order_index FROM tasks WHERE quadrant = 2 ORDER BY id").fetchall()])
+    assert ranks[0] == existing["order_index"]
+    assert ranks[1:] == [existing["order_index"] + RANK_STEP * i for i in range(1, 26)]
+
+    # 导入后新建任务照常走触发器
+    created = repo.write(repo.create, "导入后新建")
+    assert [task["id"] for task in repo.read(repo.search, "导入后新建")] == [created["id"]]
+
+
+def test_small_import_keeps_triggers():
+    repo = _repo()
+    seq = repo.read(lambda conn: conn.execute("SELECT COALESCE(MAX(seq), 0) FROM task_changes").fetchone()[0])
+    progress = []
+    assert import_tasks(repo.db_path, parse_ndjson(_ndjson([{"title": f"小批量{i}"} for i in range(3)])),
+                        progress.append) == 3
+    assert progress == [3]
+    # 逐行记录变更，推送连接照常收到 created 事件，不需要重新加载
+    changes = repo.read(read_changes, seq)
+    assert [json.loads(data)["type"] for _, data in changes] == ["created"] * 3
+    assert [task["title"] for task in repo.read(repo.search, "小批量1")] == ["小批量1"]
+
+
+def test_offline_import_refuses_while_busy():
+    repo = _repo()
+    schema = _schema(repo)
+    other = sqlite3.connect(repo.db_path, isolation_level=None)
+    other.execute("BEGIN IMMEDIATE")
+    try:
+        start = time.monotonic()
+        try:
+            import_tasks(repo.db_path, parse_ndjson(_ndjson([{"title": "大批量"}] * 3)), small_limit=0)
+            assert False, "其他连接正在写入时应抛出 ImportBusy"
+        except ImportBusy:
+            pass
+        # 不等待 busy_timeout
+        assert time.monotonic() - start < 1
+    finally:
+        other.execute("ROLLBACK")
+        other.close()
+    assert _schema(repo) == schema
+    # 写连接的等待时间已恢复，之后的导入照常进行
+    assert repo.read(lambda conn: conn.execute("SELECT COUNT(*) FROM tasks").fetchone()[0]) == 0
+    assert import_tasks(repo.db_path, parse_ndjson(_ndjson([{"title": "大批量"}] * 3)), small_limit=0) == 3
+    with repo.pool.writer() as conn:
+        assert conn.execute("PRAGMA busy_timeout").fetchone()[0] == 5000
+
+
+def test_invalid_row_rolls_back():
+    repo = _repo()
+    repo.write(repo.create, "原有任务")
+    schema = _schema(repo)
+    version = repo.read(read_version)
+    lines = _ndjson([{"title": "好的"}] * 15) + ['{"title": "坏的", "quadrant": 7}\n']
+    for bad in (lines, _ndjson([{"title": "好的"}]) + ["{not json\n"], _ndjson([{"title": "  "}])):
+        for small_limit in (0, SMALL_IMPORT):
+            try:
+                import_tasks(repo.db_path, parse_ndjson(bad), batch=10, small_limit=small_limit)
+                assert False, "格式错误应抛出 InvalidImport"
+            except InvalidImport as e:
+                assert e.line == len(bad)
+    assert repo.read(lambda conn: conn.execute("SELECT COUNT(*) FROM tasks").fetchone()[0]) == 1
+    assert _schema(repo) == schema
+    assert repo.read(read_version) == version
+    assert repo.read(repo.search, "好的") == []
+
+
+def _read_event(response):
+    """读取下一个 SSE 事件（跳过心跳），返回 (event, data)"""
+    event = {}
+    while True:
+        line = response.fp.readline().decode().rstrip("\n")
+        if not line:
+            if "data" in event:
+                return event.get("event", "message"), json.loads(event["data"])
+            continue
+        if not line.startswith(":"):
+            name, _, value = line.partition(": ")
+            event[name] = value
+
+
+def test_open_stream_resets_after_import():
+    from server import fallback
+
+    repo = _repo()
+    original, fallback.DB_PATH = fallback.DB_PATH, repo.db_path
+    server = fallback.start_in_thread()
+    conn = http.client.HTTPConnection("127.0.0.1", server.port, timeout=10)
+    try:
+        conn.request("GET", "/api/events")
+        response = conn.getresponse()
+        assert response.status == 200
+        # 小批量导入逐条推送
+        import_tasks(repo.db_path, parse_ndjson(_ndjson([{"title": "小批量"}])))
+        kind, data = _read_event(response)
+        assert kind == "message" and (data["type"], data["task"]["title"]) == ("created", "小批量")
+        import_tasks(repo.db_path, parse_ndjson(_ndjson([{"title": f"导入{i}"} for i in range(5)])), small_limit=0)
+        assert _read_event(response)[0] == "reset"
+        # reset 之后的普通写入照常逐条推送
+        repo.write(repo.create, "导入后新建")
+        kind, data = _read_event(response)
+        assert kind == "message" and (data["type"], data["task"]["title"]) == ("created", "导入后新建")
+    finally:
+        conn.close()
+        server.stop()
+        fallback.DB_PATH = original
+
+
+def test_export_round_trip():
+    source = _repo()
+    source.write(source.create, "写报告", "含,逗号和\"引号\"", 1)
+    done = source.write(source.create, "买菜", "多行\n描述", 3)["id"]
+    source.write(source.set_completed, done, True)
+    archived = source.write(source.create, "已归档")["id"]
+    source.write(source.set_completed, archived, True)
+    with source.pool.writer() as conn:
+        conn.execute("UPDATE tasks SET completed_at = datetime('now', '-2 days') WHERE id = ?", (archived,))
+    source.write(source.archive, 1)
+
+    root = tempfile.mkdtemp()
+    for fmt in ("ndjson", "csv"):
+        path = os.path.join(root, f"tasks.{fmt}")
+        with open(path, "wb") as output:
+            export_to_file(source.db_path, output, fmt)
+        target = _repo()
+        assert import_file(target.db_path, path) == 3
+        rows = target.read(lambda conn: conn.execute(
+            "SELECT title, description, quadrant, is_completed, order_index FROM tasks ORDER BY id").fetchall())
+        expected = source.read(lambda conn: conn.execute(
+            "SELECT title, description, quadrant, is_completed, order_index FROM tasks ORDER BY id").fetchall())
+        # 归档任务导入为已完成任务
+        assert [tuple(row) for row in rows[:2]] == [tuple(row) for row in expected]
+        assert rows[2]["title"] == "已归档" and rows[2]["is_completed"] == 1
+
+
+if __name__ == "__main__":
+    test_parsers()
+    test_import_batches_and_deferred_work()
+    test_small_import_keeps_triggers()
+    test_offline_import_refuses_while_busy()
+    test_invalid_row_rolls_back()
+    test_open_stream_resets_after_import()
+    test_export_round_trip()
+    print("✅ 批量导入测试通过")
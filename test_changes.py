@@ -0,0 +1,164 @@
+#!/usr/bin/env python3
+"""
+测试任务变更日志（触发器）以及两个服务器的 /api/events 推送
+"""
+import os
+import sys
+import json
+import time
+import tempfile
+import threading
+import http.client
+
+# 添加项目根目录到Python路径
+sys.path.insert(0, os.path.dirname(__file__))
+
+from database.changes import latest_seq, read_changes
+from database.migrations import ensure_schema
+from database.pool import get_pool
+
+
+def _db():
+    path = os.path.join(tempfile.mkdtemp(), "tasks.db")
+    ensure_schema(path)
+    return path
+
+
+def _changes(path, after=0):
+    with get_pool(path).reader() as conn:
+        changes = read_changes(conn, after)
+    return None if changes is None else [json.loads(data) for _, data in changes]
+
+
+def test_triggers_record_changes():
+    path = _db()
+    pool = get_pool(path)
+    with pool.writer() as conn:
+        conn.execute("INSERT INTO tasks (title, quadrant) VALUES ('任务', 1)")
+        conn.execute("UPDATE tasks SET title = '改名' WHERE id = 1")
+        conn.execute("UPDATE tasks SET title = '改名' WHERE id = 1")  # 没有变化，不记录
+        conn.execute("UPDATE tasks SET quadrant = 2 WHERE id = 1")
+        conn.execute("UPDATE tasks SET is_completed = 1 WHERE id = 1")
+        conn.execute("INSERT INTO tasks (title) VALUES ('保留')")
+        conn.execute("DELETE FROM tasks WHERE id = 1")
+    changes = _changes(path)
+    assert [(c["type"], c["id"]) for c in changes] == [
+        ("created", 1), ("updated", 1), ("moved", 1), ("completed", 1), ("created", 2), ("deleted", 1)
+    ]
+    # 事件带着任务的当前状态，已删除的任务为null
+    assert all(c["task"] is None for c in changes if c["id"] == 1)
+    assert changes[4]["task"]["title"] == "保留" and changes[4]["task"]["isCompleted"] is False
+    assert _changes(path, after=5) == [changes[5]]
+
+
+def test_log_is_pruned():
+    path = _db()
+    with get_pool(path).writer() as conn:
+        conn.executemany("INSERT INTO tasks (title) VALUES (?)", [(f"任务{i}",) for i in range(12000)])
+    with get_pool(path).reader() as conn:
+        assert latest_seq(conn) == 12000
+        assert conn.execute("SELECT COUNT(*) FROM task_changes").fetchone()[0] <= 11000
+    # 请求的位置已被清理时要求客户端重新加载
+    assert _changes(path, after=0) is None
+    assert len(_changes(path, after=11990)) == 10
+
+
+def _open_stream(port, headers=None):
+    conn = http.client.HTTPConnection("127.0.0.1", port, timeout=10)
+    conn.request("GET", "/api/events", headers=headers or {})
+    response = conn.getresponse()
+    assert response.status == 200
+    assert response.getheader("Content-Type").startswith("text/event-stream")
+    return conn, response
+
+
+def _read_event(response):
+    """读取下一个事件（跳过心跳注释），返回 (id, event, data)"""
+    event = {}
+    while True:
+        line = response.fp.readline().decode().rstrip("\n")
+        if not line:
+            if "data" in event:
+                return event.get("id"), event.get("event", "message"), json.loads(event["data"])
+            continue
+        if line.startswith(":"):
+            continue
+        name, _, value = line.partition(": ")
+        event[name] = value
+
+
+def _send(port, method, path, body=None):
+    conn = http.client.HTTPConnection("127.0.0.1", port, timeout=10)
+    conn.request(method, path, body=json.dumps(body) if body is not None else None,
+                 headers={"Content-Type": "application/json"})
+    data = json.loads(conn.getresponse().read())
+    conn.close()
+    return data
+
+
+def _check_stream(port, path):
+    # 连接之前的修改不会推送
+    _send(port, "POST", "/api/tasks", {"title": "旧任务"})
+    conn, response = _open_stream(port)
+    try:
+        task = _send(port, "POST", "/api/tasks", {"title": "新任务", "quadrant": 2})
+        seq, kind, data = _read_event(response)
+        assert kind == "message" and data["type"] == "created" and data["task"]["title"] == "新任务"
+        _send(port, "PATCH", f"/api/tasks/{task['id']}/quadrant", {"quadrant": 3})
+        _, _, data = _read_event(response)
+        assert (data["type"], data["task"]["quadrant"]) == ("moved", 3)
+
+        # 桌面端直接写数据库的修改同样会推送
+        with get_pool(path).writer() as db:
+            db.execute("DELETE FROM tasks WHERE id = ?", (task["id"],))
+        _, _, data = _read_event(response)
+        assert (data["type"], data["task"]) == ("deleted", None)
+    finally:
+        conn.close()
+
+    # 断线重连时从 Last-Event-ID 继续
+    conn, response = _open_stream(port, {"Last-Event-ID": seq})
+    try:
+        _, _, data = _read_event(response)
+        assert data["type"] == "moved"
+    finally:
+        conn.close()
+
+
+def test_fastapi_event_stream():
+    import uvicorn
+    from server import app as server_app
+
+    path = _db()
+    original, server_app.DB_PATH = server_app.DB_PATH, path
+    server = uvicorn.Server(uvicorn.Config(server_app.app, host="127.0.0.1", port=0, log_level="warning"))
+    server.config.timeout_graceful_shutdown = 1
+    threading.Thread(target=server.run, daemon=True).start()
+    try:
+        while not server.started:
+            time.sleep(0.05)
+        _check_stream(server.servers[0].sockets[0].getsockname()[1], path)
+    finally:
+        server.should_exit = True
+        server_app.DB_PATH = original
+
+
+def test_fallback_event_stream():
+    from server import fallback
+
+    path = _db()
+    original, fallback.DB_PATH = fallback.DB_PATH, path
+    server = fallback.start_in_thread()
+    try:
+        _check_stream(server.port, path)
+    finally:
+        server.stop()
+        fallback.DB_PATH = original
+
+
+if __name__ == "__main__":
+    test_triggers_record_changes()
+    test_log_is_pruned()
+    test_fastapi_event_stream()
+    test_fallback_event_stream()
+    print("✅ 变更推送测试通过")
@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""
+测试已完成任务分页模型（按页加载、完成/取消完成/清空时增量更新）
+"""
+import os
+import sys
+import tempfile
+
+# 添加项目根目录到Python路径
+sys.path.insert(0, os.path.dirname(__file__))
+
+from PySide6.QtCore import QCoreApplication
+
+from models.completed_model import CompletedTasksModel
+from models.task_model_optimized import TaskModel
+
+app = QCoreApplication.instance() or QCoreApplication(sys.argv)
+
+
+def _model(count):
+    model = TaskModel(db_path=os.path.join(tempfile.mkdtemp(), "tasks.db"))
+    with model.pool.writer() as conn:
+        conn.executemany(
+            "INSERT INTO tasks (id, title, quadrant, is_completed, created_at) VALUES (?, ?, 1, 1, ?)",
+            [(i, f"任务{i}", f"2024-01-01 00:00:{i % 60:02d}") for i in range(1, count + 1)]
+        )
+    model._completed_model.page_size = 10
+    return model, model.completedModel()
+
+
+def _ids(completed):
+    return [completed.data(completed.index(row, 0), CompletedTasksModel.TaskIdRole)
+            for row in range(completed.rowCount())]
+
+
+def _expected(ids):
+    return sorted(ids, key=lambda i: (i % 60, i), reverse=True)
+
+
+def test_fetch_more_pages_through_history():
+    model, completed = _model(25)
+    assert completed.rowCount() == 0 and completed.canFetchMore()
+    completed.fetchMore()
+    assert _ids(completed) == _expected(range(1, 26))[:10]
+    while completed.canFetchMore():
+        completed.fetchMore()
+    assert _ids(completed) == _expected(range(1, 26))
+
+
+def test_completion_changes_apply_incrementally():
+    model, completed = _model(25)
+    completed.fetchMore()
+    events = []
+    completed.modelReset.connect(lambda: events.append("reset"))
+    completed.rowsInserted.connect(lambda parent, first, last: events.append(("insert", first)))
+    completed.rowsRemoved.connect(lambda parent, first, last: events.append(("remove", first)))
+
+    loaded = _ids(completed)
+    model.setTaskCompleted(loaded[3], False)
+    assert events == [("remove", 3)]
+    assert loaded[3] in model.tasks
+
+    model.setTaskCompleted(loaded[3], True)
+    assert _ids(completed) == loaded
+    assert events[-1] == ("insert", 3)
+
+    # 排在已加载范围之后的任务留给下一页
+    tail = _expected(range(1, 26))[-1]
+    model.setTaskCompleted(tail, False)
+    model.setTaskCompleted(tail, True)
+    assert tail not in _ids(completed)
+
+    model.clearCompletedTasks()
+    assert completed.rowCount() == 0 and not completed.canFetchMore()
+    assert "reset" not in events
+
+
+if __name__ == "__main__":
+    test_fetch_more_pages_through_history()
+    test_completion_changes_apply_incrementally()
+    print("✅ 已完成任务模型测试通过")
@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+测试SQLite连接池的脚本
+"""
+import os
+import sys
+import sqlite3
+import tempfile
+import threading
+
+# 添加项目根目录到Python路径
+sys.path.insert(0, os.path.dirname(__file__))
+
+from database.pool import ConnectionPool
+
+
+def _make_pool():
+    tmp_dir = tempfile.mkdtemp()
+    pool = ConnectionPool(os.path.join(tmp_dir, "pool.db"))
+    with pool.writer() as conn:
+        conn.execute("CREATE TABLE items (id INTEGER PRIMARY KEY, name TEXT)")
+    return pool
+
+
+def test_reader_is_reused_per_thread():
+    pool = _make_pool()
+    with pool.reader() as first:
+        pass
+    with pool.reader() as second:
+        pass
+    assert first is second
+
+    other = []
+    def worker():
+        with pool.reader() as conn:
+            other.append(conn)
+    thread = threading.Thread(target=worker)
+    thread.start()
+    thread.join()
+    assert other[0] is not first
+    pool.close()
+
+
+def test_writer_commits_and_rolls_back():
+    pool = _make_pool()
+    with pool.writer() as conn:
+        conn.execute("INSERT INTO items (name) VALUES ('a')")
+
+    try:
+        with pool.writer() as conn:
+            conn.execute("INSERT INTO items (name) VALUES ('b')")
+            raise RuntimeError("boom")
+    except RuntimeError:
+        pass
+
+    with pool.reader() as conn:
+        names = [row["name"] for row in conn.execute("SELECT name FROM items")]
+    assert names == ["a"]
+    pool.close()
+
+
+def test_reader_is_read_only():
+    pool = _make_pool()
+    with pool.reader() as conn:
+        try:
+            conn.execute("INSERT INTO items (name) VALUES ('x')")
+        except sqlite3.OperationalError:
+            pass
+        else:
+            raise AssertionError("读连接不应允许写入")
+    pool.close()
+
+
+def test_stats_count_checkouts():
+    pool = _make_pool()
+    for _ in range(3):
+        with pool.reader():
+            pass
+    stats = pool.stats()
+    assert stats["reader"]["checkouts"] == 3
+    assert stats["writer"]["checkouts"] == 1
+    assert stats["openReaders"] == 1
+    pool.close()
+
+
+if __name__ == "__main__":
+    test_reader_is_reused_per_thread()
+    test_writer_commits_and_rolls_back()
+    test_reader_is_read_only()
+    test_stats_count_checkouts()
+    print("✅ 连接池测试通过")
@@ -0,0 +1,162 @@
+#!/usr/bin/env python3
+"""
+测试数据库执行器（专用读/写线程）以及异步路由
+"""
+import os
+import sys
+import asyncio
+import inspect
+import tempfile
+import threading
+
+# 添加项目根目录到Python路径
+sys.path.insert(0, os.path.dirname(__file__))
+
+from database.executor import DatabaseExecutor, get_executor
+from database.migrations import ensure_schema
+from database.pool import get_pool
+
+
+def _pool():
+    path = os.path.join(tempfile.mkdtemp(), "tasks.db")
+    ensure_schema(path)
+    return get_pool(path)
+
+
+def test_lanes_run_on_dedicated_threads():
+    pool = _pool()
+    executor = DatabaseExecutor(pool, readers=2, queue_limit=4)
+    order = []
+
+    def insert(conn, index):
+        order.append(index)
+        conn.execute("INSERT INTO tasks (title) VALUES (?)", (f"任务{index}",))
+        return threading.current_thread().name
+
+    def count(conn):
+        return threading.current_thread().name, conn.execute("SELECT COUNT(*) FROM tasks").fetchone()[0]
+
+    async def scenario():
+        names = await asyncio.gather(*(executor.write(insert, i) for i in range(20)))
+        reader_name, total = await executor.read(count)
+        return names, reader_name, total
+
+    try:
+        names, reader_name, total = asyncio.run(scenario())
+    finally:
+        executor.shutdown()
+    # 写请求在唯一的写线程上按提交顺序执行，读请求在读线程上
+    assert order == list(range(20))
+    assert {name.split("_")[0] for name in names} == {"db-writer"}
+    assert reader_name.startswith("db-reader")
+    assert total == 20
+    assert executor.stats()["writer"]["completed"] == 20
+
+
+def test_write_error_rolls_back():
+    pool = _pool()
+    executor = get_executor(pool.db_path)
+
+    def failing(conn):
+        conn.execute("INSERT INTO tasks (title) VALUES ('回滚')")
+        raise KeyError("boom")
+
+    try:
+        asyncio.run(executor.write(failing))
+        assert False
+    except KeyError:
+        pass
+    assert asyncio.run(executor.read(lambda conn: conn.execute("SELECT COUNT(*) FROM tasks").fetchone()[0])) == 0
+    assert get_executor(pool.db_path) is executor
+
+
+def test_group_commit_coalesces_writes():
+    pool = _pool()
+    executor = DatabaseExecutor(pool, commit_batch=8)
+    gate = threading.Event()
+    commits = []
+    with pool.writer() as conn:
+        conn.set_trace_callback(lambda statement: commits.append(statement) if statement == "COMMIT" else None)
+
+    def blocked(conn):
+        gate.wait(5)
+        conn.execute("INSERT INTO tasks (title) VALUES ('第一个')")
+
+    def insert(conn, index):
+        if index == 3:
+            conn.execute("INSERT INTO tasks (title) VALUES ('回滚')")
+            raise ValueError("bad")
+        return conn.execute("INSERT INTO tasks (title) VALUES (?) RETURNING id", (f"任务{index}",)).fetchone()[0]
+
+    async def scenario():
+        first = asyncio.ensure_future(executor.write(blocked))
+        await asyncio.sleep(0.05)
+        # 写线程被第一个操作占住期间排队的写操作会合并提交
+        rest = [asyncio.ensure_future(executor.write(insert, i)) for i in range(10)]
+        await asyncio.sleep(0.05)
+        gate.set()
+        await first
+        return await asyncio.gather(*rest, return_exceptions=True)
+
+    try:
+        results = asyncio.run(scenario())
+    finally:
+        executor.shutdown()
+    # 出错的操作只回滚它自己，异常只交给它的调用方
+    assert isinstance(results[3], ValueError)
+    assert [r for i, r in enumerate(results) if i != 3] == [2, 3, 4, 5, 6, 7, 8, 9, 10]
+    stats = executor.stats()["writer"]["groupCommit"]
+    assert (stats["batches"], stats["largestBatch"], stats["failed"]) == (3, 8, 1)
+    assert stats["batchSizes"]["<=1"] == 1 and stats["batchSizes"]["<=8"] == 1
+    assert len(commits) == 3
+    with pool.reader() as conn:
+        titles = [row[0] for row in conn.execute("SELECT title FROM tasks ORDER BY id")]
+    assert "回滚" not in titles and len(titles) == 10
+
+
+def test_commit_window_collects_writes():
+    pool = _pool()
+    executor = DatabaseExecutor(pool, commit_window=0.2)
+
+    async def scenario():
+        first = asyncio.ensure_future(executor.write(lambda conn: conn.execute("INSERT INTO tasks (title) VALUES ('a')")))
+        await asyncio.sleep(0.05)
+        await executor.write(lambda conn: conn.execute("INSERT INTO tasks (title) VALUES ('b')"))
+        await first
+
+    try:
+        asyncio.run(scenario())
+    finally:
+        executor.shutdown()
+    # 第二个写操作在等待时间内到达，两个操作一起提交
+    assert executor.stats()["writer"]["groupCommit"]["batches"] == 1
+
+
+def test_routes_are_async():
+    from fastapi.testclient import TestClient
+    from server import app as server_app
+
+    for route in server_app.app.routes:
+        if getattr(route, "path", "").startswith("/api/"):
+            assert inspect.iscoroutinefunction(route.endpoint), route.path
+
+    original, server_app.DB_PATH = server_app.DB_PATH, _pool().db_path
+    try:
+        client = TestClient(server_app.app)
+        task = client.post("/api/tasks", json={"title": "异步"}).json()
+        assert client.patch(f"/api/tasks/{task['id']}", json={"title": "改名"}).json()["title"] == "改名"
+        assert client.patch("/api/tasks/99", json={"title": "x"}).status_code == 404
+        assert client.patch("/api/tasks/99/complete", json={}).status_code == 404
+        assert [t["title"] for t in client.get("/api/tasks").json()] == ["改名"]
+        assert client.get("/api/stats/pool").json()["executor"]["writer"]["workers"] == 1
+    finally:
+        server_app.DB_PATH = original
+
+
+if __name__ == "__main__":
+    test_lanes_run_on_dedicated_threads()
+    test_write_error_rolls_back()
+    test_group_commit_coalesces_writes()
+    test_commit_window_collects_writes()
+    test_routes_are_async()
+    print("✅ 数据库执行器测试通过")
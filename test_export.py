@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+"""
+测试任务导出：NDJSON/CSV 编码、按块读取、导出期间写入不影响快照，
+以及两个Web服务器的 /api/tasks/export（分块传输）
+"""
+import os
+import sys
+import csv
+import io
+import json
+import tempfile
+import http.client
+
+# 添加项目根目录到Python路径
+sys.path.insert(0, os.path.dirname(__file__))
+
+from database.archive import archive_all
+from database.export import TaskExport, export_to_file
+from database.repository import TaskRepository
+
+
+def _repo():
+    return TaskRepository(os.path.join(tempfile.mkdtemp(), "tasks.db"))
+
+
+def _seed(repo):
+    """两个活动任务、一个已完成任务、一个归档任务"""
+    archived = repo.write(repo.create, "已归档", "旧的")["id"]
+    repo.write(repo.set_completed, archived, True)
+    repo.write(archive_all)
+    repo.write(repo.create, "写报告", "含,逗号和\"引号\"", 1)
+    done = repo.write(repo.create, "买菜")["id"]
+    repo.write(repo.set_completed, done, True)
+    repo.write(repo.create, "多行\n描述", None, 3)
+    return archived
+
+
+def _ndjson(data):
+    return [json.loads(line) for line in data.decode().splitlines()]
+
+
+def test_ndjson_export():
+    repo = _repo()
+    archived = _seed(repo)
+    records = _ndjson(b"".join(TaskExport(repo.db_path, "ndjson")))
+    # 先是 tasks 表（按id），最后是归档
+    assert [record["title"] for record in records] == ["写报告", "买菜", "多行\n描述", "已归档"]
+    assert [record["archived"] for record in records] == [False, False, False, True]
+    assert records[1]["isCompleted"] is True and records[1]["completedAt"]
+    assert records[0]["completedAt"] is None and records[0]["quadrant"] == 1
+    assert records[2]["description"] == ""
+    assert records[3]["id"] == archived and records[3]["isCompleted"] is True
+
+
+def test_csv_export():
+    repo = _repo()
+    _seed(repo)
+    output = io.BytesIO()
+    size = export_to_file(repo.db_path, output, "csv")
+    assert size == len(output.getvalue())
+    rows = list(csv.DictReader(io.StringIO(output.getvalue().decode(), newline="")))
+    assert [row["title"] for row in rows] == ["写报告", "买菜", "多行\n描述", "已归档"]
+    assert rows[0]["description"] == "含,逗号和\"引号\"" and rows[0]["completedAt"] == ""
+    assert [row["isCompleted"] for row in rows] == ["0", "1", "0", "1"]
+
+    # 没有任务时只有表头
+    empty = b"".join(TaskExport(_repo().db_path, "csv")).decode()
+    assert empty == "id,title,description,quadrant,isCompleted,createdAt,completedAt,orderIndex,archived\r\n"
+
+
+def test_chunks_and_snapshot():
+    repo = _repo()
+    with repo.pool.writer() as conn:
+        conn.executemany("INSERT INTO tasks (title) VALUES (?)", [(f"任务{i}",) for i in range(25)])
+    export = TaskExport(repo.db_path, "ndjson", batch=10)
+    first = export.read_chunk()
+    assert len(_ndjson(first)) == 10
+    # 导出开始后的写入不出现在本次导出中
+    repo.write(repo.create, "导出期间新建")
+    with repo.pool.writer() as conn:
+        conn.execute("DELETE FROM tasks WHERE title = '任务20'")
+    rest = []
+    while True:
+        chunk = export.read_chunk()
+        if not chunk:
+            break
+        rest.append(len(_ndjson(chunk)))
+    assert rest == [10, 5]
+    assert export.read_chunk() == b""
+
+
+def _get(port, path, conn=None):
+    conn = conn or http.client.HTTPConnection("127.0.0.1", port, timeout=10)
+    conn.request("GET", path)
+    response = conn.getresponse()
+    return conn, response, response.read()
+
+
+def test_fallback_endpoint():
+    from server import fallback
+
+    repo = _repo()
+    _seed(repo)
+    original, fallback.DB_PATH = fallback.DB_PATH, repo.db_path
+    server = fallback.start_in_thread()
+    try:
+        conn, response, body = _get(server.port, "/api/tasks/export")
+        assert response.status == 200 and response.getheader("Transfer-Encoding") == "chunked"
+        assert response.getheader("Content-Type") == "application/x-ndjson"
+        assert len(_ndjson(body)) == 4
+        # 分块传输结束后连接可以继续使用
+        _, response, body = _get(server.port, "/api/tasks/export?format=csv", conn)
+        assert response.getheader("Content-Disposition") == 'attachment; filename="tasks.csv"'
+        assert body.decode().startswith("id,title,")
+        conn.close()
+        assert _get(server.port, "/api/tasks/export?format=xml")[1].status == 400
+    finally:
+        server.stop()
+        fallback.DB_PATH = original
+
+
+def test_fastapi_endpoint():
+    from fastapi.testclient import TestClient
+    from server import app as server_app
+
+    repo = _repo()
+    _seed(repo)
+    original, server_app.DB_PATH = server_app.DB_PATH, repo.db_path
+    try:
+        client = TestClient(server_app.app)
+        response = client.get("/api/tasks/export")
+        assert response.status_code == 200 and response.headers["content-type"] == "application/x-ndjson"
+        assert [record["title"] for record in _ndjson(response.content)][-1] == "已归档"
+        response = client.get("/api/tasks/export", params={"format": "csv"})
+        assert response.text.startswith("id,title,")
+        assert client.get("/api/tasks/export", params={"format": "xml"}).status_code == 400
+    finally:
+        server_app.DB_PATH = original
+
+
+if __name__ == "__main__":
+    test_ndjson_export()
+    test_csv_export()
+    test_chunks_and_snapshot()
+    test_fallback_endpoint()
+    test_fastapi_endpoint()
+    print("✅ 导出测试通过")
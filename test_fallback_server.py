@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""
+测试内置 asyncio 服务器：持久连接、路由表、错误响应
+"""
+import os
+import sys
+import json
+import socket
+import tempfile
+import http.client
+
+# 添加项目根目录到Python路径
+sys.path.insert(0, os.path.dirname(__file__))
+
+from database.migrations import ensure_schema
+from server import fallback
+
+
+def test_router():
+    router = fallback.Router(fallback.ROUTES)
+    assert router.match("GET", "/api/tasks") == (fallback.list_active, {})
+    assert router.match("PATCH", "/api/tasks/12/quadrant") == (fallback.move_task, {"task_id": 12})
+    assert router.match("PATCH", "/api/tasks/12") == (fallback.update_task, {"task_id": 12})
+    # 固定路径优先于带参数的路径
+    assert router.match("DELETE", "/api/tasks/completed") == (fallback.clear_completed, {})
+    assert router.match("DELETE", "/api/tasks/7") == (fallback.delete_task, {"task_id": 7})
+    # 路径存在但方法不对时返回允许的方法
+    assert router.match("PUT", "/api/tasks") == (None, {"GET", "POST"})
+    assert router.match("GET", "/api/tasks/7") == (None, {"PATCH", "DELETE"})
+    assert router.match("GET", "/api/tasks/x/quadrant") == (None, None)
+
+
+def _start():
+    path = os.path.join(tempfile.mkdtemp(), "tasks.db")
+    ensure_schema(path)
+    original, fallback.DB_PATH = fallback.DB_PATH, path
+    return original, fallback.start_in_thread()
+
+
+def test_keep_alive():
+    original, server = _start()
+    conn = http.client.HTTPConnection("127.0.0.1", server.port, timeout=10)
+    try:
+        conn.request("POST", "/api/tasks", body=json.dumps({"title": "任务", "quadrant": 2}),
+                     headers={"Content-Type": "application/json"})
+        response = conn.getresponse()
+        assert response.status == 201 and response.getheader("Connection") == "keep-alive"
+        task = json.loads(response.read())
+        sock = conn.sock
+
+        # 同一个连接上继续发送请求
+        conn.request("PATCH", f"/api/tasks/{task['id']}/complete", body=json.dumps({"completed": True}))
+        response = conn.getresponse()
+        assert json.loads(response.read())["isCompleted"] is True
+        conn.request("GET", "/api/tasks/completed")
+        response = conn.getresponse()
+        assert [t["id"] for t in json.loads(response.read())] == [task["id"]]
+        conn.request("HEAD", "/")
+        response = conn.getresponse()
+        assert response.status == 200 and response.read() == b""
+        assert conn.sock is sock
+
+        conn.request("PUT", "/api/tasks")
+        response = conn.getresponse()
+        response.read()
+        assert response.status == 405 and response.getheader("Allow") == "GET, POST"
+        conn.request("PATCH", "/api/tasks/999", body=json.dumps({"title": "x"}))
+        response = conn.getresponse()
+        assert response.status == 404 and json.loads(response.read()) == {"error": "not found"}
+        conn.request("POST", "/api/tasks", body=b"{bad")
+        response = conn.getresponse()
+        assert response.status == 400 and "error" in json.loads(response.read())
+        assert conn.sock is sock
+    finally:
+        conn.close()
+        server.stop()
+        fallback.DB_PATH = original
+
+
+def test_http10_closes_connection():
+    original, server = _start()
+    try:
+        with socket.create_connection(("127.0.0.1", server.port), timeout=10) as sock:
+            sock.sendall(b"GET /api/tasks HTTP/1.0\r\n\r\n")
+            data = b""
+            while chunk := sock.recv(65536):
+                data += chunk
+        head, _, body = data.partition(b"\r\n\r\n")
+        assert head.startswith(b"HTTP/1.1 200") and b"Connection: close" in head
+        assert json.loads(body) == []
+    finally:
+        server.stop()
+        fallback.DB_PATH = original
+
+
+if __name__ == "__main__":
+    test_router()
+    test_keep_alive()
+    test_http10_closes_connection()
+    print("✅ 内置服务器测试通过")
@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""
+测试数据库结构迁移的脚本
+"""
+import os
+import sys
+import sqlite3
+import tempfile
+
+# 添加项目根目录到Python路径
+sys.path.insert(0, os.path.dirname(__file__))
+
+from database.migrations import SCHEMA_VERSION, get_schema_version, migrate
+from database.repository import TaskRepository
+
+
+def _legacy_db():
+    """创建一个没有 order_index 列、版本号为0的旧数据库"""
+    path = os.path.join(tempfile.mkdtemp(), "legacy.db")
+    conn = sqlite3.connect(path)
+    conn.execute('''
+    CREATE TABLE tasks (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        title TEXT NOT NULL,
+        description TEXT,
+        quadrant INTEGER DEFAULT 4,
+        is_completed BOOLEAN DEFAULT 0,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    )
+    ''')
+    conn.execute("INSERT INTO tasks (title, quadrant) VALUES ('旧任务', 2)")
+    conn.commit()
+    return conn
+
+
+def test_migrate_legacy_database():
+    conn = _legacy_db()
+    assert get_schema_version(conn) == 0
+    assert migrate(conn) == SCHEMA_VERSION
+
+    columns = [row[1] for row in conn.execute("PRAGMA table_info(tasks)")]
+    assert "order_index" in columns
+    assert conn.execute("SELECT title FROM tasks").fetchone()[0] == "旧任务"
+    # 活动任务按原顺序重新编号为等距的排序值
+    assert conn.execute("SELECT order_index FROM tasks").fetchone()[0] == 1024
+    # 列表任务数按已有数据初始化
+    assert dict(conn.execute("SELECT listing, count FROM task_counts")) == {"active": 1, "completed": 0, "archived": 0}
+    # 短词索引包含已有任务
+    assert conn.execute("SELECT rowid FROM tasks_fts_short WHERE tasks_fts_short MATCH '\"任\"*'").fetchall() == [(1,)]
+
+    # 重复执行不应有任何变化
+    assert migrate(conn) == SCHEMA_VERSION
+    conn.close()
+
+
+def test_hot_queries_use_indexes():
+    conn = _legacy_db()
+    migrate(conn)
+    queries = [
+        "SELECT * FROM tasks WHERE is_completed = 0 ORDER BY quadrant ASC, order_index ASC, created_at DESC",
+        "SELECT * FROM tasks WHERE quadrant = 1 AND is_completed = 0 ORDER BY order_index ASC, created_at DESC",
+    ]
+    for query in queries:
+        plan = " ".join(row[3] for row in conn.execute("EXPLAIN QUERY PLAN " + query))
+        assert "COVERING INDEX idx_tasks_active" in plan, plan
+        assert "TEMP B-TREE" not in plan, plan
+
+    plan = " ".join(row[3] for row in conn.execute(
+        "EXPLAIN QUERY PLAN SELECT * FROM tasks WHERE is_completed = 1 ORDER BY created_at DESC"
+    ))
+    assert "idx_tasks_completed" in plan and "TEMP B-TREE" not in plan, plan
+    conn.close()
+
+
+def test_legacy_completed_tasks_keep_retention():
+    """升级前完成的任务以迁移时间为完成时间：创建很早、刚完成的任务不会在升级后立即被归档"""
+    conn = _legacy_db()
+    conn.execute("INSERT INTO tasks (title, is_completed, created_at) VALUES ('昨天完成', 1, datetime('now', '-90 days'))")
+    conn.commit()
+    path = conn.execute("PRAGMA database_list").fetchone()[2]
+    conn.close()
+
+    repo = TaskRepository(path)
+    assert repo.archive_expired() == 0
+    age = repo.read(lambda c: c.execute(
+        "SELECT julianday('now') - julianday(completed_at) FROM tasks WHERE title = '昨天完成'").fetchone()[0])
+    assert 0 <= age < 1
+
+
+if __name__ == "__main__":
+    test_migrate_legacy_database()
+    test_legacy_completed_tasks_keep_retention()
+    test_hot_queries_use_indexes()
+    print("✅ 迁移测试通过")
@@ -0,0 +1,213 @@
+#!/usr/bin/env python3
+"""
+测试任务列表的游标分页（键集分页）及两个Web服务器的分页响应头
+"""
+import os
+import sys
+import json
+import random
+import tempfile
+import urllib.request
+from urllib.error import HTTPError
+
+# 添加项目根目录到Python路径
+sys.path.insert(0, os.path.dirname(__file__))
+
+from database.migrations import ensure_schema
+from database.pagination import InvalidCursor, LISTINGS, MAX_PAGE_LIMIT, count_tasks, fetch_page, fetch_page_json, parse_limit
+from database.pool import get_pool
+
+
+def _db(count=137):
+    """生成包含相同排序值和NULL创建时间的数据库"""
+    path = os.path.join(tempfile.mkdtemp(), "tasks.db")
+    ensure_schema(path)
+    rng = random.Random(7)
+    with get_pool(path).writer() as conn:
+        conn.executemany(
+            "INSERT INTO tasks (title, quadrant, is_completed, created_at, order_index) VALUES (?, ?, ?, ?, ?)",
+            [(f"任务{i}", rng.randint(1, 4), rng.random() < 0.5,
+              rng.choice([None, "2024-01-01 00:00:00", "2024-01-02 00:00:00", "2024-01-03 00:00:00"]),
+              rng.randint(0, 2)) for i in range(count)]
+        )
+    return path
+
+
+EXPECTED_ORDER = {
+    "active": "SELECT id FROM tasks WHERE is_completed = 0 ORDER BY quadrant, order_index, created_at DESC, id DESC",
+    "completed": "SELECT id FROM tasks WHERE is_completed = 1 ORDER BY created_at DESC, id DESC",
+}
+
+
+def test_pages_cover_full_ordering():
+    path = _db()
+    with get_pool(path).reader() as conn:
+        for listing, query in EXPECTED_ORDER.items():
+            expected = [row[0] for row in conn.execute(query)]
+            seen = []
+            cursor = None
+            while True:
+                rows, cursor = fetch_page(conn, listing, limit=7, after=cursor)
+                assert len(rows) <= 7
+                seen.extend(row["id"] for row in rows)
+                if cursor is None:
+                    break
+            assert seen == expected, listing
+
+
+def test_sql_json_matches_python_rendering():
+    from server.app import row_to_task
+
+    path = _db()
+    with get_pool(path).writer() as conn:
+        conn.execute("UPDATE tasks SET title = '引号\"与\n换行', description = NULL WHERE id = 1")
+    with get_pool(path).reader() as conn:
+        for listing in EXPECTED_ORDER:
+            for limit in (1, 7, MAX_PAGE_LIMIT):
+                cursor = json_cursor = None
+                while True:
+                    rows, cursor = fetch_page(conn, listing, limit=limit, after=cursor)
+                    body, json_cursor = fetch_page_json(conn, listing, limit=limit, after=json_cursor)
+                    assert json.loads(body) == [row_to_task(row) for row in rows]
+                    assert json_cursor == cursor
+                    if cursor is None:
+                        break
+
+
+def test_invalid_arguments():
+    assert parse_limit(None) == 200
+    assert parse_limit("5000") == MAX_PAGE_LIMIT
+    for bad in ("0", "abc"):
+        try:
+            parse_limit(bad)
+            assert False, bad
+        except ValueError:
+            pass
+
+    path = _db(20)
+    with get_pool(path).reader() as conn:
+        _, cursor = fetch_page(conn, "completed", limit=2)
+        for bad in ("not-a-cursor", cursor[:-3]):
+            try:
+                fetch_page(conn, "completed", after=bad)
+                assert False, bad
+            except InvalidCursor:
+                pass
+        # 游标不能跨列表使用
+        try:
+            fetch_page(conn, "active", after=cursor)
+            assert False
+        except InvalidCursor:
+            pass
+
+
+def test_counts_follow_writes():
+    """task_counts 在各种写入之后都与 COUNT(*) 一致"""
+    from database.archive import archive_all
+    from database.bulk_import import import_tasks, parse_ndjson
+    from database.repository import TaskRepository
+
+    repo = TaskRepository(_db(20))
+
+    def check():
+        for listing, (table, where, _) in LISTINGS.items():
+            expected = repo.read(lambda conn: conn.execute(f"SELECT COUNT(*) FROM {table} WHERE {where}").fetchone()[0])
+            assert repo.read(count_tasks, listing) == expected, listing
+
+    check()
+    task = repo.write(repo.create, "新任务")
+    repo.write(repo.set_completed, task["id"], True)
+    repo.write(repo.set_completed, task["id"], True)  # 状态没有变化
+    check()
+    repo.write(repo.set_completed, task["id"], False)
+    repo.write(repo.delete, task["id"])
+    check()
+    with get_pool(repo.db_path).writer() as conn:
+        conn.execute("UPDATE tasks SET is_completed = 1 WHERE id % 3 = 0")
+    repo.write(archive_all)
+    check()
+    for small_limit in (0, 1000):
+        lines = [json.dumps({"title": f"导入{i}", "isCompleted": i % 2 == 0}) for i in range(5)]
+        import_tasks(repo.db_path, parse_ndjson(lines), small_limit=small_limit)
+        check()
+    repo.write(repo.clear_completed)
+    check()
+
+
+def _follow(get, path):
+    """沿 X-Next-Cursor 读完所有页，返回 (任务id列表, 总数列表, 请求次数)"""
+    ids, totals, url = [], [], path + "?limit=10"
+    requests = 0
+    while url:
+        status, headers, body = get(url)
+        assert status == 200
+        requests += 1
+        ids.extend(task["id"] for task in body)
+        totals.append(int(headers["X-Total-Count"]))
+        url = None
+        if headers.get("X-Next-Cursor"):
+            assert headers["Link"].endswith('rel="next"')
+            url = headers["Link"][1:headers["Link"].index(">")]
+    return ids, totals, requests
+
+
+def test_fastapi_endpoints_paginate():
+    from fastapi.testclient import TestClient
+    from server import app as server_app
+
+    path = _db()
+    original, server_app.DB_PATH = server_app.DB_PATH, path
+    client = TestClient(server_app.app)
+
+    def get(url):
+        response = client.get(url)
+        return response.status_code, response.headers, response.json()
+
+    with get_pool(path).reader() as conn:
+        expected = [row[0] for row in conn.execute(EXPECTED_ORDER["completed"])]
+    try:
+        ids, totals, requests = _follow(get, "/api/tasks/completed")
+        assert ids == expected
+        assert set(totals) == {len(expected)}
+        assert requests == len(expected) // 10 + 1
+        assert client.get("/api/tasks?after=broken").status_code == 400
+    finally:
+        server_app.DB_PATH = original
+
+
+def test_fallback_server_paginates():
+    from server import fallback
+
+    path = _db()
+    original, fallback.DB_PATH = fallback.DB_PATH, path
+    server = fallback.start_in_thread()
+    base = f"http://127.0.0.1:{server.port}"
+
+    def get(url):
+        with urllib.request.urlopen(base + url) as response:
+            return response.status, response.headers, json.loads(response.read())
+
+    try:
+        with get_pool(path).reader() as conn:
+            expected = [row[0] for row in conn.execute(EXPECTED_ORDER["active"])]
+        ids, totals, _ = _follow(get, "/api/tasks")
+        assert ids == expected
+        assert set(totals) == {len(expected)}
+        try:
+            get("/api/tasks/completed?limit=-1")
+            assert False
+        except HTTPError as e:
+            assert e.code == 400
+    finally:
+        server.stop()
+        fallback.DB_PATH = original
+
+
+if __name__ == "__main__":
+    test_pages_cover_full_ordering()
+    test_sql_json_matches_python_rendering()
+    test_invalid_arguments()
+    test_counts_follow_writes()
+    test_fastapi_endpoints_paginate()
+    test_fallback_server_paginates()
+    print("✅ 分页测试通过")
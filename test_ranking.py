@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+"""
+测试小数排序值：拖放只改写一行、间隔过小时重排、模型和REST接口
+"""
+import os
+import sys
+import tempfile
+
+# 添加项目根目录到Python路径
+sys.path.insert(0, os.path.dirname(__file__))
+
+from PySide6.QtCore import QCoreApplication
+
+from database.migrations import ensure_schema
+from database.pool import get_pool
+from database.ranking import RANK_STEP, move_between, rebalance
+from models.task_model_optimized import TaskModel
+
+app = QCoreApplication.instance() or QCoreApplication(sys.argv)
+
+ORDER = "SELECT id FROM tasks WHERE quadrant = ? AND is_completed = 0 ORDER BY order_index, created_at DESC, id DESC"
+
+
+def _db(count=5, quadrant=1):
+    path = os.path.join(tempfile.mkdtemp(), "tasks.db")
+    ensure_schema(path)
+    with get_pool(path).writer() as conn:
+        conn.executemany(
+            "INSERT INTO tasks (title, quadrant, order_index) VALUES (?, ?, ?)",
+            [(f"任务{i}", quadrant, i * RANK_STEP) for i in range(1, count + 1)]
+        )
+    return get_pool(path)
+
+
+def _order(pool, quadrant=1):
+    with pool.reader() as conn:
+        return [row[0] for row in conn.execute(ORDER, (quadrant,))]
+
+
+def test_move_between_writes_one_row():
+    pool = _db()
+    statements = []
+    with pool.writer() as conn:
+        conn.set_trace_callback(statements.append)
+        try:
+            quadrant, rank, crowded, rebalanced = move_between(conn, 5, 1, 2)
+        finally:
+            conn.set_trace_callback(None)
+    assert (quadrant, rank, crowded, rebalanced) == (1, 1.5 * RANK_STEP, False, False)
+    # 修改计数器的触发器执行时，跟踪回调会再报告一次外层语句，去掉相邻的重复；
+    # 全文索引读写影子表的内部语句以 "-- " 开头，先去掉
+    statements = [s for s in statements if not s.startswith("-- ")]
+    statements = [s for i, s in enumerate(statements) if i == 0 or statements[i - 1] != s]
+    assert sum(statement.startswith("UPDATE") for statement in statements) == 1
+    assert _order(pool) == [1, 5, 2, 3, 4]
+
+    with pool.writer() as conn:
+        move_between(conn, 3, None, None)
+        move_between(conn, 1, 4, None)
+    assert _order(pool) == [3, 5, 2, 4, 1]
+
+
+def test_crowded_gap_and_ties_rebalance():
+    pool = _db()
+    # 反复插入到同一个间隔中，间隔不断减半，最终要求重排
+    crowded = False
+    moves = 0
+    with pool.writer() as conn:
+        neighbor, moving = 5, 4
+        move_between(conn, neighbor, 1, 2)
+        while not crowded and moves < 100:
+            _, _, crowded, _ = move_between(conn, moving, 1, neighbor)
+            neighbor, moving = moving, neighbor
+            moves += 1
+    order = _order(pool)
+    with pool.writer() as conn:
+        rebalance(conn, 1)
+    assert moves < 30
+    assert _order(pool) == order
+    with pool.reader() as conn:
+        ranks = [row[0] for row in conn.execute("SELECT order_index FROM tasks ORDER BY order_index")]
+    assert ranks == [RANK_STEP * i for i in range(1, 6)]
+
+    # 排序值相同的邻居无法取中点，先同步重排
+    with pool.writer() as conn:
+        conn.execute("UPDATE tasks SET order_index = 0")
+    order = _order(pool)
+    with pool.writer() as conn:
+        *_, rebalanced = move_between(conn, order[0], order[2], order[3])
+    assert rebalanced
+    assert _order(pool) == [order[1], order[2], order[0], order[3], order[4]]
+
+
+def _quadrant_ids(model, quadrant):
+    quadrant_model = model.quadrantModel(quadrant)
+    return [quadrant_model.data(quadrant_model.index(row, 0), TaskModel.IdRole) for row in range(quadrant_model.rowCount())]
+
+
+def test_model_move_between():
+    model = TaskModel(db_path=os.path.join(tempfile.mkdtemp(), "tasks.db"))
+    for i in range(4):
+        model.addTask(f"任务{i}", "", 1)
+    model.addTask("其他象限", "", 2)
+    assert _quadrant_ids(model, 1) == [4, 3, 2, 1]
+
+    assert model.moveTaskBetween(4, 2, 1)
+    assert _quadrant_ids(model, 1) == [3, 2, 4, 1]
+
+    # 拖到其他象限的任务之后，同时移动象限
+    assert model.moveTaskBetween(2, 5, -1)
+    assert _quadrant_ids(model, 1) == [3, 4, 1]
+    assert _quadrant_ids(model, 2) == [5, 2]
+    assert not model.moveTaskBetween(3, 99, -1)
+
+    # 延迟重排后排序值等距，顺序不变
+    model._rebalance(1)
+    assert _quadrant_ids(model, 1) == [3, 4, 1]
+    assert [model.tasks.get(task_id).order_index for task_id in (3, 4, 1)] == [RANK_STEP, 2 * RANK_STEP, 3 * RANK_STEP]
+
+
+def test_position_endpoint():
+    from fastapi.testclient import TestClient
+    from server import app as server_app
+
+    pool = _db()
+    original, server_app.DB_PATH = server_app.DB_PATH, pool.db_path
+    try:
+        client = TestClient(server_app.app)
+        response = client.patch("/api/tasks/1/position", json={"beforeId": 4})
+        assert response.status_code == 200
+        assert response.json()["orderIndex"] == 4.5 * RANK_STEP
+        assert _order(pool) == [2, 3, 4, 1, 5]
+        assert client.patch("/api/tasks/1/position", json={"beforeId": 99}).status_code == 400
+        assert client.patch("/api/tasks/99/position", json={}).status_code == 404
+    finally:
+        server_app.DB_PATH = original
+
+
+if __name__ == "__main__":
+    test_move_between_writes_one_row()
+    test_crowded_gap_and_ties_rebalance()
+    test_model_move_between()
+    test_position_endpoint()
+    print("✅ 排序值测试通过")
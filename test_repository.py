@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""
+测试桌面端和两个Web服务器共用的任务仓库（database.repository）
+"""
+import os
+import sys
+import json
+import tempfile
+
+# 添加项目根目录到Python路径
+sys.path.insert(0, os.path.dirname(__file__))
+
+from database.repository import TaskRepository, get_repository, row_to_task
+from database.versioning import etag
+
+
+def _repo():
+    return TaskRepository(os.path.join(tempfile.mkdtemp(), "tasks.db"))
+
+
+def test_writes_return_rows():
+    repo = _repo()
+    first = repo.write(repo.create, "任务一", "描述", 2)
+    second = repo.write(repo.create, "任务二", "", 2)
+    # 新任务排在象限最前面
+    assert second["order_index"] < first["order_index"]
+    assert row_to_task(first) == {
+        "id": first["id"], "title": "任务一", "description": "描述", "quadrant": 2,
+        "isCompleted": False, "createdAt": first["created_at"], "orderIndex": first["order_index"],
+    }
+
+    assert repo.write(repo.update, first["id"], None, "新描述")["title"] == "任务一"
+    assert repo.write(repo.move, first["id"], 3)["quadrant"] == 3
+    assert repo.write(repo.set_completed, first["id"], True)["is_completed"] == 1
+    assert repo.write(repo.move, 999, 1) is None
+    assert repo.write(repo.set_completed, 999, True) is None
+
+    placed, row = repo.write(repo.position, second["id"], None, None)
+    assert placed is not None and row["id"] == second["id"]
+    assert repo.write(repo.position, 999, None, None) == (None, None)
+
+    assert [row["id"] for row in repo.read(repo.active_rows)] == [second["id"]]
+    repo.write(repo.clear_completed)
+    assert repo.read(repo.completed_rows) == []
+    repo.write(repo.delete, second["id"])
+    assert repo.read(repo.get, second["id"]) is None
+
+
+def test_page_cache_follows_version():
+    repo = _repo()
+    for i in range(5):
+        repo.write(repo.create, f"任务{i}")
+
+    version, (body, cursor, total) = repo.read(repo.page, "active", 2)
+    assert len(json.loads(body)) == 2 and cursor and total == 5
+    assert repo.read(repo.page, "active", 2) == (version, (body, cursor, total))
+    assert repo.cache_stats()["hits"] == 1
+
+    # 直接写数据库（例如另一个进程）同样会让缓存失效
+    with repo.pool.writer() as conn:
+        conn.execute("UPDATE tasks SET title = '改名' WHERE id = 5")
+    new_version, (new_body, _, _) = repo.read(repo.page, "active", 2)
+    assert new_version != version and "改名" in new_body.decode()
+    assert repo.cache_stats()["misses"] == 2
+
+    # 客户端缓存仍然有效时不返回页面
+    assert repo.read(repo.page, "active", 2, None, etag(new_version)) == (new_version, None)
+
+
+def test_shared_between_front_ends():
+    from server import app as server_app
+    from server import fallback
+
+    path = os.path.join(tempfile.mkdtemp(), "tasks.db")
+    originals = server_app.DB_PATH, fallback.DB_PATH
+    server_app.DB_PATH = fallback.DB_PATH = path
+    try:
+        assert server_app.get_repo() is fallback.get_repo() is get_repository(path)
+    finally:
+        server_app.DB_PATH, fallback.DB_PATH = originals
+
+
+if __name__ == "__main__":
+    test_writes_return_rows()
+    test_page_cache_follows_version()
+    test_shared_between_front_ends()
+    print("✅ 任务仓库测试通过")
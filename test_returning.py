@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+"""
+测试写操作都是单条 INSERT/UPDATE ... RETURNING 语句，不再写后回读
+"""
+import os
+import sys
+import tempfile
+import json
+import urllib.request
+
+# 添加项目根目录到Python路径
+sys.path.insert(0, os.path.dirname(__file__))
+
+from PySide6.QtCore import QCoreApplication
+
+from database.migrations import ensure_schema
+from database.pool import get_pool
+from models.task_model_optimized import TaskModel
+
+app = QCoreApplication.instance() or QCoreApplication(sys.argv)
+
+
+def _db():
+    path = os.path.join(tempfile.mkdtemp(), "tasks.db")
+    ensure_schema(path)
+    return path
+
+
+def _trace_writer(path):
+    """记录写连接上执行的语句（去掉触发器造成的相邻重复、事务控制语句，
+    以及全文索引在内部读写影子表时以 "-- " 开头的语句）"""
+    statements = []
+
+    def trace(statement):
+        if statement.startswith("-- ") or (statements and statements[-1] == statement):
+            return
+        statements.append(statement)
+
+    with get_pool(path).writer() as conn:
+        conn.set_trace_callback(trace)
+
+    def executed():
+        result = [s for s in statements if not s.startswith(("BEGIN", "COMMIT", "ROLLBACK", "SAVEPOINT", "RELEASE"))]
+        statements.clear()
+        return result
+
+    return executed
+
+
+def test_fastapi_writes_are_single_statements():
+    from fastapi.testclient import TestClient
+    from server import app as server_app
+
+    path = _db()
+    original, server_app.DB_PATH = server_app.DB_PATH, path
+    executed = _trace_writer(path)
+    try:
+        client = TestClient(server_app.app)
+        task = client.post("/api/tasks", json={"title": "任务", "quadrant": 2}).json()
+        assert task["orderIndex"] == -1024
+        requests = [
+            ("patch", f"/api/tasks/{task['id']}", {"title": "改名"}),
+            ("patch", f"/api/tasks/{task['id']}/quadrant", {"quadrant": 3}),
+            ("patch", f"/api/tasks/{task['id']}/quadrant", {"quadrant": 3}),
+            ("patch", f"/api/tasks/{task['id']}/complete", {"completed": True}),
+        ]
+        assert len(executed()) == 1
+        for method, url, body in requests:
+            response = getattr(client, method)(url, json=body)
+            assert response.status_code == 200
+            statements = executed()
+            assert len(statements) == 1 and "RETURNING" in statements[0], statements
+        moved = client.get("/api/tasks/completed").json()[0]
+        assert (moved["title"], moved["quadrant"], moved["orderIndex"]) == ("改名", 3, -1024)
+
+        # 404 来自没有返回行，而不是额外的存在性查询
+        for url, body in (("/api/tasks/99", {"title": "x"}), ("/api/tasks/99/quadrant", {"quadrant": 1}),
+                          ("/api/tasks/99/complete", {})):
+            assert client.patch(url, json=body).status_code == 404
+            assert len(executed()) == 1
+    finally:
+        server_app.DB_PATH = original
+
+
+def test_fallback_writes_are_single_statements():
+    from server import fallback
+
+    path = _db()
+    original, fallback.DB_PATH = fallback.DB_PATH, path
+    executed = _trace_writer(path)
+    server = fallback.start_in_thread()
+    base = f"http://127.0.0.1:{server.port}"
+
+    def send(method, url, body):
+        request = urllib.request.Request(base + url, data=json.dumps(body).encode(), method=method,
+                                         headers={"Content-Type": "application/json"})
+        with urllib.request.urlopen(request) as response:
+            return json.loads(response.read())
+
+    try:
+        task = send("POST", "/api/tasks", {"title": "任务"})
+        assert len(executed()) == 1
+        assert send("PATCH", f"/api/tasks/{task['id']}/quadrant", {"quadrant": 1})["quadrant"] == 1
+        assert send("PATCH", f"/api/tasks/{task['id']}", {"description": "描述"})["description"] == "描述"
+        assert send("PATCH", f"/api/tasks/{task['id']}/complete", {"completed": True})["isCompleted"] is True
+        assert len(executed()) == 3
+    finally:
+        server.stop()
+        fallback.DB_PATH = original
+
+
+def test_model_writes_are_single_statements():
+    path = _db()
+    model = TaskModel(db_path=path)
+    executed = _trace_writer(path)
+    model.addTask("任务", "", 1)
+    model.addTask("其他", "", 1)
+    model.moveTaskToQuadrant(1, 2)
+    model.moveTaskToQuadrant(1, 2)
+    model.setTaskCompleted(2, True)
+    model.setTaskCompleted(2, False)
+    model.setTaskCompleted(99, True)
+    statements = executed()
+    assert len(statements) == 6 and all("RETURNING" in s for s in statements), statements
+
+    task = model.tasks.get(1)
+    assert (task.quadrant, task.order_index) == (2, -1024)
+    # 取消完成后的任务从返回的行直接插回原位置
+    assert model.tasks.get(2).title == "其他"
+    assert model.completedModel().rowCount() == 0
+
+
+if __name__ == "__main__":
+    test_fastapi_writes_are_single_statements()
+    test_fallback_writes_are_single_statements()
+    test_model_writes_are_single_statements()
+    print("✅ RETURNING 写操作测试通过")
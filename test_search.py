@@ -0,0 +1,164 @@
+#!/usr/bin/env python3
+"""
+测试任务全文搜索：触发器同步索引、相关度排序、高亮和摘要、短词的片段索引，
+以及两个Web服务器的 /api/tasks/search 和桌面端的 searchTasks
+"""
+import os
+import sys
+import json
+import tempfile
+import urllib.parse
+import urllib.request
+
+# 添加项目根目录到Python路径
+sys.path.insert(0, os.path.dirname(__file__))
+
+from database.repository import TaskRepository
+
+
+def _repo():
+    return TaskRepository(os.path.join(tempfile.mkdtemp(), "tasks.db"))
+
+
+def _ids(results):
+    return [result["id"] for result in results]
+
+
+def test_index_follows_writes():
+    repo = _repo()
+    report = repo.write(repo.create, "写季度报告", "整理销售数据")
+    repo.write(repo.create, "买菜", "")
+    assert _ids(repo.read(repo.search, "季度报")) == [report["id"]]
+
+    # 修改标题后旧词查不到、新词能查到；移动和完成不影响索引
+    repo.write(repo.update, report["id"], "写年度总结", None)
+    assert repo.read(repo.search, "季度报") == []
+    repo.write(repo.move, report["id"], 1)
+    repo.write(repo.set_completed, report["id"], True)
+    assert _ids(repo.read(repo.search, "年度总结")) == [report["id"]]
+    assert _ids(repo.read(repo.search, "销售数据")) == [report["id"]]
+
+    repo.write(repo.delete, report["id"])
+    assert repo.read(repo.search, "年度总结") == []
+    # 索引与 tasks 表不一致时 integrity-check 抛出异常
+    with repo.pool.writer() as conn:
+        conn.execute("INSERT INTO tasks_fts (tasks_fts) VALUES ('integrity-check')")
+
+
+def test_ranking_and_highlight():
+    repo = _repo()
+    in_description = repo.write(repo.create, "周会", "准备 release notes")
+    in_title = repo.write(repo.create, "Release 1.2 <beta>", "打包")
+    results = repo.read(repo.search, "release")
+    # 标题匹配排在描述匹配之前；大小写不敏感
+    assert _ids(results) == [in_title["id"], in_description["id"]]
+    assert results[0]["titleHighlight"] == "<mark>Release</mark> 1.2 &lt;beta&gt;"
+    assert results[1]["snippet"] == "准备 <mark>release</mark> notes"
+    assert results[0]["quadrant"] == 4 and results[0]["isCompleted"] is False
+
+    # 多个词要求全部出现；FTS5 语法字符按普通文本处理
+    assert _ids(repo.read(repo.search, "release 打包")) == [in_title["id"]]
+    assert repo.read(repo.search, 'release "NOT') == []
+    assert repo.read(repo.search, "   ") == []
+
+
+def test_short_terms():
+    repo = _repo()
+    first = repo.write(repo.create, "写代码", "修复 a_b 的问题")
+    second = repo.write(repo.create, "代码评审", "")
+    # 少于3个字符的词查片段索引，按创建先后倒序
+    assert _ids(repo.read(repo.search, "代码")) == [second["id"], first["id"]]
+    assert repo.read(repo.search, "代码")[0]["titleHighlight"] == "<mark>代码</mark>评审"
+    # 一个字符的词按前缀查，包括文本的最后一个字符；ASCII 不区分大小写
+    assert _ids(repo.read(repo.search, "码")) == [second["id"], first["id"]]
+    assert _ids(repo.read(repo.search, "审")) == [second["id"]]
+    assert _ids(repo.read(repo.search, "B 的")) == [first["id"]]
+    # 候选仍用 LIKE 确认：分词时去掉了标点的词不会多出结果；LIKE 的通配符被转义
+    assert _ids(repo.read(repo.search, "a_")) == [first["id"]]
+    assert repo.read(repo.search, "a%") == []
+    assert repo.read(repo.search, "%") == []
+
+    # 长词和短词组合：索引筛选后再过滤短词
+    results = repo.read(repo.search, "代码评 审")
+    assert _ids(results) == [second["id"]]
+    assert results[0]["titleHighlight"] == "<mark>代码评</mark><mark>审</mark>"
+
+    # 片段索引随修改和删除同步；不走索引的纯标点短词扫描 tasks 表
+    repo.write(repo.update, first["id"], "写文档", "a-b")
+    assert _ids(repo.read(repo.search, "代码")) == [second["id"]]
+    assert _ids(repo.read(repo.search, "-")) == [first["id"]]
+    repo.write(repo.delete, second["id"])
+    assert repo.read(repo.search, "代码") == []
+    with repo.pool.writer() as conn:
+        conn.execute("INSERT INTO tasks_fts_short (tasks_fts_short) VALUES ('integrity-check')")
+        # 短词查询只读取候选任务，不扫描 tasks 表
+        plan = " ".join(row[3] for row in conn.execute(
+            "EXPLAIN QUERY PLAN SELECT t.* FROM tasks_fts_short JOIN tasks t ON t.id = tasks_fts_short.rowid "
+            "WHERE tasks_fts_short MATCH ? ORDER BY tasks_fts_short.rowid DESC LIMIT 20", ('"文档"',)
+        ))
+        assert "SEARCH t USING INTEGER PRIMARY KEY" in plan and "TEMP B-TREE" not in plan, plan
+
+    # 跨越拆分块（1024个字符）边界的片段不丢失："长文本 " 之后第1020个字符是第1024个字符
+    long_text = repo.write(repo.create, "长文本", "x" * 1019 + "尾巴" + "y" * 2000 + "末")
+    assert _ids(repo.read(repo.search, "尾巴")) == [long_text["id"]]
+    assert _ids(repo.read(repo.search, "末")) == [long_text["id"]]
+
+
+def _seed(path):
+    repo = TaskRepository(path)
+    repo.write(repo.create, "全文搜索", "支持中文")
+    return repo
+
+
+def test_endpoints():
+    from fastapi.testclient import TestClient
+    from server import app as server_app
+    from server import fallback
+
+    path = os.path.join(tempfile.mkdtemp(), "tasks.db")
+    _seed(path)
+    originals = server_app.DB_PATH, fallback.DB_PATH
+    server_app.DB_PATH = fallback.DB_PATH = path
+    server = fallback.start_in_thread()
+    try:
+        client = TestClient(server_app.app)
+        body = client.get("/api/tasks/search", params={"q": "中文"}).json()
+        assert [(r["title"], r["snippet"]) for r in body] == [("全文搜索", "支持<mark>中文</mark>")]
+        assert client.get("/api/tasks/search").status_code == 400
+        assert client.get("/api/tasks/search", params={"q": "x", "limit": 0}).status_code == 400
+
+        base = f"http://127.0.0.1:{server.port}/api/tasks/search?"
+        with urllib.request.urlopen(base + urllib.parse.urlencode({"q": "全文搜"})) as response:
+            assert json.loads(response.read()) == client.get("/api/tasks/search", params={"q": "全文搜"}).json()
+        try:
+            urllib.request.urlopen(base + "q=")
+            assert False
+        except urllib.error.HTTPError as e:
+            assert e.code == 400
+    finally:
+        server.stop()
+        server_app.DB_PATH, fallback.DB_PATH = originals
+
+
+def test_controller_slot():
+    from PySide6.QtCore import QCoreApplication
+    from controllers.task_controller_optimized import TaskController
+    from models.task_model_optimized import TaskModel
+
+    app = QCoreApplication.instance() or QCoreApplication(sys.argv)
+    model = TaskModel(db_path=os.path.join(tempfile.mkdtemp(), "tasks.db"))
+    controller = TaskController(model)
+    model.addTask("整理桌面", "清理文件", 2)
+    results = controller.searchTasks("桌面")
+    assert len(results) == 1 and results[0]["quadrant"] == 2
+    assert results[0]["titleHighlight"] == "整理<b>桌面</b>"
+    assert controller.searchTasks("") == []
+
+
+if __name__ == "__main__":
+    test_index_follows_writes()
+    test_ranking_and_highlight()
+    test_short_terms()
+    test_endpoints()
+    test_controller_slot()
+    print("✅ 全文搜索测试通过")
@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""
+测试任务模型的增量更新（取消完成、刷新同步、象限模型不再重置整个模型）
+"""
+import os
+import sys
+import sqlite3
+import tempfile
+
+# 添加项目根目录到Python路径
+sys.path.insert(0, os.path.dirname(__file__))
+
+from PySide6.QtCore import QCoreApplication
+
+from models.task_model_optimized import TaskModel
+
+app = QCoreApplication.instance() or QCoreApplication(sys.argv)
+
+
+def _model():
+    model = TaskModel(db_path=os.path.join(tempfile.mkdtemp(), "tasks.db"))
+    events = []
+    model.modelReset.connect(lambda: events.append(("reset",)))
+    model.rowsInserted.connect(lambda parent, first, last: events.append(("insert", first)))
+    model.rowsRemoved.connect(lambda parent, first, last: events.append(("remove", first)))
+    return model, events
+
+
+def _ids(model):
+    return [model.data(model.index(row, 0), TaskModel.IdRole) for row in range(model.rowCount())]
+
+
+def test_uncomplete_inserts_single_row():
+    model, events = _model()
+    for i in range(4):
+        model.addTask(f"任务{i}", "", i + 1)
+    model.setTaskCompleted(2, True)
+    assert _ids(model) == [4, 3, 1]
+
+    events.clear()
+    model.setTaskCompleted(2, False)
+    assert _ids(model) == [4, 3, 2, 1]
+    assert events == [("insert", 2)]
+
+
+def test_refresh_applies_external_changes_incrementally():
+    model, events = _model()
+    for i in range(3):
+        model.addTask(f"任务{i}", "", 1)
+
+    # 模拟其他进程（如Web服务器）直接修改数据库
+    conn = sqlite3.connect(model.db_path)
+    conn.execute("UPDATE tasks SET title = '改过的标题' WHERE id = 1")
+    conn.execute("UPDATE tasks SET is_completed = 1 WHERE id = 2")
+    conn.execute("INSERT INTO tasks (title, quadrant) VALUES ('外部任务', 3)")
+    conn.commit()
+    conn.close()
+
+    changed = []
+    model.dataChanged.connect(lambda first, last, roles: changed.append((first.row(), list(roles))))
+    events.clear()
+    model.refreshTasks()
+
+    assert ("reset",) not in events
+    assert _ids(model) == [4, 3, 1]
+    assert changed == [(2, [TaskModel.TitleRole])]
+    assert model.data(model.index(2, 0), TaskModel.TitleRole) == "改过的标题"
+
+
+def _quadrant_ids(model, quadrant):
+    quadrant_model = model.quadrantModel(quadrant)
+    return [quadrant_model.data(quadrant_model.index(row, 0), TaskModel.IdRole) for row in range(quadrant_model.rowCount())]
+
+
+def test_quadrant_models_follow_edits():
+    model, _ = _model()
+    for i in range(4):
+        model.addTask(f"任务{i}", "", 1)
+    assert _quadrant_ids(model, 1) == [4, 3, 2, 1]
+
+    moves = []
+    first = model.quadrantModel(1)
+    first.rowsMoved.connect(lambda parent, start, end, dest, row: moves.append((start, row)))
+    model.updateTaskOrder(4, 5)
+    assert _quadrant_ids(model, 1) == [3, 2, 1, 4]
+    assert moves == [(0, 4)]
+
+    model.moveTaskToQuadrant(2, 3)
+    model.setTaskCompleted(3, True)
+    assert _quadrant_ids(model, 1) == [1, 4]
+    assert _quadrant_ids(model, 3) == [2]
+
+    model.setTaskCompleted(3, False)
+    model.deleteTask(1)
+    assert _quadrant_ids(model, 1) == [3, 4]
+
+
+if __name__ == "__main__":
+    test_uncomplete_inserts_single_row()
+    test_refresh_applies_external_changes_incrementally()
+    test_quadrant_models_follow_edits()
+    print("✅ 增量更新测试通过")
@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+"""
+测试活动任务列式行存储（id -> 行号索引）的脚本
+"""
+import os
+import sys
+import random
+
+# 添加项目根目录到Python路径
+sys.path.insert(0, os.path.dirname(__file__))
+
+from models.task_store import TaskStore
+
+
+def test_rows_follow_descending_ids():
+    store = TaskStore()
+    assert store.insert(5) == 0
+    assert store.insert(9) == 0
+    assert store.insert(7) == 1
+    assert [task.id for task in store] == [9, 7, 5]
+    assert [store.ids[store.slot_at(row)] for row in range(len(store))] == [9, 7, 5]
+    assert store.row_of(5) == 2
+    assert store.remove(7) == 1
+    assert store.row_of(5) == 1
+    assert store.row_of(7) is None
+
+
+def test_random_operations_match_sorted_list():
+    rng = random.Random(42)
+    store = TaskStore()
+    expected = []
+    for _ in range(3000):
+        if expected and rng.random() < 0.4:
+            task_id = rng.choice(expected)
+            assert store.remove(task_id) == expected.index(task_id)
+            expected.remove(task_id)
+        else:
+            task_id = rng.randint(1, 5000)
+            if task_id in expected:
+                continue
+            row = store.insert_row(task_id)
+            assert store.insert(task_id) == row
+            expected.append(task_id)
+            expected.sort(reverse=True)
+            assert expected.index(task_id) == row
+    assert len(store) == len(expected)
+    for row, task_id in enumerate(expected):
+        assert store.ids[store.slot_at(row)] == task_id
+        assert store.row_of(task_id) == row
+
+
+def test_reset_replaces_content():
+    store = TaskStore()
+    store.insert(1)
+    store.reset([(3, "c"), (10, "b"), (2048, "a")])
+    assert [store.at(row).id for row in range(3)] == [2048, 10, 3]
+    assert 1 not in store
+    assert store.get(10).title == "b"
+
+
+def test_columns_reuse_free_slots():
+    store = TaskStore()
+    store.insert(1, "一", "", 2, False, "2024-01-01 00:00:00", 0)
+    store.insert(2, "二", "", 3, False, "2024-01-01 00:00:00", 0)
+    store.remove(1)
+    store.insert(3, "三", "", 4, False, "2024-01-01 00:00:00", 1.5)
+    assert len(store.ids) == 2
+    assert store.created_ats[0] is store.created_ats[1]
+    store.update(3, title="三三", quadrant=1)
+    task = store.get(3)
+    assert (task.title, task.quadrant, task.order_index) == ("三三", 1, 1.5)
+    assert [task.id for task in store] == [3, 2]
+
+
+if __name__ == "__main__":
+    test_rows_follow_descending_ids()
+    test_random_operations_match_sorted_list()
+    test_reset_replaces_content()
+    test_columns_reuse_free_slots()
+    print("✅ 行存储测试通过")
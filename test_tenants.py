@@ -0,0 +1,197 @@
+#!/usr/bin/env python3
+"""
+测试多租户：租户注册表的 LRU 淘汰、租约和空闲关闭，租户解析，
+以及两个Web服务器按请求头和 /t/<租户> 前缀路由到各自的数据库、列表的ETag按租户区分
+"""
+import os
+import sys
+import json
+import time
+import tempfile
+import http.client
+
+# 添加项目根目录到Python路径
+sys.path.insert(0, os.path.dirname(__file__))
+
+from database.pool import get_pool
+from database.tenants import InvalidTenant, TenantRegistry
+from server.tenancy import resolve_tenant
+
+
+def _wait_closed(registry):
+    deadline = time.monotonic() + 5
+    while registry.stats()["closing"] and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert registry.stats()["closing"] == 0
+
+
+def test_resolve_tenant():
+    assert resolve_tenant("/api/tasks", None) == (None, "/api/tasks")
+    assert resolve_tenant("/api/tasks", "alice") == ("alice", "/api/tasks")
+    assert resolve_tenant("/t/alice/api/tasks", None) == ("alice", "/api/tasks")
+    assert resolve_tenant("/t/alice", "alice") == ("alice", "/")
+    for path, header in [("/t/../api/tasks", None), ("/api/tasks", "a/b"), ("/t/alice/api", "bob"), ("/t//api", None)]:
+        try:
+            resolve_tenant(path, header)
+            assert False, (path, header)
+        except InvalidTenant:
+            pass
+
+
+def test_lru_eviction():
+    registry = TenantRegistry(tempfile.mkdtemp(), capacity=2, idle_timeout=3600, readers=1)
+    try:
+        alice = registry.acquire("alice")
+        alice.write(alice.create, "alice 的任务")
+        registry.release("alice")
+        for tenant in ("bob", "carol"):
+            registry.acquire(tenant)
+            registry.release(tenant)
+        # 容量为2：最久未使用的 alice 被关闭，连接池随之关闭
+        _wait_closed(registry)
+        stats = registry.stats()
+        assert (stats["open"], stats["opens"], stats["evictions"]) == (2, 3, 1)
+        assert alice.pool._closed
+
+        # 重新打开后数据还在，换成了新的连接池
+        reopened = registry.acquire("alice")
+        assert reopened.pool is get_pool(registry.path("alice")) and not reopened.pool._closed
+        assert [row["title"] for row in reopened.read(reopened.active_rows)] == ["alice 的任务"]
+        registry.release("alice")
+        _wait_closed(registry)
+        assert registry.stats()["open"] == 2
+    finally:
+        registry.close()
+
+
+def test_leased_tenants_are_kept():
+    registry = TenantRegistry(tempfile.mkdtemp(), capacity=1, idle_timeout=3600, readers=1)
+    try:
+        alice = registry.acquire("alice")
+        bob = registry.acquire("bob")
+        # 都有租约：暂时超出容量
+        assert registry.stats()["open"] == 2 and registry.stats()["leased"] == 2
+        assert registry.acquire("alice") is alice and registry.stats()["hits"] == 1
+        registry.release("alice")
+        assert registry.stats()["open"] == 2
+        registry.release("alice")
+        # alice 的租约全部归还后才被关闭，bob 仍在使用
+        _wait_closed(registry)
+        assert registry.stats()["open"] == 1 and not bob.pool._closed
+        registry.release("bob")
+    finally:
+        registry.close()
+
+
+def test_idle_tenants_are_closed():
+    registry = TenantRegistry(tempfile.mkdtemp(), capacity=8, idle_timeout=0.05, readers=1)
+    try:
+        repo = registry.acquire("alice")
+        registry.release("alice")
+        assert registry.sweep() == 0
+        time.sleep(0.1)
+        assert registry.sweep() == 1
+        _wait_closed(registry)
+        assert repo.pool._closed and registry.stats()["open"] == 0
+    finally:
+        registry.close()
+
+
+def _request(port, method, path, body=None, headers=None):
+    conn = http.client.HTTPConnection("127.0.0.1", port, timeout=10)
+    try:
+        conn.request(method, path, body=json.dumps(body) if body is not None else None, headers=headers or {})
+        response = conn.getresponse()
+        return response.status, dict(response.getheaders()), response.read()
+    finally:
+        conn.close()
+
+
+def test_fallback_routes_by_tenant():
+    from database.tenants import get_tenant_registry
+    from server import fallback
+
+    root = tempfile.mkdtemp()
+    originals = fallback.DB_PATH, fallback.TENANT_DIR
+    fallback.DB_PATH, fallback.TENANT_DIR = os.path.join(root, "tasks.db"), os.path.join(root, "tenants")
+    server = fallback.start_in_thread()
+    try:
+        port = server.port
+        assert _request(port, "POST", "/t/alice/api/tasks", {"title": "A1"})[0] == 201
+        assert _request(port, "POST", "/api/tasks", {"title": "B1"}, {"X-Tenant-Id": "bob"})[0] == 201
+        assert _request(port, "POST", "/api/tasks", {"title": "默认"})[0] == 201
+
+        status, headers, body = _request(port, "GET", "/api/tasks", headers={"X-Tenant-Id": "alice"})
+        assert status == 200 and [t["title"] for t in json.loads(body)] == ["A1"]
+        assert [t["title"] for t in json.loads(_request(port, "GET", "/t/bob/api/tasks")[2])] == ["B1"]
+        assert [t["title"] for t in json.loads(_request(port, "GET", "/api/tasks")[2])] == ["默认"]
+        assert os.path.exists(os.path.join(root, "tenants", "alice.db"))
+
+        # 两个租户的版本号相同，alice 的ETag发给 bob 不会命中
+        assert headers["ETag"].startswith('W/"alice:') and "X-Tenant-Id" in headers["Vary"]
+        status, bob_headers, body = _request(port, "GET", "/api/tasks",
+                                             headers={"X-Tenant-Id": "bob", "If-None-Match": headers["ETag"]})
+        assert status == 200 and [t["title"] for t in json.loads(body)] == ["B1"]
+        assert bob_headers["ETag"].removeprefix('W/"bob:') == headers["ETag"].removeprefix('W/"alice:')
+        status, cached_headers, _ = _request(port, "GET", "/api/tasks",
+                                             headers={"X-Tenant-Id": "bob", "If-None-Match": bob_headers["ETag"]})
+        assert status == 304 and cached_headers["Vary"] == "X-Tenant-Id"
+
+        # 分页链接保留租户前缀
+        _request(port, "POST", "/t/alice/api/tasks", {"title": "A2"})
+        headers = _request(port, "GET", "/t/alice/api/tasks?limit=1")[1]
+        assert headers["Link"].startswith("</t/alice/api/tasks?")
+        # 网页端在租户前缀下同样可以访问
+        assert _request(port, "GET", "/t/alice/")[0] == 200
+
+        assert _request(port, "GET", "/t/a.b/api/tasks")[0] == 400
+        assert _request(port, "GET", "/t/alice/api/tasks", headers={"X-Tenant-Id": "bob"})[0] == 400
+        stats = json.loads(_request(port, "GET", "/t/alice/api/stats/pool")[2])
+        assert stats["dbPath"].endswith("alice.db")
+        assert stats["tenants"]["open"] == 2 and stats["tenants"]["leased"] == 1
+    finally:
+        server.stop()
+        get_tenant_registry(fallback.TENANT_DIR).close()
+        fallback.DB_PATH, fallback.TENANT_DIR = originals
+
+
+def test_fastapi_routes_by_tenant():
+    from fastapi.testclient import TestClient
+    from database.tenants import get_tenant_registry
+    from server import app as server_app
+
+    root = tempfile.mkdtemp()
+    originals = server_app.DB_PATH, server_app.TENANT_DIR
+    server_app.DB_PATH, server_app.TENANT_DIR = os.path.join(root, "tasks.db"), os.path.join(root, "tenants")
+    try:
+        client = TestClient(server_app.app)
+        assert client.post("/t/alice/api/tasks", json={"title": "A1"}).status_code == 200
+        assert client.post("/api/tasks", json={"title": "B1"}, headers={"X-Tenant-Id": "bob"}).status_code == 200
+        alice = client.get("/api/tasks", headers={"X-Tenant-Id": "alice"})
+        assert [t["title"] for t in alice.json()] == ["A1"]
+        assert [t["title"] for t in client.get("/t/bob/api/tasks").json()] == ["B1"]
+        # 两个租户的版本号相同，alice 的ETag发给 bob 不会命中
+        assert "X-Tenant-Id" in alice.headers["Vary"]
+        bob = client.get("/api/tasks", headers={"X-Tenant-Id": "bob", "If-None-Match": alice.headers["ETag"]})
+        assert bob.status_code == 200 and [t["title"] for t in bob.json()] == ["B1"]
+        assert bob.headers["ETag"].removeprefix('W/"bob:') == alice.headers["ETag"].removeprefix('W/"alice:')
+        cached = client.get("/t/bob/api/tasks", headers={"If-None-Match": bob.headers["ETag"]})
+        assert cached.status_code == 304 and "X-Tenant-Id" in cached.headers["Vary"]
+        assert client.get("/api/tasks").json() == []
+        client.post("/t/alice/api/tasks", json={"title": "A2"})
+        assert client.get("/t/alice/api/tasks?limit=1").headers["Link"].startswith("</t/alice/api/tasks?")
+        assert client.get("/t/a.b/api/tasks").status_code == 400
+        assert client.get("/t/alice/api/stats/pool").json()["dbPath"].endswith("alice.db")
+    finally:
+        get_tenant_registry(server_app.TENANT_DIR).close()
+        server_app.DB_PATH, server_app.TENANT_DIR = originals
+
+
+if __name__ == "__main__":
+    test_resolve_tenant()
+    test_lru_eviction()
+    test_leased_tenants_are_kept()
+    test_idle_tenants_are_closed()
+    test_fallback_routes_by_tenant()
+    test_fastapi_routes_by_tenant()
+    print("✅ 多租户测试通过")
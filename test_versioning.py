@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+"""
+测试任务修改计数器和列表接口的条件请求（ETag / 304）
+"""
+import os
+import sys
+import tempfile
+import urllib.error
+import urllib.request
+
+# 添加项目根目录到Python路径
+sys.path.insert(0, os.path.dirname(__file__))
+
+from database.migrations import ensure_schema
+from database.pool import get_pool
+from database.versioning import etag, not_modified, read_version
+
+
+def _db():
+    path = os.path.join(tempfile.mkdtemp(), "tasks.db")
+    ensure_schema(path)
+    with get_pool(path).writer() as conn:
+        conn.executemany("INSERT INTO tasks (title, quadrant) VALUES (?, ?)", [("任务1", 1), ("任务2", 2)])
+    return path
+
+
+def _version(path):
+    with get_pool(path).reader() as conn:
+        return read_version(conn)
+
+
+def test_triggers_bump_version():
+    path = _db()
+    pool = get_pool(path)
+    version = _version(path)
+    for statement in ("UPDATE tasks SET title = '改' WHERE id = 1",
+                      "UPDATE tasks SET is_completed = 1 WHERE id = 2",
+                      "DELETE FROM tasks WHERE id = 1"):
+        with pool.writer() as conn:
+            conn.execute(statement)
+        current = _version(path)
+        assert current[0] > version[0] and current[1] >= version[1]
+        version = current
+    # 没有命中任何行的语句不改变版本
+    with pool.writer() as conn:
+        conn.execute("DELETE FROM tasks WHERE id = 99")
+    assert _version(path) == version
+
+
+def test_not_modified_matching():
+    version = (7, 0.0)
+    assert etag(version) == 'W/"7"'
+    assert not_modified('W/"7"', version)
+    assert not_modified('"3", "7"', version)
+    assert not_modified("*", version)
+    assert not not_modified('W/"6"', version)
+    assert not not_modified(None, version)
+    # 租户的ETag带租户名，其他租户和默认数据库的ETag不会命中
+    assert etag(version, "alice") == 'W/"alice:7"'
+    assert not_modified('W/"alice:7"', version, "alice")
+    assert not not_modified('W/"bob:7"', version, "alice")
+    assert not not_modified('W/"7"', version, "alice")
+    assert not not_modified('W/"alice:7"', version)
+
+
+def test_fastapi_conditional_get():
+    from fastapi.testclient import TestClient
+    from server import app as server_app
+
+    original, server_app.DB_PATH = server_app.DB_PATH, _db()
+    try:
+        client = TestClient(server_app.app)
+        response = client.get("/api/tasks")
+        tag = response.headers["ETag"]
+        assert response.headers["Last-Modified"].endswith("GMT")
+        assert response.headers["Cache-Control"] == "no-cache"
+
+        # 304 只读版本号，不查询 tasks 表
+        statements = []
+        with get_pool(server_app.DB_PATH).reader() as conn:
+            conn.set_trace_callback(statements.append)
+            try:
+                version, page = server_app.get_repo().page(conn, "active", 50, None, tag)
+            finally:
+                conn.set_trace_callback(None)
+        assert page is None and etag(version) == tag
+        assert all("FROM tasks " not in statement for statement in statements), statements
+
+        cached = client.get("/api/tasks", headers={"If-None-Match": tag})
+        assert cached.status_code == 304 and cached.content == b""
+        assert cached.headers["ETag"] == tag
+
+        client.post("/api/tasks", json={"title": "新任务"})
+        changed = client.get("/api/tasks", headers={"If-None-Match": tag})
+        assert changed.status_code == 200 and changed.headers["ETag"] != tag
+        assert len(changed.json()) == 3
+    finally:
+        server_app.DB_PATH = original
+
+
+def test_fallback_conditional_get():
+    from server import fallback
+
+    original, fallback.DB_PATH = fallback.DB_PATH, _db()
+    server = fallback.start_in_thread()
+    url = f"http://127.0.0.1:{server.port}/api/tasks/completed"
+    try:
+        with urllib.request.urlopen(url) as response:
+            tag = response.headers["ETag"]
+        try:
+            urllib.request.urlopen(urllib.request.Request(url, headers={"If-None-Match": tag}))
+            assert False
+        except urllib.error.HTTPError as e:
+            assert e.code == 304
+            assert e.headers["ETag"] == tag
+    finally:
+        server.stop()
+        fallback.DB_PATH = original
+
+
+if __name__ == "__main__":
+    test_triggers_bump_version()
+    test_not_modified_matching()
+    test_fastapi_conditional_get()
+    test_fallback_conditional_get()
+    print("✅ 条件请求测试通过")